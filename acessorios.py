@@ -1,14 +1,136 @@
 import aiosqlite
+import asyncio
+from array import array
+import bisect
+import csv
+import json
+import logging
+import mmap
+import os
+import re
+import struct
+from collections import OrderedDict
+from contextlib import asynccontextmanager
 import flet as ft
-from typing import Optional
-import requests
+from typing import AsyncIterator, Callable, Dict, Optional, List, Tuple
+import httpx
+
+import querys_app6 as q6
+
+logger = logging.getLogger(__name__)
+
+class BancoMemoria:
+    def __init__(self, db_path: str, intervalo: float = 30.0, limite_escritas: int = 50, paginas_por_passo: int = 256) -> None:
+        self.db_path = db_path
+        self.intervalo = intervalo
+        self.limite_escritas = limite_escritas
+        self.paginas_por_passo = paginas_por_passo
+        self.conexao: Optional[aiosqlite.Connection] = None
+        self.trava = asyncio.Lock()
+        self.escritas = 0
+        self.salvando = False
+        self.tarefa: Optional[asyncio.Task] = None
+        self.tarefa_salvar: Optional[asyncio.Task] = None
+
+    async def abrir(self) -> None:
+        self.conexao = await aiosqlite.connect(":memory:")
+        if os.path.exists(self.db_path):
+            async with aiosqlite.connect(self.db_path) as disco:
+                await disco.backup(self.conexao)
+        await self.conexao.execute("PRAGMA foreign_keys = ON")
+        self.tarefa = asyncio.create_task(self.ciclo())
+
+    async def ciclo(self) -> None:
+        while True:
+            await asyncio.sleep(self.intervalo)
+            await self.salvar()
+
+    def registrar_escrita(self) -> None:
+        self.escritas += 1
+        if self.escritas >= self.limite_escritas and not self.salvando:
+            self.tarefa_salvar = asyncio.create_task(self.salvar())
+            self.tarefa_salvar.add_done_callback(self.verificar_salvamento)
+
+    def verificar_salvamento(self, tarefa: asyncio.Task) -> None:
+        if not tarefa.cancelled() and tarefa.exception() is not None:
+            logger.error("Falha ao salvar o banco em memória", exc_info=tarefa.exception())
+
+    async def salvar(self) -> None:
+        if self.escritas == 0 or self.salvando:
+            return
+        self.salvando = True
+        temporario = f"{self.db_path}.snapshot"
+        try:
+            async with aiosqlite.connect(":memory:") as copia:
+                async with self.trava:
+                    escritas = self.escritas
+                    await self.conexao.backup(copia)
+                async with aiosqlite.connect(temporario) as destino:
+                    await copia.backup(destino, pages=self.paginas_por_passo)
+            loop = asyncio.get_running_loop()
+            await loop.run_in_executor(None, self.substituir, temporario)
+            self.escritas -= escritas
+        finally:
+            self.salvando = False
+
+    def substituir(self, temporario: str) -> None:
+        with open(temporario, "rb") as arquivo:
+            os.fsync(arquivo.fileno())
+        os.replace(temporario, self.db_path)
+
+    async def fechar(self) -> None:
+        if self.tarefa is not None:
+            self.tarefa.cancel()
+        if self.tarefa_salvar is not None and not self.tarefa_salvar.done():
+            await asyncio.wait([self.tarefa_salvar])
+        await self.salvar()
+        await self.conexao.close()
+
 
 class BancoDeDados:
+    memoria: Dict[str, BancoMemoria] = {}
+
     def __init__(self, db_path: str) -> None:
         self.db_path = db_path
 
+    @classmethod
+    async def ativar_memoria(cls, db_path: str, intervalo: float = 30.0, limite_escritas: int = 50) -> BancoMemoria:
+        banco = BancoMemoria(db_path, intervalo, limite_escritas)
+        await banco.abrir()
+        cls.memoria[db_path] = banco
+        return banco
+
+    @classmethod
+    async def salvar_memoria(cls, db_path: str) -> None:
+        banco = cls.memoria.get(db_path)
+        if banco is not None:
+            await banco.salvar()
+
+    @classmethod
+    async def desativar_memoria(cls, db_path: str) -> None:
+        banco = cls.memoria.pop(db_path, None)
+        if banco is not None:
+            await banco.fechar()
+
+    @asynccontextmanager
+    async def conectar(self, escrita: bool = False) -> AsyncIterator[aiosqlite.Connection]:
+        banco = self.memoria.get(self.db_path)
+        if banco is None:
+            async with aiosqlite.connect(self.db_path) as db:
+                yield db
+            return
+
+        async with banco.trava:
+            try:
+                yield banco.conexao
+            except Exception:
+                await banco.conexao.rollback()
+                raise
+        if escrita:
+            banco.registrar_escrita()
+
     async def execute(self, query: str, params: tuple = None) -> None:
-        async with aiosqlite.connect(self.db_path) as db:
+        async with self.conectar(escrita=True) as db:
             await db.execute("PRAGMA foreign_keys = ON")
             if params:
                 await db.execute(query, params)
@@ -17,7 +139,7 @@ class BancoDeDados:
             await db.commit()
 
     async def execute_return_id(self, query: str, params: tuple = None) -> int:
-        async with aiosqlite.connect(self.db_path) as db:
+        async with self.conectar(escrita=True) as db:
             await db.execute("PRAGMA foreign_keys = ON")
             if params:
                 async with db.execute(query, params) as cursor:
@@ -28,16 +150,35 @@ class BancoDeDados:
             await db.commit()
         return last_id
 
+    async def execute_transaction(self, comandos: List[Tuple[str, tuple]]) -> None:
+        async with self.conectar(escrita=True) as db:
+            await db.execute("PRAGMA foreign_keys = ON")
+            for query, params in comandos:
+                await db.execute(query, params or ())
+            await db.commit()
+
+    async def execute_script(self, script: str) -> None:
+        async with self.conectar(escrita=True) as db:
+            await db.executescript(script)
+            await db.commit()
+
     async def fetch_all(self, query: str, params: tuple = None) -> list:
-        async with aiosqlite.connect(self.db_path) as db:
+        async with self.conectar() as db:
             async with db.execute(query, params or ()) as cursor:
                 return await cursor.fetchall()
 
     async def fetch_one(self, query: str, params: tuple = None) -> list:
-        async with aiosqlite.connect(self.db_path) as db:
+        async with self.conectar() as db:
             async with db.execute(query, params or ()) as cursor:
                 return await cursor.fetchone()
 
+    async def pesquisar(self, termo: str, limite: int = 30) -> list:
+        palavras = re.findall(r"\w+", termo or "")
+        if not palavras:
+            return []
+        consulta = " ".join(f'"{palavra}"*' for palavra in palavras)
+        return await self.fetch_all(q6.pesquisar_texto, {"consulta": consulta, "limite": limite})
+
 
 class Utilidades:
     @staticmethod
@@ -109,22 +250,186 @@ class Dialogo(ft.Container):
         self.atualizar_conteudo(icon, texto)
 
 
+class IndiceCep:
+    assinatura = b"CEPIDX01"
+    cabecalho = struct.Struct("<8sII")
+    campos = ("street", "neighborhood", "city", "state")
+    tamanho_registro = 4 * len(campos)
+
+    def __init__(self, arquivo: str = "ceps.idx") -> None:
+        self.arquivo = arquivo
+        self.mapa = None
+        self.ceps = None
+        self.offsets = None
+
+    @classmethod
+    def importar(cls, arquivo_dados: str, arquivo_indice: str = "ceps.idx", delimitador: str = ";") -> int:
+        registros = {}
+        with open(arquivo_dados, encoding="utf-8", newline="") as arquivo:
+            for linha in csv.reader(arquivo, delimiter=delimitador):
+                cep = linha[0].replace("-", "").strip()
+                if cep.isdigit() and len(linha) >= 5:
+                    registros[int(cep)] = [valor.strip() for valor in linha[1:5]]
+
+        textos = bytearray()
+        posicoes = {}
+        ceps = sorted(registros)
+        offsets = []
+        for cep in ceps:
+            for valor in registros[cep]:
+                if valor not in posicoes:
+                    posicoes[valor] = len(textos)
+                    textos += valor.encode("utf-8") + b"\0"
+                offsets.append(posicoes[valor])
+
+        temporario = f"{arquivo_indice}.tmp"
+        with open(temporario, "wb") as arquivo:
+            arquivo.write(cls.cabecalho.pack(cls.assinatura, len(ceps), len(textos)))
+            arquivo.write(array("I", ceps).tobytes())
+            arquivo.write(array("I", offsets).tobytes())
+            arquivo.write(textos)
+        os.replace(temporario, arquivo_indice)
+        return len(ceps)
+
+    def abrir(self) -> bool:
+        if self.mapa is not None:
+            return True
+        if not os.path.exists(self.arquivo):
+            return False
+        with open(self.arquivo, "rb") as arquivo:
+            self.mapa = mmap.mmap(arquivo.fileno(), 0, access=mmap.ACCESS_READ)
+        assinatura, total, _ = self.cabecalho.unpack_from(self.mapa)
+        if assinatura != self.assinatura:
+            self.fechar()
+            return False
+        inicio = self.cabecalho.size
+        self.ceps = memoryview(self.mapa)[inicio:inicio + 4 * total].cast("I")
+        inicio += 4 * total
+        self.offsets = memoryview(self.mapa)[inicio:inicio + self.tamanho_registro * total].cast("I")
+        self.inicio_textos = inicio + self.tamanho_registro * total
+        return True
+
+    def fechar(self) -> None:
+        if self.ceps is not None:
+            self.ceps.release()
+            self.offsets.release()
+        if self.mapa is not None:
+            self.mapa.close()
+        self.mapa = self.ceps = self.offsets = None
+
+    def obter(self, cep: str) -> Optional[dict]:
+        cep = cep.replace("-", "").strip()
+        if not cep.isdigit() or not self.abrir():
+            return None
+        numero = int(cep)
+        i = bisect.bisect_left(self.ceps, numero)
+        if i == len(self.ceps) or self.ceps[i] != numero:
+            return None
+        dados = {"cep": cep}
+        for j, campo in enumerate(self.campos):
+            dados[campo] = self.ler_texto(self.offsets[i * len(self.campos) + j])
+        return dados
+
+    def ler_texto(self, offset: int) -> str:
+        inicio = self.inicio_textos + offset
+        fim = self.mapa.find(b"\0", inicio)
+        return self.mapa[inicio:fim].decode("utf-8")
+
+
 class BuscarCep:
-    def __init__(self) -> None:
-        self.url = "https://brasilapi.com.br/api/cep/v1/{}"
+    indice = IndiceCep()
+    tempo_conexao = 3.0
+    tempo_leitura = 5.0
+    tentativas = 3
+    espera_tentativa = 0.5
+    tamanho_cache = 256
+    caches: Dict[Tuple[str, str], "OrderedDict[str, dict]"] = {}
+    caches_disco: Dict[Tuple[str, str], Dict[str, dict]] = {}
 
-    def obter_dados(self, cep: str) -> dict:
-        response = requests.get(self.url.format(self.formatar_cep(cep)))
-    
-        if response.status_code == 200:
-            return response.json()
-        elif response.status_code == 404:
-            return {}
-        else:
+    def __init__(self, url: str = "https://brasilapi.com.br/api/cep/v1/{}", arquivo_cache: str = "cache_cep.json") -> None:
+        self.url = url
+        self.arquivo_cache = arquivo_cache
+        self.chave = (url, arquivo_cache)
+        self.cache = BuscarCep.caches.setdefault(self.chave, OrderedDict())
+
+    async def obter_dados(self, cep: str) -> dict:
+        cep = self.formatar_cep(cep)
+        if cep in self.cache:
+            self.cache.move_to_end(cep)
+            return self.cache[cep]
+
+        dados = self.indice.obter(cep)
+        if dados is not None:
+            self.memorizar(cep, dados)
+            return dados
+
+        disco = await self.ler_cache_disco()
+        if cep in disco:
+            self.memorizar(cep, disco[cep])
+            return disco[cep]
+
+        dados = await self.consultar(cep)
+        if dados:
+            self.memorizar(cep, dados)
+            await self.gravar_cache_disco(cep, dados)
+        return dados
+
+    async def consultar(self, cep: str) -> dict:
+        timeout = httpx.Timeout(self.tempo_leitura, connect=self.tempo_conexao)
+        async with httpx.AsyncClient(timeout=timeout) as cliente:
+            for tentativa in range(self.tentativas):
+                try:
+                    response = await cliente.get(self.url.format(cep))
+                except httpx.TransportError:
+                    await asyncio.sleep(self.espera_tentativa * 2 ** tentativa)
+                    continue
+
+                if response.status_code == 200:
+                    try:
+                        return response.json()
+                    except ValueError:
+                        return {}
+                elif response.status_code >= 500 or response.status_code == 429:
+                    await asyncio.sleep(self.espera_tentativa * 2 ** tentativa)
+                else:
+                    return {}
+        return {}
+
+    def memorizar(self, cep: str, dados: dict) -> None:
+        self.cache[cep] = dados
+        self.cache.move_to_end(cep)
+        while len(self.cache) > self.tamanho_cache:
+            self.cache.popitem(last=False)
+
+    async def ler_cache_disco(self) -> Dict[str, dict]:
+        disco = BuscarCep.caches_disco.get(self.chave)
+        if disco is None:
+            loop = asyncio.get_running_loop()
+            disco = await loop.run_in_executor(None, self.carregar_arquivo)
+            BuscarCep.caches_disco[self.chave] = disco
+        return disco
+
+    async def gravar_cache_disco(self, cep: str, dados: dict) -> None:
+        disco = await self.ler_cache_disco()
+        disco[cep] = dados
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(None, self.salvar_arquivo, dict(disco))
+
+    def carregar_arquivo(self) -> Dict[str, dict]:
+        try:
+            with open(self.arquivo_cache, encoding="utf-8") as arquivo:
+                return json.load(arquivo)
+        except (OSError, ValueError):
             return {}
-        
+
+    def salvar_arquivo(self, dados: Dict[str, dict]) -> None:
+        temporario = f"{self.arquivo_cache}.tmp"
+        with open(temporario, "w", encoding="utf-8") as arquivo:
+            json.dump(dados, arquivo, ensure_ascii=False)
+        os.replace(temporario, self.arquivo_cache)
+
     def formatar_cep(self, cep: str) -> str:
-        return cep.replace("-", "")
+        return cep.replace("-", "").strip()
 
 
 class JanelaNotificacao(ft.AlertDialog):
@@ -137,3 +442,152 @@ class JanelaNotificacao(ft.AlertDialog):
             ]),
             padding=ft.padding.all(20)
         )
+
+
+class SeletorProdutos(ft.Container):
+    def __init__(self, ao_remover: Optional[Callable[[int], None]] = None) -> None:
+        super().__init__(expand=True)
+        self.ao_remover = ao_remover
+        self.produtos: Dict[int, tuple] = {}
+        self.indice_categorias: Dict[str, List[int]] = {}
+        self.linhas_categorias: Dict[str, List[ft.DataRow]] = {}
+        self.selecionados: Dict[int, ft.DataRow] = {}
+        self.dropdown_categoria = ft.Dropdown(
+            label="Categoria",
+            width=200,
+            border="underline",
+            on_change=self.filtrar_categoria
+        )
+        self.tabela_produtos = ft.DataTable(
+            columns=[
+                ft.DataColumn(ft.Text("Nome")),
+                ft.DataColumn(ft.Text("Adicionar"))
+            ],
+            col=12
+        )
+        self.tabela_selecao = ft.DataTable(
+            columns=[
+                ft.DataColumn(ft.Text("Nome")),
+                ft.DataColumn(ft.Text("Remover"))
+            ],
+            col=12
+        )
+        self.criar_conteudo()
+
+    def criar_conteudo(self) -> None:
+        self.content = ft.Column([
+            ft.Row([
+                self.dropdown_categoria,
+                ft.Row([
+                    ft.IconButton(ft.Icons.PLAYLIST_ADD, on_click=self.adicionar_categoria, tooltip="Adicionar Categoria"),
+                    ft.IconButton(ft.Icons.CLEAR_ALL, on_click=self.limpar, tooltip="Limpar Seleção")
+                ], spacing=0)
+            ], alignment=ft.MainAxisAlignment.SPACE_BETWEEN),
+            ft.Container(
+                ft.ResponsiveRow([
+                    ft.Column([
+                        ft.Card(
+                            ft.Container(
+                                ft.Column([
+                                    ft.ResponsiveRow([
+                                        self.tabela_produtos
+                                    ])
+                                ], scroll=ft.ScrollMode.ALWAYS),
+                                padding=ft.padding.only(top=10, bottom=10), expand=True
+                            ), expand=True
+                        )
+                    ], col=6),
+                    ft.Column([
+                        ft.Card(
+                            ft.Container(
+                                ft.Column([
+                                    ft.ResponsiveRow([
+                                        self.tabela_selecao
+                                    ])
+                                ], scroll=ft.ScrollMode.ALWAYS),
+                                padding=ft.padding.only(top=10, bottom=10), expand=True
+                            ), expand=True
+                        )
+                    ], col=6)
+                ]), expand=True
+            )
+        ])
+
+    def carregar(self, dados: list) -> None:
+        self.produtos = {int(dado[0]): dado for dado in dados}
+        self.indice_categorias.clear()
+        self.linhas_categorias.clear()
+        for id, dado in self.produtos.items():
+            self.indice_categorias.setdefault(dado[2], []).append(id)
+
+        categorias = sorted(self.indice_categorias)
+        self.dropdown_categoria.options = [ft.dropdown.Option(categoria) for categoria in categorias]
+        if categorias:
+            self.dropdown_categoria.value = categorias[0]
+            self.tabela_produtos.rows = self.linhas_categoria(categorias[0])
+        self.update()
+
+    def linhas_categoria(self, categoria: str) -> List[ft.DataRow]:
+        if categoria not in self.linhas_categorias:
+            self.linhas_categorias[categoria] = [
+                self.criar_linha_produto(id) for id in self.indice_categorias.get(categoria, [])
+            ]
+        return self.linhas_categorias[categoria]
+
+    def criar_linha_produto(self, id: int) -> ft.DataRow:
+        return ft.DataRow(
+            cells=[
+                ft.DataCell(ft.Text(self.produtos[id][1])),
+                ft.DataCell(ft.IconButton(ft.Icons.ADD, on_click=lambda e, id=id: self.adicionar(id)))
+            ]
+        )
+
+    def criar_linha_selecao(self, id: int) -> ft.DataRow:
+        return ft.DataRow(
+            cells=[
+                ft.DataCell(ft.Text(self.produtos[id][1])),
+                ft.DataCell(ft.IconButton(ft.Icons.DELETE, on_click=lambda e, id=id: self.remover(id)))
+            ]
+        )
+
+    def filtrar_categoria(self, e: ft.ControlEvent) -> None:
+        self.tabela_produtos.rows = self.linhas_categoria(e.data)
+        self.tabela_produtos.update()
+
+    def adicionar(self, id: int) -> None:
+        self.adicionar_varios([id])
+
+    def adicionar_varios(self, ids: List[int]) -> None:
+        novos = False
+        for id in ids:
+            id = int(id)
+            if id in self.produtos and id not in self.selecionados:
+                linha = self.criar_linha_selecao(id)
+                self.selecionados[id] = linha
+                self.tabela_selecao.rows.append(linha)
+                novos = True
+        if novos:
+            self.tabela_selecao.update()
+
+    def adicionar_categoria(self, e: ft.ControlEvent) -> None:
+        self.adicionar_varios(self.indice_categorias.get(self.dropdown_categoria.value, []))
+
+    def remover(self, id: int) -> None:
+        linha = self.selecionados.pop(id, None)
+        if linha is not None:
+            if self.ao_remover is not None:
+                self.ao_remover(id)
+            self.tabela_selecao.rows = list(self.selecionados.values())
+            self.tabela_selecao.update()
+
+    def limpar(self, e: ft.ControlEvent) -> None:
+        if self.ao_remover is not None:
+            for id in self.selecionados:
+                self.ao_remover(id)
+        self.selecionados.clear()
+        self.tabela_selecao.rows = []
+        self.tabela_selecao.update()
+
+    def itens(self) -> List[tuple]:
+        return [(id, self.produtos[id][1]) for id in self.selecionados]
+
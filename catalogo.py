@@ -0,0 +1,254 @@
+import re
+import unicodedata
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Callable, Dict, List, Optional, Set
+
+from acessorios import BancoDeDados
+import querys_app6 as q6
+from modelos import ModeloItem
+
+
+class IndiceBusca:
+    tamanho_grama = 3
+
+    def __init__(self) -> None:
+        self.nomes: Dict[int, str] = {}
+        self.prefixos: Dict[str, Set[int]] = {}
+        self.gramas: Dict[str, Set[int]] = {}
+
+    def normalizar(self, texto: Optional[str]) -> str:
+        decomposto = unicodedata.normalize("NFKD", (texto or "").lower())
+        return " ".join(re.findall(r"\w+", "".join(c for c in decomposto if not unicodedata.combining(c))))
+
+    def chaves(self, nome: str) -> tuple:
+        prefixos = {
+            palavra[:i]
+            for palavra in nome.split()
+            for i in range(1, min(len(palavra), self.tamanho_grama - 1) + 1)
+        }
+        gramas = {nome[i:i + self.tamanho_grama] for i in range(len(nome) - self.tamanho_grama + 1)}
+        return prefixos, gramas
+
+    def adicionar(self, id: int, nome: str) -> None:
+        self.remover(id)
+        nome = self.normalizar(nome)
+        self.nomes[id] = nome
+        prefixos, gramas = self.chaves(nome)
+        for chave in prefixos:
+            self.prefixos.setdefault(chave, set()).add(id)
+        for chave in gramas:
+            self.gramas.setdefault(chave, set()).add(id)
+
+    def remover(self, id: int) -> None:
+        nome = self.nomes.pop(id, None)
+        if nome is None:
+            return
+        prefixos, gramas = self.chaves(nome)
+        for postagens, chaves in ((self.prefixos, prefixos), (self.gramas, gramas)):
+            for chave in chaves:
+                ids = postagens.get(chave)
+                if ids is not None:
+                    ids.discard(id)
+                    if not ids:
+                        del postagens[chave]
+
+    def limpar(self) -> None:
+        self.nomes.clear()
+        self.prefixos.clear()
+        self.gramas.clear()
+
+    def buscar(self, consulta: str) -> Optional[Set[int]]:
+        termos = self.normalizar(consulta).split()
+        if not termos:
+            return None
+        resultado: Optional[Set[int]] = None
+        for termo in sorted(termos, key=len, reverse=True):
+            ids = self.buscar_termo(termo)
+            resultado = ids if resultado is None else resultado & ids
+            if not resultado:
+                return set()
+        return resultado
+
+    def buscar_termo(self, termo: str) -> Set[int]:
+        if len(termo) < self.tamanho_grama:
+            return set(self.prefixos.get(termo, ()))
+        gramas = sorted(
+            (self.gramas.get(termo[i:i + self.tamanho_grama], set()) for i in range(len(termo) - self.tamanho_grama + 1)),
+            key=len
+        )
+        candidatos = set(gramas[0])
+        for ids in gramas[1:]:
+            candidatos &= ids
+            if not candidatos:
+                return candidatos
+        return {id for id in candidatos if termo in self.nomes[id]}
+
+
+class FiltroBitmap:
+    maximo_buscas = 32
+
+    def __init__(self, catalogo: "CatalogoProdutos") -> None:
+        self.catalogo = catalogo
+        self.ordenados: Optional[List[ModeloItem]] = None
+        self.posicoes: Dict[int, int] = {}
+        self.categorias: Dict[str, int] = {}
+        self.buscas: "OrderedDict[str, int]" = OrderedDict()
+        self.completo = 0
+
+    def preparar(self) -> List[ModeloItem]:
+        produtos = self.catalogo.todos()
+        if produtos is self.ordenados:
+            return produtos
+        self.ordenados = produtos
+        self.posicoes = {produto.id: i for i, produto in enumerate(produtos)}
+        posicoes_categoria: Dict[str, List[int]] = {}
+        for i, produto in enumerate(produtos):
+            posicoes_categoria.setdefault(self.catalogo.chave_categoria(produto.categoria), []).append(i)
+        self.categorias = {chave: self.montar(posicoes) for chave, posicoes in posicoes_categoria.items()}
+        self.buscas.clear()
+        self.completo = (1 << len(produtos)) - 1
+        return produtos
+
+    def montar(self, posicoes) -> int:
+        bits = bytearray((len(self.ordenados) + 7) // 8)
+        for i in posicoes:
+            bits[i >> 3] |= 1 << (i & 7)
+        return int.from_bytes(bits, "little")
+
+    def categoria(self, categoria: str) -> int:
+        self.preparar()
+        if categoria.lower() == "todos":
+            return self.completo
+        return self.categorias.get(self.catalogo.chave_categoria(categoria), 0)
+
+    def busca(self, termo: str) -> int:
+        self.preparar()
+        chave = self.catalogo.indice_busca.normalizar(termo)
+        if not chave:
+            return self.completo
+        mascara = self.buscas.get(chave)
+        if mascara is None:
+            ids = self.catalogo.indice_busca.buscar(chave) or set()
+            mascara = self.montar(self.posicoes[id] for id in ids if id in self.posicoes)
+            self.buscas[chave] = mascara
+            if len(self.buscas) > self.maximo_buscas:
+                self.buscas.popitem(last=False)
+        else:
+            self.buscas.move_to_end(chave)
+        return mascara
+
+    def combinar(self, categoria: str, termo: str) -> int:
+        return self.categoria(categoria) & self.busca(termo)
+
+    def produtos(self, mascara: int) -> List[ModeloItem]:
+        produtos = self.preparar()
+        resultado = []
+        while mascara:
+            menor = mascara & -mascara
+            resultado.append(produtos[menor.bit_length() - 1])
+            mascara ^= menor
+        return resultado
+
+
+class CatalogoProdutos:
+    def __init__(self) -> None:
+        self.bd = BancoDeDados("db_app6.db")
+        self.produtos: Dict[int, ModeloItem] = {}
+        self.categorias: Dict[str, Dict[int, ModeloItem]] = {}
+        self.assinantes: List[Callable[[str, Optional[ModeloItem]], None]] = []
+        self.ordenados: Optional[List[ModeloItem]] = None
+        self.indice_busca = IndiceBusca()
+        self.filtro = FiltroBitmap(self)
+        self.em_lote = False
+        self.carregado = False
+
+    async def carregar(self, forcar: bool = False) -> None:
+        if self.carregado and not forcar:
+            return
+        registros = await self.bd.fetch_all(q6.selecionar_produtos)
+        self.produtos.clear()
+        self.categorias.clear()
+        self.indice_busca.limpar()
+        for registro in registros:
+            self.indexar(ModeloItem(*registro))
+        self.ordenados = None
+        self.carregado = True
+        self.notificar("carregado", None)
+
+    def indexar(self, produto: ModeloItem) -> None:
+        self.produtos[produto.id] = produto
+        self.categorias.setdefault(self.chave_categoria(produto.categoria), {})[produto.id] = produto
+        self.indice_busca.adicionar(produto.id, produto.nome)
+
+    def desindexar(self, produto: ModeloItem) -> None:
+        self.produtos.pop(produto.id, None)
+        self.categorias.get(self.chave_categoria(produto.categoria), {}).pop(produto.id, None)
+        self.indice_busca.remover(produto.id)
+
+    def obter(self, id: int) -> Optional[ModeloItem]:
+        return self.produtos.get(int(id))
+
+    def todos(self) -> List[ModeloItem]:
+        if self.ordenados is None:
+            self.ordenados = sorted(self.produtos.values(), key=lambda produto: produto.nome)
+        return self.ordenados
+
+    def por_categoria(self, categoria: str) -> List[ModeloItem]:
+        produtos = self.categorias.get(self.chave_categoria(categoria), {})
+        return sorted(produtos.values(), key=lambda produto: produto.nome)
+
+    def buscar(self, termo: str) -> List[ModeloItem]:
+        ids = self.indice_busca.buscar(termo)
+        if ids is None:
+            return self.todos()
+        return [produto for produto in self.todos() if produto.id in ids]
+
+    def adicionar(self, produto: ModeloItem) -> None:
+        self.indexar(produto)
+        self.ordenados = None
+        self.notificar("adicionado", produto)
+
+    def remover(self, id: int) -> None:
+        produto = self.produtos.get(int(id))
+        if produto is not None:
+            self.desindexar(produto)
+            self.ordenados = None
+            self.notificar("removido", produto)
+
+    def atualizar(self, id: int, **campos) -> None:
+        produto = self.produtos.get(int(id))
+        if produto is not None:
+            self.desindexar(produto)
+            for campo, valor in campos.items():
+                setattr(produto, campo, valor)
+            self.indexar(produto)
+            self.ordenados = None
+            self.notificar("atualizado", produto)
+
+    @contextmanager
+    def lote(self):
+        self.em_lote = True
+        try:
+            yield
+        finally:
+            self.em_lote = False
+            self.notificar("lote", None)
+
+    def inscrever(self, assinante: Callable[[str, Optional[ModeloItem]], None]) -> None:
+        if assinante not in self.assinantes:
+            self.assinantes.append(assinante)
+
+    def desinscrever(self, assinante: Callable[[str, Optional[ModeloItem]], None]) -> None:
+        if assinante in self.assinantes:
+            self.assinantes.remove(assinante)
+
+    def notificar(self, evento: str, produto: Optional[ModeloItem]) -> None:
+        for assinante in list(self.assinantes):
+            assinante(evento, produto)
+
+    def chave_categoria(self, categoria: Optional[str]) -> str:
+        return (categoria or "").lower()
+
+
+catalogo_produtos = CatalogoProdutos()
@@ -1,11 +1,234 @@
 import asyncio
+import json
+from collections import OrderedDict
+from copy import copy
 from datetime import datetime
 import flet as ft
-from typing import Optional, Union
+from typing import Dict, Optional, Union, List, Tuple
 
 from acessorios import BancoDeDados
 import querys_app6 as q6
-from modelos import ModeloFornecedor, ModeloItem
+from modelos import ModeloFornecedor, ModeloItem, ModeloLinhaCompra
+from estatisticas import AcumuladorEstatisticas, AcumuladorFornecedor, AcumuladorPreco, MotorAnomaliasPreco
+from catalogo import catalogo_produtos
+from imagens import ProcessadorImagens
+from precos import matriz_precos
+
+
+class ControleEsquema:
+    def __init__(self) -> None:
+        self.bd = BancoDeDados("db_app6.db")
+
+    async def preparar(self) -> None:
+        await self.bd.execute_script(q6.criar_tabela_estatisticas_produto)
+        await self.bd.execute_script(q6.criar_tabelas_anomalia_preco)
+        await self.bd.execute_script(q6.criar_indice_relacao_preco)
+        await self.bd.execute_script(q6.criar_tabelas_lista_compra)
+        await self.bd.execute_script(q6.criar_tabela_scorecard_fornecedor)
+        await self.preparar_busca_texto()
+        await self.preparar_miniaturas()
+        await ControleEstatisticas().reconstruir_se_divergente()
+        await ControleAnomalias().reprocessar_se_vazio()
+        await ControleScorecard().reconstruir_se_vazio()
+
+    async def preparar_busca_texto(self) -> None:
+        existente = await self.bd.fetch_one(q6.existe_busca_texto)
+        await self.bd.execute_script(q6.criar_busca_texto)
+        if existente is None:
+            await self.bd.execute_script(q6.reconstruir_busca_texto)
+
+    async def preparar_miniaturas(self) -> None:
+        colunas = {coluna for coluna, in await self.bd.fetch_all(q6.colunas_infos_produto)}
+        if "path_miniatura" not in colunas:
+            await self.bd.execute(q6.adicionar_coluna_miniatura)
+
+
+class ControleImagens:
+    def __init__(self) -> None:
+        self.bd = BancoDeDados("db_app6.db")
+        self.processador = ProcessadorImagens()
+
+    async def gerar_miniatura(self, path: Optional[str]) -> Optional[str]:
+        return await self.processador.processar(path)
+
+    async def preencher_faltantes(self) -> None:
+        miniaturas = []
+        for id_produto, path in await self.bd.fetch_all(q6.obter_imagens_sem_miniatura):
+            miniatura = await self.processador.processar(path)
+            if miniatura is not None:
+                miniaturas.append((miniatura, id_produto))
+        if miniaturas:
+            await self.bd.execute_transaction([(q6.atualizar_miniatura_produto, valores) for valores in miniaturas])
+            with catalogo_produtos.lote():
+                for miniatura, id_produto in miniaturas:
+                    catalogo_produtos.atualizar(id_produto, path=miniatura)
+        await self.limpar_cache()
+
+    async def limpar_cache(self) -> None:
+        em_uso = [miniatura for miniatura, in await self.bd.fetch_all(q6.obter_miniaturas_em_uso)]
+        await self.processador.limpar(em_uso)
+
+
+class ControleBusca:
+    def __init__(self) -> None:
+        self.bd = BancoDeDados("db_app6.db")
+
+    async def pesquisar(self, termo: str, limite: int = 30) -> list:
+        return await self.bd.pesquisar(termo, limite)
+
+    async def obter_fornecedor(self, id: int) -> Optional[ModeloFornecedor]:
+        return await ControleFornecedor().obter_detalhes(id)
+
+
+class ControleEstatisticas:
+    def __init__(self) -> None:
+        self.bd = BancoDeDados("db_app6.db")
+
+    async def obter(self, id_produto: int) -> AcumuladorEstatisticas:
+        registro = await self.bd.fetch_one(q6.obter_estatisticas_produto, (id_produto,))
+        return AcumuladorEstatisticas.de_registro(registro)
+
+    async def reconstruir(self) -> None:
+        await self.bd.execute_transaction([
+            ("DELETE FROM estatisticas_produto;", None),
+            (q6.reconstruir_estatisticas_produto, None)
+        ])
+
+    async def reconstruir_se_divergente(self) -> None:
+        produtos, total_estatisticas, produtos_logs, total_logs = await self.bd.fetch_one(q6.contar_estatisticas_e_logs)
+        if (produtos, total_estatisticas) != (produtos_logs, total_logs):
+            await self.reconstruir()
+
+    def comandos_somar(
+            self,
+            id_produto: int,
+            quantidade: str,
+            preco: float,
+            preco_operacao: float,
+            saving: float,
+            menor_valor: float,
+            data: str
+        ) -> List[Tuple[str, dict]]:
+        return [(q6.somar_estatisticas_produto, {
+            "produto_id": id_produto,
+            "quantidade": float(quantidade),
+            "preco": float(preco),
+            "preco_operacao": preco_operacao,
+            "saving": saving,
+            "menor_valor": menor_valor,
+            "data": data
+        })]
+
+    def comandos_subtrair(
+            self,
+            id_produto: int,
+            quantidade: str,
+            preco: float,
+            preco_operacao: float,
+            saving: float,
+            menor_valor: float
+        ) -> List[Tuple[str, Union[dict, tuple]]]:
+        return [
+            (q6.subtrair_estatisticas_produto, {
+                "produto_id": id_produto,
+                "quantidade": float(quantidade),
+                "preco": float(preco),
+                "preco_operacao": preco_operacao,
+                "saving": saving,
+                "menor_valor": menor_valor
+            }),
+            (q6.apagar_estatisticas_vazias, (id_produto,))
+        ]
+
+
+class ControleAnomalias:
+    def __init__(self) -> None:
+        self.bd = BancoDeDados("db_app6.db")
+
+    async def obter(self, id_produto: int, id_fornecedor: int) -> AcumuladorPreco:
+        registro = await self.bd.fetch_one(q6.obter_estatisticas_preco, (id_produto, id_fornecedor))
+        return AcumuladorPreco.de_registro(registro)
+
+    async def reprocessar(self) -> None:
+        registros = await self.bd.fetch_all(q6.obter_precos_historico)
+        anomalias, estatisticas = MotorAnomaliasPreco().reprocessar(registros)
+        await self.bd.execute_transaction([
+            ("DELETE FROM anomalia_preco;", None),
+            ("DELETE FROM estatisticas_preco;", None),
+            *[(q6.registrar_anomalia_preco, anomalia) for anomalia in anomalias],
+            *[(q6.salvar_estatisticas_preco, estatistica) for estatistica in estatisticas]
+        ])
+
+    async def comandos_reprocessar(self, id_produto: int, id_fornecedor: int, id_log_removido: int) -> List[Tuple[str, tuple]]:
+        registros = await self.bd.fetch_all(
+            q6.obter_precos_historico_fornecedor, (id_produto, id_fornecedor, id_log_removido)
+        )
+        anomalias, estatisticas = MotorAnomaliasPreco().reprocessar(registros)
+        return [
+            (q6.apagar_anomalias_fornecedor, (id_produto, id_fornecedor)),
+            (q6.apagar_estatisticas_preco, (id_produto, id_fornecedor)),
+            *[(q6.registrar_anomalia_preco, anomalia) for anomalia in anomalias],
+            *[(q6.salvar_estatisticas_preco, estatistica) for estatistica in estatisticas]
+        ]
+
+    async def reprocessar_se_vazio(self) -> None:
+        total_estatisticas, total_logs = await self.bd.fetch_one(q6.contar_estatisticas_preco_e_logs)
+        if total_logs and not total_estatisticas:
+            await self.reprocessar()
+
+
+class ControleScorecard:
+    cache: Dict[int, AcumuladorFornecedor] = {}
+    carregado = False
+
+    def __init__(self) -> None:
+        self.bd = BancoDeDados("db_app6.db")
+
+    async def carregar(self) -> None:
+        if ControleScorecard.carregado:
+            return
+        registros = await self.bd.fetch_all(q6.obter_scorecards_fornecedores)
+        self.cache.clear()
+        for registro in registros:
+            self.cache[registro[0]] = AcumuladorFornecedor.de_registro(registro[1:])
+        ControleScorecard.carregado = True
+
+    async def obter(self, id_fornecedor: int) -> AcumuladorFornecedor:
+        scorecard = self.cache.get(id_fornecedor)
+        if scorecard is None:
+            registro = await self.bd.fetch_one(q6.obter_scorecard_fornecedor, (id_fornecedor,))
+            scorecard = AcumuladorFornecedor.de_registro(registro)
+            if registro is not None:
+                self.cache[id_fornecedor] = scorecard
+        return scorecard
+
+    async def obter_varios(self, ids_fornecedores: List[int]) -> Dict[int, AcumuladorFornecedor]:
+        await self.carregar()
+        return {id: self.cache.get(id, AcumuladorFornecedor()) for id in ids_fornecedores}
+
+    def armazenar(self, id_fornecedor: int, scorecard: AcumuladorFornecedor) -> None:
+        self.cache[id_fornecedor] = scorecard
+
+    def invalidar(self, id_fornecedor: int) -> None:
+        self.cache.pop(id_fornecedor, None)
+
+    def comandos_recalcular(self, id_fornecedor: int) -> List[Tuple[str, tuple]]:
+        return [
+            (q6.apagar_scorecard_fornecedor, (id_fornecedor,)),
+            (q6.calcular_scorecard_fornecedores, {"fornecedor": id_fornecedor})
+        ]
+
+    async def reconstruir(self) -> None:
+        await self.bd.execute_transaction([
+            ("DELETE FROM scorecard_fornecedor;", None),
+            (q6.calcular_scorecard_fornecedores, {"fornecedor": None})
+        ])
+        ControleScorecard.carregado = False
+
+    async def reconstruir_se_vazio(self) -> None:
+        total_scorecards, total_logs = await self.bd.fetch_one(q6.contar_scorecards_e_logs)
+        if total_logs and not total_scorecards:
+            await self.reconstruir()
 
 
 class LogProduto:
@@ -21,14 +244,37 @@ class LogProduto:
             quantidade: str,
             data_operacao: str,
             marca: str,
-            menor_preco: float
+            menor_preco: float,
+            estatisticas_preco: Optional[AcumuladorPreco] = None
         ) -> None:
         preco_operacao = self.calcular_preco_operacao(preco_compra, quantidade)
         saving = self.calcular_saving(preco_cadastrado, quantidade, preco_operacao)
-        await self.bd.execute(
-            q6.criar_log,
-            (id_produto, id_fornecedor, preco_compra, quantidade, preco_operacao, data_operacao, marca, saving, menor_preco)
-        )
+        comandos = [
+            (
+                q6.criar_log,
+                (id_produto, id_fornecedor, preco_compra, quantidade, preco_operacao, data_operacao, marca, saving, menor_preco)
+            )
+        ]
+        if estatisticas_preco is None:
+            preco_atualizado = await ControleAnomalias().obter(id_produto, id_fornecedor)
+        else:
+            preco_atualizado = copy(estatisticas_preco)
+        tipo = preco_atualizado.classificar(preco_compra)
+        if tipo:
+            comandos.append((q6.registrar_anomalia_ultimo_log, (preco_atualizado.escore(preco_compra), tipo)))
+        controle_scorecard = ControleScorecard()
+        scorecard = copy(await controle_scorecard.obter(int(id_fornecedor)))
+        scorecard.adicionar(preco_compra, preco_operacao, saving, menor_preco, preco_atualizado.ultimo_preco, data_operacao)
+        comandos.append((q6.salvar_scorecard_fornecedor, scorecard.parametros(int(id_fornecedor))))
+        preco_atualizado.adicionar(preco_compra)
+        comandos.append((q6.salvar_estatisticas_preco, preco_atualizado.parametros(id_produto, id_fornecedor)))
+        comandos.extend(ControleEstatisticas().comandos_somar(
+            id_produto, quantidade, preco_compra, preco_operacao, saving, menor_preco, data_operacao
+        ))
+        await self.bd.execute_transaction(comandos)
+        controle_scorecard.armazenar(int(id_fornecedor), scorecard)
+        if estatisticas_preco is not None:
+            estatisticas_preco.adicionar(preco_compra)
 
     async def criar_log_item_variavel(
         self,
@@ -64,11 +310,25 @@ class ControleLog:
         self.bd = BancoDeDados("db_app6.db")
 
     async def apagar_log_compra(self) -> None:
-        await self.bd.execute(q6.apagar_log, (self.id_log,))
+        log = await self.bd.fetch_one(q6.obter_log, (self.id_log,))
+        if log is not None:
+            id_produto, quantidade, preco, preco_operacao, saving, menor_valor, id_fornecedor = log
+            controle_scorecard = ControleScorecard()
+            comandos_anomalias = await ControleAnomalias().comandos_reprocessar(id_produto, id_fornecedor, self.id_log)
+            await self.bd.execute_transaction([
+                *comandos_anomalias,
+                (q6.apagar_log, (self.id_log,)),
+                *ControleEstatisticas().comandos_subtrair(id_produto, quantidade, preco, preco_operacao, saving, menor_valor),
+                *controle_scorecard.comandos_recalcular(id_fornecedor)
+            ])
+            controle_scorecard.invalidar(id_fornecedor)
         await self.visualizacao.atualizar_dados()
 
 
 class ControleFornecedor:
+    detalhes: "OrderedDict[int, ModeloFornecedor]" = OrderedDict()
+    maximo_detalhes = 32
+
     def __init__(
         self,
         modelo: Optional[ModeloFornecedor]=None,
@@ -112,9 +372,29 @@ class ControleFornecedor:
     
     async def obter_fornecedores(self) -> None:
         return await self.bd.fetch_all(q6.obter_fornecedores)
+
+    async def obter_pagina(self, ultimo: Tuple[str, int], limite: int) -> List[ModeloFornecedor]:
+        dados = await self.bd.fetch_all(q6.obter_pagina_fornecedores, (*ultimo, limite))
+        return [ModeloFornecedor(*dado) for dado in dados]
+
+    async def obter_detalhes(self, id: int) -> Optional[ModeloFornecedor]:
+        fornecedor = self.detalhes.get(id)
+        if fornecedor is not None:
+            self.detalhes.move_to_end(id)
+            return fornecedor
+        dado = await self.bd.fetch_one(q6.obter_dados_fornecedor, (id,))
+        if dado is None:
+            return None
+        fornecedor = ModeloFornecedor(*dado)
+        self.detalhes[id] = fornecedor
+        if len(self.detalhes) > self.maximo_detalhes:
+            self.detalhes.popitem(last=False)
+        return fornecedor
     
     async def apagar_fornecedor(self) -> None:
         await self.bd.execute(q6.apagar_fornecedor, (self.modelo.id,))
+        self.detalhes.pop(self.modelo.id, None)
+        matriz_precos.remover_fornecedor(self.modelo.id)
         await self.visualizacao.atualizar_grade()
     
     def formatar_cep(self, cep: str) -> str:
@@ -152,7 +432,7 @@ class ControleItem:
             await self.criar_registro_consumo(item_id)
             self.visualizacao[1].salvo()
             await asyncio.sleep(1)
-            await self.visualizacao[0].atualizar_grade()
+            catalogo_produtos.adicionar(ModeloItem(item_id, self.modelo.nome, self.modelo.medida, self.modelo.categoria))
         finally:
             self.visualizacao[1].limpar()
 
@@ -162,7 +442,8 @@ class ControleItem:
 
     async def apagar_item(self) -> None:
         await self.bd.execute(q6.apagar_resgistro_produto, (self.modelo.id,))
-        await self.visualizacao.atualizar_grade()
+        matriz_precos.remover_produto(self.modelo.id)
+        catalogo_produtos.remover(self.modelo.id)
 
     async def salvar_log_compra(
             self,
@@ -173,41 +454,71 @@ class ControleItem:
             quantidade: str,
             marca: str,
             data: str,
-            menor_preco: float
+            menor_preco: float,
+            estatisticas_preco: Optional[AcumuladorPreco] = None
         ) -> None:
         if all([quantidade, fornecedor, marca, preco_cadastrado, preco_compra, data]):
             try:
                 quantidade, preco_compra, data_formatada = self.formatar_valores(quantidade, preco_compra, data)
-                aumentou = await self.verificar_aumento_preco(relacao_id, preco_cadastrado, preco_compra)
+                anomalia = estatisticas_preco.classificar(preco_compra) if estatisticas_preco is not None else 0
+                aumentou = False
+                if not anomalia:
+                    aumentou = await self.verificar_aumento_preco(relacao_id, preco_cadastrado, preco_compra)
                 if aumentou:
-                    self.visualizacao.dialogo.generico(
-                        ft.Icons.INFO_OUTLINE_ROUNDED,
-                        "O preço desse produto aumentou\ne será atualizado automaticamente."
-                    )
-                    await asyncio.sleep(4)
-                    self.visualizacao.dialogo.limpar()
-                    
-                    if menor_preco == preco_cadastrado:
+                    menor_atual = matriz_precos.menor_preco(self.modelo.id)
+                    if menor_atual is not None:
+                        menor_preco = menor_atual
+                    elif menor_preco == preco_cadastrado:
                         menor_preco = preco_compra
 
                     preco_cadastrado = preco_compra
 
                 self.visualizacao.dialogo.salvando()
                 await LogProduto().criar_log(
-                    self.modelo.id, fornecedor, preco_cadastrado, preco_compra, quantidade, data_formatada, marca, menor_preco
+                    self.modelo.id,
+                    fornecedor,
+                    preco_cadastrado,
+                    preco_compra,
+                    quantidade,
+                    data_formatada,
+                    marca,
+                    menor_preco,
+                    estatisticas_preco
                 )
             except Exception as e:
                 print(e)
                 self.visualizacao.dialogo.generico(ft.Icons.ERROR, "Houve um erro ao salvar")
                 await asyncio.sleep(1)
             else:
-                self.visualizacao.dialogo.salvo()
-                await asyncio.sleep(1)
+                await self.notificar_log_salvo(aumentou, anomalia)
             finally:
                 self.visualizacao.dialogo.limpar()
         else:
             await self.visualizacao.mostrar_erro_campo_vazio()
 
+    async def notificar_log_salvo(self, aumentou: bool, anomalia: int) -> None:
+        if anomalia > 0:
+            self.visualizacao.dialogo.generico(
+                ft.Icons.WARNING_AMBER_ROUNDED,
+                "Salvo, mas o preço está muito acima\ndo histórico deste fornecedor."
+            )
+            await asyncio.sleep(3)
+        elif anomalia < 0:
+            self.visualizacao.dialogo.generico(
+                ft.Icons.WARNING_AMBER_ROUNDED,
+                "Salvo, mas o preço está muito abaixo\ndo histórico. Confira o valor."
+            )
+            await asyncio.sleep(3)
+        elif aumentou:
+            self.visualizacao.dialogo.generico(
+                ft.Icons.INFO_OUTLINE_ROUNDED,
+                "O preço desse produto aumentou\ne foi atualizado automaticamente."
+            )
+            await asyncio.sleep(2)
+        else:
+            self.visualizacao.dialogo.salvo()
+            await asyncio.sleep(1)
+
     async def salvar_log_compra_item_variavel(
             self,
             nome: str,
@@ -244,6 +555,7 @@ class ControleItem:
     async def verificar_aumento_preco(self, relacao_id: int, preco_cadastrado: str, preco_compra: str):
         if preco_compra > preco_cadastrado:
             await self.bd.execute(q6.atualizar_preco_relacao, (preco_compra, relacao_id))
+            matriz_precos.atualizar_preco(int(relacao_id), preco_compra)
             return True
         return False
 
@@ -255,14 +567,18 @@ class ControleItem:
 
     async def buscar_fornecedores_relacao(self) -> list:
         return await ControleFornecedor().buscar_fornecedores_relacao(self.modelo.id)
+
+    async def buscar_fornecedores_relacao_estatisticas(self) -> list:
+        return await self.bd.fetch_all(q6.buscar_relacao_produto_fornecedor_estatisticas, (self.modelo.id,))
     
     async def criar_relacao_produto_fornecedor(self, fornecedor_id: int, marca: str, preco: float) -> None:
         marca_formatada = marca if marca else "-"
         preco_formatado = self.formatar_valor(preco)
-        await self.bd.execute(
+        id_relacao = await self.bd.execute_return_id(
             q6.criar_relacao_produto_fornecedor,
             (self.modelo.id, fornecedor_id, preco_formatado, marca_formatada)
             )
+        matriz_precos.definir(id_relacao, self.modelo.id, int(fornecedor_id), preco_formatado)
         await self.visualizacao.atualizar_tabela()
 
     async def obter_fornecedores(self) -> list:
@@ -270,11 +586,13 @@ class ControleItem:
     
     async def apagar_relacao_produto_fornecedor(self, id_relacao: int) -> None:
         await self.bd.execute(q6.apagar_relacao_produto_fornecedor, (id_relacao,))
+        matriz_precos.remover(id_relacao)
         await self.visualizacao.atualizar_tabela()
     
     async def atualizar_preco_relacao(self, preco: float, id_relacao: int) -> None:
         preco = self.formatar_valor(preco)
         await self.bd.execute(q6.atualizar_preco_relacao, (preco, id_relacao))
+        matriz_precos.atualizar_preco(id_relacao, preco)
         await self.visualizacao.atualizar_tabela()
 
     async def atualizar_consumo(self, consumo: str, dia_semana: int) -> None:
@@ -299,17 +617,82 @@ class ControleItem:
             path: str
         ) -> None:
         armazenamento = self.formatar_valor(armazenamento)
-        variaveis = [armazenamento, dias, qtd_media, freq, preco_medio, perdas, path]
+        controle_imagens = ControleImagens()
+        miniatura = await controle_imagens.gerar_miniatura(path)
+        variaveis = [armazenamento, dias, qtd_media, freq, preco_medio, perdas, path, miniatura]
         await self.bd.execute(
             q6.inserir_valores_infos, (
                 self.modelo.id, *variaveis, *variaveis
             )
         )
+        catalogo_produtos.atualizar(self.modelo.id, path=miniatura or path)
+        await controle_imagens.limpar_cache()
 
     def formatar_valor(self, valor: Union[int, float]) -> str:
         return str(valor).replace(".", "").replace(",", ".")
     
 
+class ControleListaCompras:
+    def __init__(self) -> None:
+        self.bd = BancoDeDados("db_app6.db")
+
+    async def buscar_infos_produtos(self, ids_produtos: List[int]) -> list:
+        ids = json.dumps([int(id) for id in ids_produtos])
+        return await self.bd.fetch_all(q6.buscar_infos_produtos_lista, (ids,))
+
+    async def buscar_precos_fornecedores(self, ids_produtos: List[int]) -> list:
+        ids = json.dumps([int(id) for id in ids_produtos])
+        return await self.bd.fetch_all(q6.buscar_precos_fornecedores, (ids,))
+
+    async def propor_reposicao(self, horizonte: int) -> list:
+        from reposicao import MotorReposicao
+        registros = await self.bd.fetch_all(q6.obter_dados_reposicao)
+        return MotorReposicao().propor(registros, horizonte)
+
+    async def criar_lista(self, nome: str, linhas: List[ModeloLinhaCompra]) -> int:
+        agora = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        lista_id = await self.bd.execute_return_id(q6.criar_lista_compra, (nome, agora, agora))
+        await self.salvar_linhas(lista_id, linhas)
+        return lista_id
+
+    async def salvar_linhas(self, lista_id: int, linhas: List[ModeloLinhaCompra]) -> None:
+        agora = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        await self.bd.execute_transaction([
+            *[(q6.salvar_item_lista_compra, self.parametros_linha(lista_id, linha)) for linha in linhas],
+            (q6.atualizar_data_lista_compra, (agora, lista_id))
+        ])
+
+    async def obter_listas(self) -> list:
+        return await self.bd.fetch_all(q6.obter_listas_compra)
+
+    async def carregar_lista(self, lista_id: int) -> List[ModeloLinhaCompra]:
+        alterados = dict(await self.bd.fetch_all(q6.obter_precos_alterados_lista_compra, (lista_id,)))
+        if alterados:
+            await self.bd.execute_transaction([
+                (q6.reprecificar_item_lista_compra, (preco, preco, lista_id, id_produto))
+                for id_produto, preco in alterados.items()
+            ])
+        registros = await self.bd.fetch_all(q6.obter_itens_lista_compra, (lista_id,))
+        return [ModeloLinhaCompra(*registro) for registro in registros]
+
+    async def apagar_lista(self, lista_id: int) -> None:
+        await self.bd.execute(q6.apagar_lista_compra, (lista_id,))
+
+    def parametros_linha(self, lista_id: int, linha: ModeloLinhaCompra) -> tuple:
+        return (
+            lista_id,
+            linha.id,
+            linha.nome,
+            linha.fornecedor,
+            linha.marca,
+            linha.preco,
+            linha.quantidade,
+            linha.medida,
+            linha.id_relacao,
+            linha.preco_relacao
+        )
+
+
 class ControleGradeItem:
     def __init__(self, pagina: ft.Control) -> None:
         self.pagina = pagina
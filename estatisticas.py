@@ -0,0 +1,342 @@
+from datetime import datetime
+from typing import Optional, Tuple
+
+
+class AcumuladorEstatisticas:
+    def __init__(
+            self,
+            n: int = 0,
+            soma_quantidade: float = 0.0,
+            soma_quadrado_quantidade: float = 0.0,
+            media_quantidade: float = 0.0,
+            m2_quantidade: float = 0.0,
+            soma_preco: float = 0.0,
+            soma_quadrado_preco: float = 0.0,
+            media_preco: float = 0.0,
+            m2_preco: float = 0.0,
+            soma_preco_operacao: float = 0.0,
+            soma_saving: float = 0.0,
+            soma_quantidade_menor_valor: float = 0.0,
+            primeira_data: Optional[str] = None,
+            ultima_data: Optional[str] = None
+        ) -> None:
+        self.n = n
+        self.soma_quantidade = soma_quantidade
+        self.soma_quadrado_quantidade = soma_quadrado_quantidade
+        self.media_quantidade = media_quantidade
+        self.m2_quantidade = m2_quantidade
+        self.soma_preco = soma_preco
+        self.soma_quadrado_preco = soma_quadrado_preco
+        self.media_preco = media_preco
+        self.m2_preco = m2_preco
+        self.soma_preco_operacao = soma_preco_operacao
+        self.soma_saving = soma_saving
+        self.soma_quantidade_menor_valor = soma_quantidade_menor_valor
+        self.primeira_data = primeira_data
+        self.ultima_data = ultima_data
+
+    @classmethod
+    def de_registro(cls, registro: Optional[tuple]) -> "AcumuladorEstatisticas":
+        if registro is None:
+            return cls()
+        return cls(*registro)
+
+    def adicionar(
+            self,
+            quantidade: float,
+            preco: float,
+            preco_operacao: float,
+            saving: float,
+            menor_valor: float,
+            data: str
+        ) -> None:
+        quantidade = float(quantidade)
+        self.n += 1
+        self.media_quantidade, self.m2_quantidade = self.__welford_adicionar(
+            self.media_quantidade, self.m2_quantidade, quantidade
+        )
+        self.media_preco, self.m2_preco = self.__welford_adicionar(self.media_preco, self.m2_preco, preco)
+        self.__somar(quantidade, preco, preco_operacao, saving, menor_valor, 1)
+
+        if self.primeira_data is None or data < self.primeira_data:
+            self.primeira_data = data
+        if self.ultima_data is None or data > self.ultima_data:
+            self.ultima_data = data
+
+    def remover(
+            self,
+            quantidade: float,
+            preco: float,
+            preco_operacao: float,
+            saving: float,
+            menor_valor: float
+        ) -> None:
+        if self.n <= 1:
+            self.__init__()
+            return
+
+        quantidade = float(quantidade)
+        self.n -= 1
+        self.media_quantidade, self.m2_quantidade = self.__welford_remover(
+            self.media_quantidade, self.m2_quantidade, quantidade
+        )
+        self.media_preco, self.m2_preco = self.__welford_remover(self.media_preco, self.m2_preco, preco)
+        self.__somar(quantidade, preco, preco_operacao, saving, menor_valor, -1)
+
+    def __somar(
+            self,
+            quantidade: float,
+            preco: float,
+            preco_operacao: float,
+            saving: float,
+            menor_valor: float,
+            sinal: int
+        ) -> None:
+        self.soma_quantidade += sinal * quantidade
+        self.soma_quadrado_quantidade += sinal * quantidade * quantidade
+        self.soma_preco += sinal * preco
+        self.soma_quadrado_preco += sinal * preco * preco
+        self.soma_preco_operacao += sinal * preco_operacao
+        self.soma_saving += sinal * saving
+        self.soma_quantidade_menor_valor += sinal * quantidade * menor_valor
+
+    def __welford_adicionar(self, media: float, m2: float, valor: float) -> tuple:
+        delta = valor - media
+        media += delta / self.n
+        m2 += delta * (valor - media)
+        return media, m2
+
+    def __welford_remover(self, media: float, m2: float, valor: float) -> tuple:
+        media_anterior = media
+        media = (media * (self.n + 1) - valor) / self.n
+        m2 -= (valor - media) * (valor - media_anterior)
+        return media, max(m2, 0.0)
+
+    @property
+    def frequencia(self) -> float:
+        if self.n < 2:
+            return 0
+        inicio = datetime.strptime(self.primeira_data, "%Y-%m-%d")
+        fim = datetime.strptime(self.ultima_data, "%Y-%m-%d")
+        return (fim - inicio).days / (self.n - 1)
+
+    @property
+    def perda(self) -> float:
+        perda = self.soma_preco_operacao - self.soma_quantidade_menor_valor + self.soma_saving
+        return perda if perda > 0 else 0
+
+    @property
+    def variancia_preco(self) -> float:
+        return self.m2_preco / (self.n - 1) if self.n > 1 else 0.0
+
+    @property
+    def variancia_quantidade(self) -> float:
+        return self.m2_quantidade / (self.n - 1) if self.n > 1 else 0.0
+
+    def estatisticas_cartoes(self) -> tuple:
+        return (
+            self.frequencia,
+            self.media_quantidade,
+            self.media_preco,
+            self.soma_quantidade,
+            self.soma_preco_operacao,
+            self.perda
+        )
+
+    def parametros(self, produto_id: int) -> tuple:
+        return (
+            produto_id,
+            self.n,
+            self.soma_quantidade,
+            self.soma_quadrado_quantidade,
+            self.media_quantidade,
+            self.m2_quantidade,
+            self.soma_preco,
+            self.soma_quadrado_preco,
+            self.media_preco,
+            self.m2_preco,
+            self.soma_preco_operacao,
+            self.soma_saving,
+            self.soma_quantidade_menor_valor,
+            self.primeira_data,
+            self.ultima_data
+        )
+
+
+class AcumuladorFornecedor:
+    def __init__(
+            self,
+            compras: int = 0,
+            gasto_total: float = 0.0,
+            soma_saving: float = 0.0,
+            soma_desvio: float = 0.0,
+            n_desvio: int = 0,
+            aumentos: int = 0,
+            comparacoes: int = 0,
+            ultima_compra: Optional[str] = None
+        ) -> None:
+        self.compras = compras
+        self.gasto_total = gasto_total
+        self.soma_saving = soma_saving
+        self.soma_desvio = soma_desvio
+        self.n_desvio = n_desvio
+        self.aumentos = aumentos
+        self.comparacoes = comparacoes
+        self.ultima_compra = ultima_compra
+
+    @classmethod
+    def de_registro(cls, registro: Optional[tuple]) -> "AcumuladorFornecedor":
+        if registro is None:
+            return cls()
+        return cls(*registro)
+
+    def adicionar(
+            self,
+            preco: float,
+            preco_operacao: float,
+            saving: float,
+            menor_valor: Optional[float],
+            preco_anterior: Optional[float],
+            data: str
+        ) -> None:
+        self.compras += 1
+        self.gasto_total += preco_operacao
+        self.soma_saving += saving
+        if menor_valor:
+            self.soma_desvio += (preco - menor_valor) / menor_valor
+            self.n_desvio += 1
+        if preco_anterior is not None:
+            self.comparacoes += 1
+            self.aumentos += preco > preco_anterior
+        if self.ultima_compra is None or data > self.ultima_compra:
+            self.ultima_compra = data
+
+    @property
+    def desvio_medio(self) -> float:
+        return self.soma_desvio / self.n_desvio * 100 if self.n_desvio else 0.0
+
+    @property
+    def frequencia_aumento(self) -> float:
+        return self.aumentos / self.comparacoes * 100 if self.comparacoes else 0.0
+
+    def parametros(self, fornecedor_id: int) -> tuple:
+        return (
+            fornecedor_id,
+            self.compras,
+            self.gasto_total,
+            self.soma_saving,
+            self.soma_desvio,
+            self.n_desvio,
+            self.aumentos,
+            self.comparacoes,
+            self.ultima_compra
+        )
+
+
+class AcumuladorPreco:
+    alfa = 0.3
+    limite_escore = 3.0
+    limite_variacao = 0.2
+    minimo_observacoes = 3
+    desvio_minimo = 0.02
+
+    def __init__(self, n: int = 0, media: float = 0.0, variancia: float = 0.0, ultimo_preco: Optional[float] = None) -> None:
+        self.n = n
+        self.media = media
+        self.variancia = variancia
+        self.ultimo_preco = ultimo_preco
+
+    @classmethod
+    def de_registro(cls, registro: Optional[tuple]) -> "AcumuladorPreco":
+        if registro is None or registro[0] is None:
+            return cls()
+        return cls(*registro)
+
+    def adicionar(self, preco: float) -> None:
+        if self.n == 0:
+            self.media = preco
+            self.variancia = 0.0
+        else:
+            diferenca = preco - self.media
+            incremento = self.alfa * diferenca
+            self.media += incremento
+            self.variancia = (1 - self.alfa) * (self.variancia + diferenca * incremento)
+        self.n += 1
+        self.ultimo_preco = preco
+
+    def escore(self, preco: float) -> float:
+        if self.n == 0 or self.media <= 0:
+            return 0.0
+        desvio = max(self.variancia ** 0.5, self.media * self.desvio_minimo)
+        return (preco - self.media) / desvio
+
+    def classificar(self, preco: float) -> int:
+        if self.n < self.minimo_observacoes or self.media <= 0:
+            return 0
+        escore = self.escore(preco)
+        variacao = preco / self.media - 1
+        if abs(escore) >= self.limite_escore and abs(variacao) >= self.limite_variacao:
+            return 1 if escore > 0 else -1
+        return 0
+
+    def parametros(self, id_produto: int, id_fornecedor: int) -> tuple:
+        return (id_produto, id_fornecedor, self.n, self.media, self.variancia, self.ultimo_preco)
+
+
+class MotorAnomaliasPreco:
+    def reprocessar(self, registros: list) -> Tuple[list, list]:
+        if not registros:
+            return [], []
+        import numpy as np
+
+        dados = np.array(registros, dtype=float)
+        ordem = np.lexsort((dados[:, 0], dados[:, 4], dados[:, 2], dados[:, 1]))
+        dados = dados[ordem]
+        ids, produtos, fornecedores, precos = dados[:, 0], dados[:, 1], dados[:, 2], dados[:, 3]
+
+        pares = np.stack([produtos, fornecedores], axis=1)
+        inicio_grupo = np.ones(len(dados), dtype=bool)
+        inicio_grupo[1:] = np.any(pares[1:] != pares[:-1], axis=1)
+        indices_inicio = np.flatnonzero(inicio_grupo)
+        tamanhos = np.diff(np.append(indices_inicio, len(dados)))
+        posicao = np.arange(len(dados)) - np.repeat(indices_inicio, tamanhos)
+
+        total_grupos = len(indices_inicio)
+        media = np.zeros(total_grupos)
+        variancia = np.zeros(total_grupos)
+        escores = np.zeros(len(dados))
+        classes = np.zeros(len(dados), dtype=int)
+        grupo = np.repeat(np.arange(total_grupos), tamanhos)
+
+        for passo in range(int(tamanhos.max())):
+            linhas = np.flatnonzero(posicao == passo)
+            g = grupo[linhas]
+            preco = precos[linhas]
+
+            if passo >= AcumuladorPreco.minimo_observacoes:
+                desvio = np.maximum(np.sqrt(variancia[g]), media[g] * AcumuladorPreco.desvio_minimo)
+                escore = np.divide(preco - media[g], desvio, out=np.zeros_like(preco), where=desvio > 0)
+                variacao = np.divide(preco, media[g], out=np.ones_like(preco), where=media[g] > 0) - 1
+                anomalo = (np.abs(escore) >= AcumuladorPreco.limite_escore) & (np.abs(variacao) >= AcumuladorPreco.limite_variacao)
+                escores[linhas] = escore
+                classes[linhas] = np.where(anomalo, np.sign(escore), 0)
+
+            if passo == 0:
+                media[g] = preco
+                variancia[g] = 0.0
+            else:
+                diferenca = preco - media[g]
+                incremento = AcumuladorPreco.alfa * diferenca
+                media[g] += incremento
+                variancia[g] = (1 - AcumuladorPreco.alfa) * (variancia[g] + diferenca * incremento)
+
+        anomalias = [
+            (int(ids[i]), float(escores[i]), int(classes[i]))
+            for i in np.flatnonzero(classes)
+        ]
+        ultimos = indices_inicio + tamanhos - 1
+        estatisticas = [
+            (int(produtos[u]), int(fornecedores[u]), int(tamanhos[i]), float(media[i]), float(variancia[i]), float(precos[u]))
+            for i, u in enumerate(ultimos)
+        ]
+        return anomalias, estatisticas
@@ -0,0 +1,108 @@
+import asyncio
+import csv
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Sequence
+
+from openpyxl import Workbook
+from openpyxl.cell import WriteOnlyCell
+from openpyxl.styles import Font, PatternFill
+from openpyxl.utils import get_column_letter
+
+
+class ExportadorPlanilha:
+    formato_moeda = '"R$" #,##0.00'
+    preenchimento_destaque = PatternFill(start_color="C6EFCE", end_color="C6EFCE", fill_type="solid")
+    fonte_destaque = Font(color="006100", bold=True)
+
+    def __init__(
+            self,
+            colunas: List[str],
+            larguras: List[int],
+            colunas_moeda: Sequence[int] = (),
+            colunas_total: Sequence[int] = (),
+            rotulo_total: str = "valor total",
+            colunas_destaque_minimo: Sequence[int] = ()
+        ) -> None:
+        self.colunas = colunas
+        self.larguras = larguras
+        self.colunas_moeda = set(colunas_moeda)
+        self.colunas_total = list(colunas_total)
+        self.rotulo_total = rotulo_total
+        self.colunas_destaque_minimo = list(colunas_destaque_minimo)
+
+    async def exportar(self, nome_arquivo: str, linhas: Iterable[Sequence], formato: str = "xlsx") -> str:
+        nome_arquivo = self.adicionar_data_ao_nome(nome_arquivo, formato)
+        escrever = self.escrever_csv if formato == "csv" else self.escrever_xlsx
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(None, escrever, nome_arquivo, linhas)
+        return nome_arquivo
+
+    def escrever_xlsx(self, nome_arquivo: str, linhas: Iterable[Sequence]) -> None:
+        book = Workbook(write_only=True)
+        ws = book.create_sheet()
+        for i, largura in enumerate(self.larguras, start=1):
+            ws.column_dimensions[get_column_letter(i)].width = largura
+
+        ws.append(self.colunas)
+        totais = {i: 0.0 for i in self.colunas_total}
+        for linha in linhas:
+            self.somar(totais, linha)
+            destaques = self.indices_minimo(linha)
+            ws.append([self.criar_celula(ws, i, valor, i in destaques) for i, valor in enumerate(linha)])
+
+        linha_total = self.criar_linha_total(totais)
+        if linha_total:
+            ws.append([self.criar_celula(ws, i, valor) for i, valor in enumerate(linha_total)])
+        book.save(nome_arquivo)
+
+    def escrever_csv(self, nome_arquivo: str, linhas: Iterable[Sequence]) -> None:
+        with open(nome_arquivo, "w", newline="", encoding="utf-8-sig") as arquivo:
+            escritor = csv.writer(arquivo, delimiter=";")
+            escritor.writerow(self.colunas)
+            totais = {i: 0.0 for i in self.colunas_total}
+            for linha in linhas:
+                self.somar(totais, linha)
+                escritor.writerow([self.formatar_csv(valor) for valor in linha])
+
+            linha_total = self.criar_linha_total(totais)
+            if linha_total:
+                escritor.writerow([self.formatar_csv(valor) for valor in linha_total])
+
+    def criar_celula(self, ws, indice: int, valor, destacar: bool = False) -> WriteOnlyCell:
+        celula = WriteOnlyCell(ws, value=valor)
+        if indice in self.colunas_moeda and isinstance(valor, (int, float)):
+            celula.number_format = self.formato_moeda
+        if destacar:
+            celula.fill = self.preenchimento_destaque
+            celula.font = self.fonte_destaque
+        return celula
+
+    def indices_minimo(self, linha: Sequence) -> set:
+        valores = {i: linha[i] for i in self.colunas_destaque_minimo if isinstance(linha[i], (int, float))}
+        if not valores:
+            return set()
+        minimo = min(valores.values())
+        return {i for i, valor in valores.items() if valor == minimo}
+
+    def somar(self, totais: Dict[int, float], linha: Sequence) -> None:
+        for i in totais:
+            if isinstance(linha[i], (int, float)):
+                totais[i] += linha[i]
+
+    def criar_linha_total(self, totais: Dict[int, float]) -> Optional[list]:
+        if not totais:
+            return None
+        linha = ["-"] * len(self.colunas)
+        linha[0] = self.rotulo_total
+        for i, valor in totais.items():
+            linha[i] = round(valor, 2)
+        return linha
+
+    def formatar_csv(self, valor) -> str:
+        if isinstance(valor, float):
+            return str(round(valor, 3)).replace(".", ",")
+        return "" if valor is None else str(valor)
+
+    def adicionar_data_ao_nome(self, nome_arquivo: str, formato: str) -> str:
+        nome = nome_arquivo.rsplit(".", 1)[0]
+        return f"{nome}_{datetime.now().strftime('%d_%m_%Y')}.{formato}"
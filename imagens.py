@@ -0,0 +1,106 @@
+import asyncio
+import hashlib
+import logging
+import os
+from typing import Dict, Iterable, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class ProcessadorImagens:
+    pasta_assets = "assets"
+    pasta_miniaturas = "imagens/miniaturas"
+    tamanhos = {"pequena": 96, "media": 320}
+    qualidade = 80
+    limite_bytes = 20 * 1024 * 1024
+
+    def caminho_variante(self, miniatura: str, variante: str) -> str:
+        base = miniatura.rsplit("_", 1)[0]
+        return f"{base}_{self.tamanhos[variante]}.webp"
+
+    def absoluto(self, caminho: str) -> str:
+        return os.path.join(self.pasta_assets, caminho)
+
+    async def processar(self, caminho: Optional[str]) -> Optional[str]:
+        if not caminho:
+            return None
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, self.gerar, caminho)
+
+    async def limpar(self, em_uso: Iterable[str]) -> int:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, self.remover_orfaos, set(em_uso))
+
+    def gerar(self, caminho: str) -> Optional[str]:
+        origem = self.absoluto(caminho)
+        try:
+            with open(origem, "rb") as arquivo:
+                conteudo = arquivo.read()
+        except OSError:
+            return None
+
+        resumo = hashlib.sha256(conteudo).hexdigest()[:20]
+        destinos = {
+            variante: f"{self.pasta_miniaturas}/{resumo}_{tamanho}.webp"
+            for variante, tamanho in self.tamanhos.items()
+        }
+        faltantes = {variante: destino for variante, destino in destinos.items() if not os.path.exists(self.absoluto(destino))}
+        for variante, destino in destinos.items():
+            if variante not in faltantes:
+                os.utime(self.absoluto(destino))
+        if faltantes:
+            try:
+                self.redimensionar(origem, faltantes)
+            except (ImportError, OSError, ValueError):
+                logger.exception("Falha ao gerar miniaturas de %s", caminho)
+                return None
+        return destinos["pequena"]
+
+    def redimensionar(self, origem: str, destinos: Dict[str, str]) -> None:
+        from PIL import Image, ImageOps
+
+        os.makedirs(self.absoluto(self.pasta_miniaturas), exist_ok=True)
+        with Image.open(origem) as imagem:
+            imagem = ImageOps.exif_transpose(imagem)
+            imagem = imagem.convert("RGBA" if "A" in imagem.getbands() else "RGB")
+            for variante, destino in destinos.items():
+                tamanho = self.tamanhos[variante]
+                if variante == "pequena":
+                    reduzida = ImageOps.fit(imagem, (tamanho, tamanho), Image.Resampling.LANCZOS)
+                else:
+                    reduzida = imagem.copy()
+                    reduzida.thumbnail((tamanho, tamanho), Image.Resampling.LANCZOS)
+                temporario = self.absoluto(destino) + ".tmp"
+                reduzida.save(temporario, "WEBP", quality=self.qualidade)
+                os.replace(temporario, self.absoluto(destino))
+
+    def remover_orfaos(self, em_uso: set) -> int:
+        pasta = self.absoluto(self.pasta_miniaturas)
+        if not os.path.isdir(pasta):
+            return 0
+        protegidos = {
+            os.path.basename(self.caminho_variante(miniatura, variante))
+            for miniatura in em_uso if miniatura
+            for variante in self.tamanhos
+        }
+        arquivos = []
+        total = 0
+        for entrada in os.scandir(pasta):
+            if not entrada.is_file():
+                continue
+            info = entrada.stat()
+            total += info.st_size
+            if entrada.name not in protegidos:
+                arquivos.append((info.st_mtime, info.st_size, entrada.path))
+
+        removidos = 0
+        for _, tamanho, caminho in sorted(arquivos):
+            if total <= self.limite_bytes:
+                break
+            try:
+                os.remove(caminho)
+            except OSError:
+                continue
+            total -= tamanho
+            removidos += 1
+        return removidos
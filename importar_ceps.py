@@ -0,0 +1,15 @@
+import sys
+
+from acessorios import IndiceCep
+
+
+def main(argumentos: list) -> None:
+    if not argumentos:
+        print("uso: python importar_ceps.py <arquivo_csv> [arquivo_indice]")
+        sys.exit(1)
+    total = IndiceCep.importar(*argumentos[:2])
+    print(f"{total} CEPs importados")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
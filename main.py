@@ -1,22 +1,25 @@
+import time
+INICIO = time.perf_counter()
+
 import flet as ft
 import logging
-from typing import Optional, Callable, List
+import importlib
+import math
+from typing import TYPE_CHECKING, Optional, Callable, List, Iterator, Sequence
 import locale
 import asyncio
-import openpyxl
-from openpyxl.worksheet.dimensions import ColumnDimension, DimensionHolder
-from openpyxl.utils import get_column_letter
-from datetime import datetime
 import os
 from datetime import date
 
-from acessorios import BancoDeDados, Dialogo, BuscarCep, JanelaNotificacao, Utilidades
-from pagina_dash import PaginaDashboard
+from acessorios import BancoDeDados, Dialogo, BuscarCep, JanelaNotificacao, Utilidades, SeletorProdutos
 from modelos import ModeloFornecedor, ModeloItem
-from controles import ControleItem, ControleFornecedor, ControleGradeItem, ControlePagina, ControleVisualizacao
-from pagina_lista_compras import PaginaListacompras
-from pagina_fornecedores import PaginaFornecedores
+from controles import ControleItem, ControleFornecedor, ControleGradeItem, ControlePagina, ControleVisualizacao, ControleEsquema, ControleListaCompras, ControleBusca, ControleImagens
+from pagina_fornecedores import PaginaFornecedores, JanelaInfoFornecedor
 from pagina_itens import PaginaItens
+from catalogo import catalogo_produtos
+
+if TYPE_CHECKING:
+    from otimizacao import OtimizadorFornecedores
 
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
@@ -26,13 +29,18 @@ locale.setlocale(locale.LC_ALL, "pt_BR.UTF-8")
 
 
 class BarraPesquisa(ft.Container):
+    atraso = 0.25
+
     def __init__(self, controle_grade: ControleGradeItem) -> None:
         super().__init__()
         self.controle_grade = controle_grade
+        self.versao = 0
+        self.ultima_busca = ""
         self.field_item = ft.TextField(
             width=250,
             label="Nome do item",
             border="underline",
+            on_change=self.agendar_filtro,
             on_submit=self.filtrar
         )
         self.content = ft.Row([
@@ -40,13 +48,24 @@ class BarraPesquisa(ft.Container):
             ft.IconButton(icon=ft.Icons.SEARCH, on_click=self.filtrar, icon_color=ft.Colors.BLACK87)
         ])
 
+    def agendar_filtro(self, e: ft.ControlEvent) -> None:
+        self.versao += 1
+        self.page.run_task(self.aguardar_e_filtrar, self.versao)
+
+    async def aguardar_e_filtrar(self, versao: int) -> None:
+        await asyncio.sleep(self.atraso)
+        if versao == self.versao:
+            self.aplicar_filtro()
+
     def filtrar(self, e: ft.ControlEvent) -> None:
-        self.controle_grade.filtrar(self.field_item.value)
-        self.limpar_field()
+        self.versao += 1
+        self.aplicar_filtro()
 
-    def limpar_field(self) -> None:
-        self.field_item.value = None
-        self.field_item.update()
+    def aplicar_filtro(self) -> None:
+        busca = self.field_item.value or ""
+        if busca != self.ultima_busca:
+            self.ultima_busca = busca
+            self.controle_grade.filtrar(busca)
 
 
 class JanelaAdcionarItem(ft.AlertDialog):
@@ -279,7 +298,7 @@ class JanelaAdcionarFornecedor(ft.AlertDialog):
         if self.entradas[6].value:
             buscador = BuscarCep()
             self.dialogo.generico(ft.Icons.SEARCH, "Procurando")
-            dados = buscador.obter_dados(self.entradas[6].value)
+            dados = await buscador.obter_dados(self.entradas[6].value)
             if dados:
                 self.dialogo.generico(ft.Icons.CHECK, "Sucesso")
                 self.preencher_dados_endereco(dados)
@@ -297,76 +316,39 @@ class JanelaListaCompras(ft.AlertDialog):
     def __init__(self, controle_pagina: ControlePagina) -> None:
         super().__init__(modal=True)
         self.controle_pagina = controle_pagina
-        self.dropdown_categoria = ft.Dropdown(
-            label="Categoria",
-            width=200,
-            border="underline",
-            on_change=self.filtrar_categoria
-        )
-        self.tabela_produtos = ft.DataTable(
-            columns=[
-                ft.DataColumn(ft.Text("id"), visible=False),
-                ft.DataColumn(ft.Text("Nome")),
-                ft.DataColumn(ft.Text("Adicionar"))
-            ],
-            col=12
-        )
-        self.tabela_compra = ft.DataTable(
-            columns=[
-                ft.DataColumn(ft.Text("id"), visible=False),
-                ft.DataColumn(ft.Text("Nome")),
-                ft.DataColumn(ft.Text("Remover"))
-            ],
-            col=12
-        )
+        self.seletor = SeletorProdutos(ao_remover=self.descartar_sugestao)
         self.preencher_automatico = ft.Switch(
             label="Preencher Automático",
             value=True,
             label_position=ft.LabelPosition.LEFT
         )
-        self.lista_compras = []
+        self.field_custo_fornecedor = ft.TextField(
+            label="Custo por Fornecedor", width=150, border="underline", prefix_text="R$ "
+        )
+        self.field_maximo_fornecedores = ft.TextField(label="Máx. Fornecedores", width=130, border="underline")
+        self.field_dias_reposicao = ft.TextField(label="Repor em", width=120, border="underline", suffix_text="Dias", value="7")
+        self.dialogo = Dialogo()
+        self.quantidades_sugeridas = {}
         self.criar_conteudo()
 
     def criar_conteudo(self) -> None:
         self.content = ft.Container(
-            ft.Column([
-                ft.Container(
-                    ft.Row([
-                        self.dropdown_categoria,
-                        self.preencher_automatico
-                    ], alignment=ft.MainAxisAlignment.SPACE_BETWEEN),
-                    padding=ft.padding.only(left=5)
-                ),
-                ft.Container(
-                    ft.ResponsiveRow([
-                        ft.Column([
-                            ft.Card(
-                                ft.Container(
-                                    ft.Column([
-                                        ft.ResponsiveRow([
-                                            self.tabela_produtos
-                                        ])
-                                    ], scroll=ft.ScrollMode.ALWAYS),
-                                    padding=ft.padding.only(top=10, bottom=10), expand=True
-                                ),expand=True
-                            )
-                        ], col=6),
-                        ft.Column([
-                            ft.Card(
-                                ft.Container(
-                                    ft.Column([
-                                        ft.ResponsiveRow([
-                                            self.tabela_compra
-                                        ])
-                                    ], scroll=ft.ScrollMode.ALWAYS),
-                                    padding=ft.padding.only(top=10, bottom=10), expand=True
-                                ),
-                                expand=True
-                            )
-                        ], col=6)
-                    ]), expand=True
-                )
-            ]), width=650, height=500
+            ft.Stack([
+                ft.Column([
+                    ft.Container(
+                        ft.Row([
+                            self.field_dias_reposicao,
+                            ft.TextButton(text="Sugerir Reposição", icon=ft.Icons.AUTO_MODE, on_click=self.sugerir_reposicao),
+                            self.field_custo_fornecedor,
+                            self.field_maximo_fornecedores,
+                            self.preencher_automatico
+                        ], alignment=ft.MainAxisAlignment.SPACE_BETWEEN),
+                        padding=ft.padding.only(left=5)
+                    ),
+                    self.seletor
+                ]),
+                self.dialogo
+            ], alignment=ft.alignment.center), width=800, height=500
         )
         self.actions = [
             ft.TextButton(
@@ -381,215 +363,257 @@ class JanelaListaCompras(ft.AlertDialog):
             )
         ]
 
-    def adicionar_linha_tabela_itens(self, indice: int) -> None:
-        dados = self.dados[indice]
-        self.tabela_produtos.rows.append(
-            ft.DataRow(
-                cells=[
-                    ft.DataCell(ft.Text(dados[0]), visible=False),
-                    ft.DataCell(ft.Text(dados[1])),
-                    ft.DataCell(
-                        ft.IconButton(
-                            ft.Icons.ADD,
-                            on_click=lambda e, id=dados[0]: self.adicionar_item_lista_compra(id)
-                        )
-                    )
-                ]
+    async def sugerir_reposicao(self, e: ft.ControlEvent) -> None:
+        try:
+            horizonte = int(self.field_dias_reposicao.value or 0)
+        except ValueError:
+            await self.mostrar_erro("Dias de reposição inválidos")
+            return
+        propostas = await ControleListaCompras().propor_reposicao(horizonte)
+        for id, nome, quantidade, dias in propostas:
+            self.quantidades_sugeridas[id] = quantidade
+        self.seletor.adicionar_varios([proposta[0] for proposta in propostas])
+
+    def descartar_sugestao(self, id: int) -> None:
+        self.quantidades_sugeridas.pop(id, None)
+
+    async def mostrar_erro(self, mensagem: str) -> None:
+        self.dialogo.generico(ft.Icons.ERROR_OUTLINE, mensagem)
+        await asyncio.sleep(2)
+        self.dialogo.limpar()
+
+    async def criar_lista(self, e: ft.ControlEvent) -> None:
+        infos_produtos = self.seletor.itens()
+        if infos_produtos:
+            try:
+                otimizador = self.criar_otimizador()
+            except ValueError:
+                await self.mostrar_erro("Custo ou máximo de fornecedores inválido")
+                return
+            from pagina_lista_compras import PaginaListacompras
+            pagina = PaginaListacompras(
+                infos_produtos,
+                self.preencher_automatico.value,
+                otimizador=otimizador,
+                quantidades_sugeridas=self.quantidades_sugeridas
             )
-        )
-        self.tabela_produtos.update()
-
-    def adicionar_item_lista_compra(self, id: int) -> None:
-        if id not in self.lista_compras:
-            self.lista_compras.append(id)
-            for dado in self.dados:
-                if dado[0] == id:
-                    self.tabela_compra.rows.append(
-                        ft.DataRow(
-                            cells=[
-                                ft.DataCell(ft.Text(dado[0]), visible=False),
-                                ft.DataCell(ft.Text(dado[1])),
-                                ft.DataCell(
-                                    ft.IconButton(
-                                        ft.Icons.DELETE, on_click=lambda e, id=dado[0]: self.apagar_item_tabela_compra(id)
-                                    )
-                                )
-                            ]
-                        )
-                    )
-                    self.tabela_compra.update()
+            self.page.close(self)
+            self.controle_pagina.alterar_para_barra_voltar()
+            self.controle_pagina.add_acao_barra(pagina.acoes_barra())
+            self.controle_pagina.atualizar_pagina(pagina)
 
-    def apagar_registros_tabela_produtos(self) -> None:
-        self.tabela_produtos.rows.clear()
-        self.tabela_produtos.update()
+    def criar_otimizador(self) -> Optional["OtimizadorFornecedores"]:
+        from otimizacao import OtimizadorFornecedores
+        custo = self.field_custo_fornecedor.value.replace(",", ".") if self.field_custo_fornecedor.value else ""
+        maximo = self.field_maximo_fornecedores.value
+        if not custo and not maximo:
+            return None
+        custos_fixos = float(custo) if custo else 0.0
+        maximo_fornecedores = int(maximo) if maximo else None
+        if custos_fixos < 0 or (maximo_fornecedores is not None and maximo_fornecedores < 1):
+            raise ValueError("parâmetros do otimizador fora do intervalo")
+        return OtimizadorFornecedores(custos_fixos=custos_fixos, maximo_fornecedores=maximo_fornecedores)
 
-    def apagar_item_tabela_compra(self, id: int) -> None:
-        self.lista_compras.remove(id)
-        for linha in self.tabela_compra.rows:
-            if linha.cells[0].content.value == id:
-                self.tabela_compra.rows.remove(linha)
-        self.tabela_compra.update()
+    async def ler_dados(self) -> None:
+        await catalogo_produtos.carregar()
+        self.seletor.carregar([(produto.id, produto.nome, produto.categoria) for produto in catalogo_produtos.todos()])
 
-    def filtrar_categoria(self, e: ft.ControlEvent) -> None:
-        self.adicionar_registro_tabela_itens(e.data)
-
-    def adicionar_registro_tabela_itens(self, categoria: str) -> None:
-        self.apagar_registros_tabela_produtos()
-        for i, dado in enumerate(self.dados):
-            if categoria == dado[2]:
-                self.adicionar_linha_tabela_itens(i)
-
-    def adicionar_categorias_dropdown(self) -> None:
-        if self.dados:
-            cats = list(set(dado[2] for dado in self.dados))
-            self.dropdown_categoria.options = [
-                ft.dropdown.Option(value)
-                for value in cats
-            ]
-            self.dropdown_categoria.value = cats[0]
-            self.dropdown_categoria.update()
-            self.adicionar_registro_tabela_itens(cats[0])
+    def did_mount(self) -> None:
+        self.page.run_task(self.ler_dados)
 
-    async def ler_dados(self) -> None:
-        bd = BancoDeDados("db_app6.db")
-        self.dados = await bd.fetch_all("SELECT id, nome, categoria FROM produto;")
-        self.adicionar_categorias_dropdown()
-
-    def criar_lista(self, e: ft.ControlEvent) -> None:
-        if self.tabela_compra.rows:
-            infos_produtos = [
-                (row.cells[0].content.value, row.cells[1].content.value)
-                for row in self.tabela_compra.rows
-            ]
-            pagina = PaginaListacompras(infos_produtos, self.preencher_automatico.value)
-            self.page.close(self)
-            self.controle_pagina.alterar_para_barra_voltar()
-            self.controle_pagina.add_acao_barra(
-                ft.Container(
-                    ft.IconButton(ft.Icons.CREATE, on_click=pagina.criar_planilha),
-                    padding=ft.padding.only(right=20)
-                )
+
+class JanelaListasSalvas(ft.AlertDialog):
+    def __init__(self, controle_pagina: ControlePagina) -> None:
+        super().__init__(modal=True)
+        self.controle_pagina = controle_pagina
+        self.controle = ControleListaCompras()
+        self.tabela_listas = ft.DataTable(
+            columns=[
+                ft.DataColumn(ft.Text("Nome")),
+                ft.DataColumn(ft.Text("Atualizada")),
+                ft.DataColumn(ft.Text("Itens")),
+                ft.DataColumn(ft.Text("Abrir")),
+                ft.DataColumn(ft.Text("Apagar"))
+            ],
+            col=12
+        )
+        self.content = ft.Container(
+            ft.Column([
+                ft.ResponsiveRow([
+                    self.tabela_listas
+                ])
+            ], scroll=ft.ScrollMode.ALWAYS),
+            width=650, height=400
+        )
+        self.actions = [
+            ft.TextButton(
+                text="Fechar",
+                on_click=lambda e: self.page.close(self),
+                style=ft.ButtonStyle(bgcolor={ft.ControlState.HOVERED: ft.Colors.RED_100})
             )
-            self.controle_pagina.atualizar_pagina(pagina)
+        ]
+
+    def adicionar_linha(self, dado: tuple) -> None:
+        async def apagar_ao_clicar(e: ft.ControlEvent, id: int=dado[0]) -> None:
+            await self.apagar_lista(id)
+
+        self.tabela_listas.rows.append(
+            ft.DataRow(
+                cells=[
+                    ft.DataCell(ft.Text(dado[1])),
+                    ft.DataCell(ft.Text(dado[2])),
+                    ft.DataCell(ft.Text(dado[3])),
+                    ft.DataCell(ft.IconButton(ft.Icons.OPEN_IN_NEW, on_click=lambda e, id=dado[0]: self.abrir_lista(id))),
+                    ft.DataCell(ft.IconButton(ft.Icons.DELETE, on_click=apagar_ao_clicar))
+                ],
+                data=dado[0]
+            )
+        )
+
+    async def ler_dados(self) -> None:
+        self.tabela_listas.rows.clear()
+        for dado in await self.controle.obter_listas():
+            self.adicionar_linha(dado)
+        self.tabela_listas.update()
+
+    def abrir_lista(self, id: int) -> None:
+        from pagina_lista_compras import PaginaListacompras
+        pagina = PaginaListacompras([], False, lista_id=id)
+        self.page.close(self)
+        self.controle_pagina.alterar_para_barra_voltar()
+        self.controle_pagina.add_acao_barra(pagina.acoes_barra())
+        self.controle_pagina.atualizar_pagina(pagina)
+
+    async def apagar_lista(self, id: int) -> None:
+        await self.controle.apagar_lista(id)
+        self.tabela_listas.rows = [row for row in self.tabela_listas.rows if row.data != id]
+        self.tabela_listas.update()
 
     def did_mount(self) -> None:
         self.page.run_task(self.ler_dados)
 
 
 class PlanilhaCotacao:
-    def __init__(self, produtos: ft.DataRow, fornecedores: ft.DataRow, nome_arquivo: str = "cotacao.xlsx") -> None:
+    def __init__(
+            self,
+            produtos: List[str],
+            fornecedores: List[str],
+            precos: Sequence[Sequence[float]],
+            nome_arquivo: str = "cotacao.xlsx"
+        ) -> None:
+        from exportacao import ExportadorPlanilha
         self.produtos = produtos
         self.fornecedores = fornecedores
+        self.precos = precos
         self.nome_arquivo = nome_arquivo
-        self.colunas = ["produto"]
-        self.book = openpyxl.Workbook()
-
-    def criar(self) -> None:
-        produtos = self.extrair_produtos()
-        fornecedores = self.extrair_fornecedores()
-        self.colunas.extend(fornecedores)
-
-        ws = self.book.active
-        ws.append(self.colunas)
+        colunas_precos = range(1, len(self.fornecedores) + 1)
+        self.exportador = ExportadorPlanilha(
+            colunas=["produto", *self.fornecedores],
+            larguras=[20, *[max(len(fornecedor), 12) for fornecedor in self.fornecedores]],
+            colunas_moeda=colunas_precos,
+            colunas_destaque_minimo=colunas_precos
+        )
 
-        for produto in produtos:
-            produto.extend(['-' for _ in range(len(fornecedores))])
-            ws.append(produto)
+    async def criar(self, formato: str = "xlsx") -> None:
+        self.nome_arquivo = await self.exportador.exportar(self.nome_arquivo, self.gerar_linhas(), formato)
 
-        dim_holder = DimensionHolder(worksheet=ws)
-        dims = [20]
-        dims.extend([len(fornecedor) for fornecedor in fornecedores])
+    def gerar_linhas(self) -> Iterator[list]:
+        for produto, precos in zip(self.produtos, self.precos):
+            yield [produto, *[float(preco) if math.isfinite(preco) else "-" for preco in precos]]
 
-        for col in range(ws.min_column, ws.max_column + 1):
-            dim_holder[get_column_letter(col)] = ColumnDimension(ws, min=col, max=col, width=dims[col-1])
-        
-        ws.column_dimensions = dim_holder
 
-        self.adicionar_data_ao_nome()
-        self.book.save(self.nome_arquivo)
+class JanelaBuscaGlobal(ft.AlertDialog):
+    atraso = 0.25
+    icones = {
+        "produto": ft.Icons.SHOPPING_BASKET,
+        "fornecedor": ft.Icons.PERSON,
+        "marca": ft.Icons.SELL,
+        "compra": ft.Icons.RECEIPT_LONG
+    }
 
-    def extrair_produtos(self) -> None:
-        return [
-            [linha.cells[0].content.value]
-            for linha in self.produtos
+    def __init__(self, controle_pagina: ControlePagina) -> None:
+        super().__init__(modal=True)
+        self.controle_pagina = controle_pagina
+        self.controle = ControleBusca()
+        self.versao = 0
+        self.field_busca = ft.TextField(
+            label="Produto, fornecedor ou marca",
+            border="underline",
+            autofocus=True,
+            on_change=self.agendar_busca,
+            on_submit=self.buscar
+        )
+        self.resultados = ft.ListView(expand=True, spacing=2)
+        self.content = ft.Container(
+            ft.Column([self.field_busca, self.resultados]),
+            width=600, height=420
+        )
+        self.actions = [
+            ft.TextButton(
+                text="Fechar",
+                on_click=lambda e: self.page.close(self),
+                style=ft.ButtonStyle(bgcolor={ft.ControlState.HOVERED: ft.Colors.RED_100})
+            )
         ]
 
-    def extrair_fornecedores(self) -> None:
-        return [
-            linha.cells[0].content.value
-            for linha in self.fornecedores
-        ]
-    
-    def adicionar_data_ao_nome(self):
-        nome_list = self.nome_arquivo.split(".")
-        nome_full = nome_list[0] + f"_{datetime.now().strftime("%d_%m_%Y")}." + nome_list[1]
-        self.nome_arquivo = nome_full
+    def agendar_busca(self, e: ft.ControlEvent) -> None:
+        self.versao += 1
+        self.page.run_task(self.aguardar_e_buscar, self.versao)
+
+    async def aguardar_e_buscar(self, versao: int) -> None:
+        await asyncio.sleep(self.atraso)
+        if versao == self.versao:
+            await self.pesquisar(versao)
+
+    async def buscar(self, e: ft.ControlEvent) -> None:
+        self.versao += 1
+        await self.pesquisar(self.versao)
+
+    async def pesquisar(self, versao: int) -> None:
+        dados = await self.controle.pesquisar(self.field_busca.value)
+        if versao != self.versao:
+            return
+        self.resultados.controls = [self.criar_resultado(dado) for dado in dados]
+        self.resultados.update()
+
+    def criar_resultado(self, dado: tuple) -> ft.ListTile:
+        tipo, id, titulo, trecho = dado[:4]
+        return ft.ListTile(
+            leading=ft.Icon(self.icones[tipo]),
+            title=ft.Text(titulo.title(), max_lines=1, overflow=ft.TextOverflow.ELLIPSIS),
+            subtitle=ft.Text(f"{tipo}: {trecho}", max_lines=1, overflow=ft.TextOverflow.ELLIPSIS),
+            dense=True,
+            on_click=lambda e, tipo=tipo, id=id: self.page.run_task(self.abrir_resultado, tipo, id)
+        )
+
+    async def abrir_resultado(self, tipo: str, id: int) -> None:
+        if tipo == "produto":
+            item = catalogo_produtos.obter(id)
+            if item is None:
+                return
+            from pagina_config_itens import PaginaConfigItem
+            pagina = PaginaConfigItem(item, self.controle_pagina)
+            self.page.close(self)
+            self.controle_pagina.alterar_para_barra_voltar()
+            self.controle_pagina.adicionar_label_barra(item.nome.title())
+            self.controle_pagina.add_acao_barra(pagina.botoes_calendario())
+            self.controle_pagina.atualizar_pagina(pagina)
+            return
+        fornecedor = await self.controle.obter_fornecedor(id)
+        if fornecedor is not None:
+            self.page.close(self)
+            self.page.open(JanelaInfoFornecedor(fornecedor))
 
 
 class JanelaCotacao(ft.AlertDialog):
     def __init__(self) -> None:
         super().__init__(modal=True)
-        self.dropdown_categoria = ft.Dropdown(
-            label="Categoria",
-            width=200,
-            border="underline",
-            on_change=self.filtrar_categoria
-        )
-        self.tabela_produtos = ft.DataTable(
-            columns=[
-                ft.DataColumn(ft.Text("id"), visible=False),
-                ft.DataColumn(ft.Text("Nome")),
-                ft.DataColumn(ft.Text("Adicionar"))
-            ],
-            col=12
-        )
-        self.tabela_cotacao = ft.DataTable(
-            columns=[
-                ft.DataColumn(ft.Text("id"), visible=False),
-                ft.DataColumn(ft.Text("Nome")),
-                ft.DataColumn(ft.Text("Remover"))
-            ],
-            col=12
-        )
+        self.seletor = SeletorProdutos()
         self.dialogo = Dialogo()
-        self.lista_cotacao = []
         self.criar_conteudo()
 
     def criar_conteudo(self) -> None:
-        self.content = ft.Container(
-            ft.Column([
-                self.dropdown_categoria,
-                ft.Container(
-                    ft.ResponsiveRow([
-                        ft.Column([
-                            ft.Card(
-                                ft.Container(
-                                    ft.Column([
-                                        ft.ResponsiveRow([
-                                            self.tabela_produtos
-                                        ])
-                                    ], scroll=ft.ScrollMode.ALWAYS),
-                                    padding=ft.padding.only(top=10, bottom=10), expand=True
-                                ),expand=True
-                            )
-                        ], col=6),
-                        ft.Column([
-                            ft.Card(
-                                ft.Container(
-                                    ft.Column([
-                                        ft.ResponsiveRow([
-                                            self.tabela_cotacao
-                                        ])
-                                    ], scroll=ft.ScrollMode.ALWAYS),
-                                    padding=ft.padding.only(top=10, bottom=10), expand=True
-                                ),
-                                expand=True
-                            )
-                        ], col=6)
-                    ]), expand=True
-                )
-            ]), width=650, height=500
-        )
+        self.content = ft.Container(self.seletor, width=650, height=500)
         self.actions = [
             ft.TextButton(
                 text="Avançar",
@@ -604,6 +628,7 @@ class JanelaCotacao(ft.AlertDialog):
         ]
 
     async def avancar(self, e: ft.ControlEvent) -> None:
+        self.lista_cotacao = [id for id, nome in self.seletor.itens()]
         if self.lista_cotacao:
             self.segunda_tabela_produtos = ft.DataTable(
                 columns=[
@@ -611,9 +636,9 @@ class JanelaCotacao(ft.AlertDialog):
                 ],
                 rows=[
                     ft.DataRow(
-                        cells=[ft.DataCell(ft.Text(linha.cells[1].content.value))]
+                        cells=[ft.DataCell(ft.Text(nome))]
                     )
-                    for linha in self.tabela_cotacao.rows
+                    for id, nome in self.seletor.itens()
                 ],
                 col=12
             )
@@ -673,8 +698,13 @@ class JanelaCotacao(ft.AlertDialog):
 
     async def criar_planilha(self, e: ft.ControlEvent) -> None:
         try:
-            planilha = PlanilhaCotacao(self.segunda_tabela_produtos.rows, self.tabela_fornecedor.rows)
-            planilha.criar()
+            colunas = [linha.data for linha in self.tabela_fornecedor.rows]
+            planilha = PlanilhaCotacao(
+                [nome for id, nome in self.seletor.itens()],
+                [linha.cells[0].content.value for linha in self.tabela_fornecedor.rows],
+                self.matriz_precos.precos[:, colunas]
+            )
+            await planilha.criar()
         except Exception as e:
             self.dialogo.generico(ft.Icons.ERROR, "Houve um erro ao criar")
         else:
@@ -684,14 +714,13 @@ class JanelaCotacao(ft.AlertDialog):
             self.dialogo.limpar()
 
     async def buscar_fornecedores(self) -> None:
-        lista_fonecedores = set()
-        for id in self.lista_cotacao:
-            controle = ControleItem(ModeloItem(id=id), None)
-            fornecedores = await controle.buscar_fornecedores_relacao()
-            if fornecedores:
-                for fornecedor in fornecedores:
-                    lista_fonecedores.add(fornecedor[2])
-        self.adicionar_fornecedores(lista_fonecedores)
+        from otimizacao import MatrizPrecos
+        registros = await ControleListaCompras().buscar_precos_fornecedores(self.lista_cotacao)
+        self.matriz_precos = MatrizPrecos(self.lista_cotacao, registros)
+        nomes = {registro[2]: registro[3] for registro in registros}
+        self.adicionar_fornecedores([
+            (j, nomes[id_fornecedor]) for j, id_fornecedor in enumerate(self.matriz_precos.ids_fornecedores)
+        ])
 
     def adicionar_fornecedores(self, fornecedores: list) -> None:
         self.tabela_fornecedor.rows = [
@@ -701,95 +730,23 @@ class JanelaCotacao(ft.AlertDialog):
                     ft.DataCell(
                         ft.IconButton(
                             ft.Icons.DELETE,
-                            on_click=lambda e, nome=nome: self.apagar_fornecedor(nome)
+                            on_click=lambda e, coluna=coluna: self.apagar_fornecedor(coluna)
                         )
                     )
-                ]
+                ],
+                data=coluna
             )
-            for nome in fornecedores
+            for coluna, nome in sorted(fornecedores, key=lambda fornecedor: fornecedor[1])
         ]
         self.tabela_fornecedor.update()
 
-    def apagar_fornecedor(self, nome: str) -> None:
-        for linha in self.tabela_fornecedor.rows:
-            if linha.cells[0].content.value == nome:
-                self.tabela_fornecedor.rows.remove(linha)
+    def apagar_fornecedor(self, coluna: int) -> None:
+        self.tabela_fornecedor.rows = [linha for linha in self.tabela_fornecedor.rows if linha.data != coluna]
         self.tabela_fornecedor.update()
 
-    def adicionar_linha_tabela_itens(self, indice: int) -> None:
-        dados = self.dados[indice]
-        self.tabela_produtos.rows.append(
-            ft.DataRow(
-                cells=[
-                    ft.DataCell(ft.Text(dados[0]), visible=False),
-                    ft.DataCell(ft.Text(dados[1])),
-                    ft.DataCell(
-                        ft.IconButton(
-                            ft.Icons.ADD,
-                            on_click=lambda e, id=dados[0]: self.adicionar_item_tabela_cotacao(id)
-                        )
-                    )
-                ]
-            )
-        )
-        self.tabela_produtos.update()
-
-    def adicionar_item_tabela_cotacao(self, id: int) -> None:
-        if id not in self.lista_cotacao:
-            self.lista_cotacao.append(id)
-            for dado in self.dados:
-                if dado[0] == id:
-                    self.tabela_cotacao.rows.append(
-                        ft.DataRow(
-                            cells=[
-                                ft.DataCell(ft.Text(dado[0]), visible=False),
-                                ft.DataCell(ft.Text(dado[1])),
-                                ft.DataCell(
-                                    ft.IconButton(
-                                        ft.Icons.DELETE,
-                                        on_click=lambda e, id=dado[0]: self.apagar_item_tabela_cotacao(id)
-                                    )
-                                )
-                            ]
-                        )
-                    )
-                    self.tabela_cotacao.update()
-
-    def apagar_registros_tabela_produtos(self) -> None:
-        self.tabela_produtos.rows.clear()
-        self.tabela_produtos.update()
-
-    def apagar_item_tabela_cotacao(self, id: int) -> None:
-        self.lista_cotacao.remove(id)
-        for linha in self.tabela_cotacao.rows:
-            if linha.cells[0].content.value == id:
-                self.tabela_cotacao.rows.remove(linha)
-        self.tabela_cotacao.update()
-
-    def filtrar_categoria(self, e: ft.ControlEvent) -> None:
-        self.adicionar_registro_tabela_itens(e.data)
-
-    def adicionar_registro_tabela_itens(self, categoria: str) -> None:
-        self.apagar_registros_tabela_produtos()
-        for i, dado in enumerate(self.dados):
-            if categoria == dado[2]:
-                self.adicionar_linha_tabela_itens(i)
-
-    def adicionar_categorias_dropdown(self) -> None:
-        if self.dados:
-            cats = list(set(dado[2] for dado in self.dados))
-            self.dropdown_categoria.options = [
-                ft.dropdown.Option(value)
-                for value in cats
-            ]
-            self.dropdown_categoria.value = cats[0]
-            self.dropdown_categoria.update()
-            self.adicionar_registro_tabela_itens(cats[0])
-
     async def ler_dados(self) -> None:
-        bd = BancoDeDados("db_app6.db")
-        self.dados = await bd.fetch_all("SELECT id, nome, categoria FROM produto;")
-        self.adicionar_categorias_dropdown()
+        await catalogo_produtos.carregar()
+        self.seletor.carregar([(produto.id, produto.nome, produto.categoria) for produto in catalogo_produtos.todos()])
 
     def did_mount(self) -> None:
         self.page.run_task(self.ler_dados)
@@ -962,6 +919,8 @@ class PaginaEntradasVariaveis(ft.Container):
 
 
 class Aplicativo(ft.Container):
+    modulos_tardios = ("pagina_lista_compras", "pagina_config_itens", "pagina_dash")
+
     def __init__(self) -> None:
         super().__init__(expand=True)
         self.criar_botoes()
@@ -1004,6 +963,12 @@ class Aplicativo(ft.Container):
                 self.barra_pesquisa,
                 ft.VerticalDivider(opacity=0),
                 self.filtro_categoria,
+                ft.IconButton(
+                    icon=ft.Icons.MANAGE_SEARCH,
+                    icon_color=ft.Colors.BLACK87,
+                    tooltip="Busca Geral",
+                    on_click=self.abrir_janela_busca
+                ),
                 ft.VerticalDivider(),
                 ft.IconButton(
                     icon=ft.Icons.BALLOT,
@@ -1029,6 +994,11 @@ class Aplicativo(ft.Container):
                         self.botao_add_item,
                         self.botao_add_fornecedor,
                         ft.PopupMenuItem(),
+                        ft.PopupMenuItem(
+                            text="Listas Salvas",
+                            icon=ft.Icons.LIST_ALT_ROUNDED,
+                            on_click=self.abrir_janela_listas_salvas
+                        ),
                         ft.PopupMenuItem(
                             text="Cotação",
                             icon=ft.Icons.ATTACH_MONEY_ROUNDED,
@@ -1069,9 +1039,10 @@ class Aplicativo(ft.Container):
         self.page.update()
         if self.controle_pagina.atualizar_grade_itens:
             self.controle_pagina.atualizar_grade_itens = False
-            await self.pagina_itens.criar_cards_itens()
+            self.pagina_itens.aplicar_pendentes()
 
     def pagina_dashboad(self, e: ft.ControlEvent) -> None:
+        from pagina_dash import PaginaDashboard
         pagina = PaginaDashboard()
         self.controle_pagina.alterar_para_barra_voltar()
         self.controle_pagina.add_acao_barra(pagina.botoes_calendario())
@@ -1086,6 +1057,14 @@ class Aplicativo(ft.Container):
         janela = JanelaListaCompras(self.controle_pagina)
         self.page.open(janela)
 
+    def abrir_janela_listas_salvas(self, e: ft.ControlEvent) -> None:
+        janela = JanelaListasSalvas(self.controle_pagina)
+        self.page.open(janela)
+
+    def abrir_janela_busca(self, e: ft.ControlEvent) -> None:
+        janela = JanelaBuscaGlobal(self.controle_pagina)
+        self.page.open(janela)
+
     def abrir_janela_add_item(self, e: ft.ControlEvent) -> None:
         janela = JanelaAdcionarItem(self.controle_grade_item)
         self.page.open(janela)
@@ -1109,9 +1088,51 @@ class Aplicativo(ft.Container):
         self.controle_pagina.alterar_para_barra_voltar()
         self.controle_pagina.atualizar_pagina(pagina)
 
+    async def iniciar(self) -> None:
+        if os.environ.get("GESTOR_BD_MEMORIA") == "1":
+            await self.ativar_banco_memoria()
+        await ControleEsquema().preparar()
+        await catalogo_produtos.carregar()
+        await self.pagina_itens.criar_cards_itens()
+        logger.info("Grade de itens interativa em %.3f s", time.perf_counter() - INICIO)
+        self.page.run_task(self.aquecer_modulos)
+        self.page.run_task(ControleImagens().preencher_faltantes)
+
+    async def ativar_banco_memoria(self) -> None:
+        await BancoDeDados.ativar_memoria(
+            "db_app6.db",
+            intervalo=float(os.environ.get("GESTOR_BD_INTERVALO", 30)),
+            limite_escritas=int(os.environ.get("GESTOR_BD_ESCRITAS", 50))
+        )
+        self.page.window.prevent_close = True
+        self.page.window.on_event = self.ao_evento_janela
+        self.page.on_disconnect = self.ao_desconectar
+        self.page.on_close = self.ao_encerrar_sessao
+        self.page.update()
+
+    async def ao_evento_janela(self, e: ft.WindowEvent) -> None:
+        if e.type == ft.WindowEventType.CLOSE:
+            await BancoDeDados.desativar_memoria("db_app6.db")
+            self.page.window.destroy()
+
+    async def ao_desconectar(self, e: ft.ControlEvent) -> None:
+        await BancoDeDados.salvar_memoria("db_app6.db")
+
+    async def ao_encerrar_sessao(self, e: ft.ControlEvent) -> None:
+        await BancoDeDados.desativar_memoria("db_app6.db")
+
+    async def aquecer_modulos(self) -> None:
+        loop = asyncio.get_running_loop()
+        for modulo in self.modulos_tardios:
+            try:
+                await loop.run_in_executor(None, importlib.import_module, modulo)
+            except Exception:
+                logger.exception("Falha ao pré-carregar %s", modulo)
+        logger.info("Módulos tardios carregados em %.3f s", time.perf_counter() - INICIO)
+
     def did_mount(self) -> None:
         self.criar_barra_menu()
-        self.page.run_task(self.pagina_itens.criar_cards_itens)
+        self.page.run_task(self.iniciar)
         self.controle_pagina.atualizar_pagina(self.pagina_itens)
 
 
@@ -1130,6 +1151,7 @@ def main(page: ft.Page) -> None:
     aplicativo = Aplicativo()
     page.add(aplicativo)
     page.update()
+    logger.info("Primeiro quadro em %.3f s", time.perf_counter() - INICIO)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,61 @@
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+MODULOS_INICIAIS = (
+    "flet", "acessorios", "modelos", "controles", "catalogo", "pagina_fornecedores", "pagina_itens"
+)
+MODULOS_TARDIOS = (
+    "pagina_lista_compras", "pagina_config_itens", "pagina_dash", "otimizacao", "exportacao", "reposicao"
+)
+
+MEDICAO = """
+import importlib, json, sys, time
+tempos = {}
+inicio = time.perf_counter()
+for modulo in %r:
+    importlib.import_module(modulo)
+tempos["inicial"] = time.perf_counter() - inicio
+for modulo in %r:
+    inicio = time.perf_counter()
+    try:
+        importlib.import_module(modulo)
+    except Exception as erro:
+        tempos[modulo] = repr(erro)
+    else:
+        tempos[modulo] = time.perf_counter() - inicio
+print(json.dumps(tempos))
+"""
+
+
+def medir(repeticoes: int) -> dict:
+    diretorio = os.path.dirname(os.path.abspath(__file__))
+    codigo = MEDICAO % (MODULOS_INICIAIS, MODULOS_TARDIOS)
+    amostras = {}
+    for _ in range(repeticoes):
+        processo = subprocess.run([sys.executable, "-c", codigo], cwd=diretorio, capture_output=True, text=True)
+        if processo.returncode != 0:
+            sys.exit(processo.stderr)
+        for chave, valor in json.loads(processo.stdout).items():
+            amostras.setdefault(chave, []).append(valor)
+    return amostras
+
+
+def main(argumentos: list) -> None:
+    repeticoes = int(argumentos[0]) if argumentos else 5
+    adiado = 0.0
+    for chave, valores in medir(repeticoes).items():
+        if isinstance(valores[0], str):
+            print(f"{chave:<24} erro: {valores[0]}")
+            continue
+        mediana = statistics.median(valores)
+        if chave != "inicial":
+            adiado += mediana
+        print(f"{chave:<24} {mediana * 1000:8.1f} ms")
+    print(f"{'adiado no total':<24} {adiado * 1000:8.1f} ms  (mediana de {repeticoes} processos)")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -43,4 +43,34 @@ class ModeloFornecedor:
         self.bairro = bairro
         self.cep = cep
         self.cidade = cidade
-        self.estado = estado
\ No newline at end of file
+        self.estado = estado
+
+class ModeloLinhaCompra:
+    def __init__(
+            self,
+            id: int,
+            nome: str,
+            fornecedor: str = "-",
+            marca: str = "-",
+            preco: float = 0.0,
+            quantidade: float = 0.0,
+            medida: Optional[str] = None,
+            id_relacao: Optional[int] = None,
+            preco_relacao: Optional[float] = None
+        ) -> None:
+        self.id = id
+        self.nome = nome
+        self.fornecedor = fornecedor
+        self.marca = marca
+        self.preco = preco
+        self.quantidade = quantidade
+        self.medida = medida
+        self.id_relacao = id_relacao
+        self.preco_relacao = preco_relacao
+
+    @property
+    def total(self) -> float:
+        return round(self.preco * self.quantidade, 2)
+
+    def __str__(self):
+        return f"{self.id}, {self.nome}, {self.fornecedor}, {self.marca}, {self.preco}, {self.quantidade}, {self.medida}"
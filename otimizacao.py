@@ -0,0 +1,149 @@
+import time
+from typing import Dict, List, Optional, Sequence, Tuple, Union
+import numpy as np
+
+
+class MatrizPrecos:
+    def __init__(self, ids_produtos: Sequence[int], registros: list) -> None:
+        self.ids_produtos = [int(id) for id in ids_produtos]
+        self.ids_fornecedores = sorted({int(registro[2]) for registro in registros})
+        indice_produto = {id: i for i, id in enumerate(self.ids_produtos)}
+        indice_fornecedor = {id: j for j, id in enumerate(self.ids_fornecedores)}
+
+        self.precos = np.full((len(self.ids_produtos), len(self.ids_fornecedores)), np.inf)
+        self.registros: Dict[Tuple[int, int], tuple] = {}
+        for registro in registros:
+            i = indice_produto.get(int(registro[0]))
+            if i is None:
+                continue
+            j = indice_fornecedor[int(registro[2])]
+            preco = float(registro[4])
+            if preco < self.precos[i, j]:
+                self.precos[i, j] = preco
+                self.registros[(i, j)] = registro
+
+    def registro(self, i: int, j: int) -> Optional[tuple]:
+        return self.registros.get((i, j))
+
+    def escolher(self, quantidades: Sequence[float], otimizador: "OtimizadorFornecedores") -> List[Optional[tuple]]:
+        escolhas = otimizador.resolver(self.precos, quantidades)
+        return [self.registro(i, j) if j >= 0 else None for i, j in enumerate(escolhas)]
+
+
+class OtimizadorFornecedores:
+    limite_exato = 12
+    tempo_limite = 0.5
+    penalidade = 1e9
+    elementos_por_bloco = 2_000_000
+
+    def __init__(
+            self,
+            custos_fixos: Union[float, Sequence[float]] = 0.0,
+            maximo_fornecedores: Optional[int] = None,
+            tempo_limite: Optional[float] = None
+        ) -> None:
+        self.custos_fixos = custos_fixos
+        self.maximo_fornecedores = maximo_fornecedores
+        self.tempo_limite = self.tempo_limite if tempo_limite is None else tempo_limite
+
+    def resolver(self, precos: np.ndarray, quantidades: Sequence[float]) -> np.ndarray:
+        escolhas = np.full(precos.shape[0], -1)
+        if precos.size == 0:
+            return escolhas
+
+        prazo = time.perf_counter() + self.tempo_limite
+        cobertos = np.isfinite(precos).any(axis=1)
+        uteis = np.flatnonzero(np.isfinite(precos[cobertos]).any(axis=0))
+        if not cobertos.any():
+            return escolhas
+
+        self.precos = precos[cobertos][:, uteis]
+        quantidades = np.asarray(quantidades, dtype=float)[cobertos]
+        self.quantidades = np.where(quantidades > 0, quantidades, 1.0)
+        self.fixos = np.broadcast_to(np.asarray(self.custos_fixos, dtype=float), (precos.shape[1],))[uteis]
+
+        mascara = self.busca_local(prazo)
+        if len(uteis) <= self.limite_exato:
+            mascara = self.busca_exata(mascara, prazo)
+
+        selecionados = np.where(mascara[None, :], self.precos, np.inf)
+        melhores = selecionados.argmin(axis=1)
+        atendidos = np.isfinite(selecionados.min(axis=1))
+        escolhas[np.flatnonzero(cobertos)] = np.where(atendidos, uteis[melhores], -1)
+        return escolhas
+
+    def custos(self, mascaras: np.ndarray) -> np.ndarray:
+        n, m = self.precos.shape
+        tamanho_bloco = max(1, self.elementos_por_bloco // max(n * m, 1))
+        resultado = np.empty(len(mascaras))
+        for inicio in range(0, len(mascaras), tamanho_bloco):
+            bloco = mascaras[inicio:inicio + tamanho_bloco]
+            minimos = np.where(bloco[:, None, :], self.precos[None, :, :], np.inf).min(axis=2)
+            parcelas = np.where(np.isfinite(minimos), minimos * self.quantidades, self.penalidade)
+            resultado[inicio:inicio + tamanho_bloco] = parcelas.sum(axis=1) + bloco @ self.fixos
+        return resultado
+
+    def permitido(self, mascaras: np.ndarray) -> np.ndarray:
+        if self.maximo_fornecedores is None:
+            return np.ones(len(mascaras), dtype=bool)
+        return mascaras.sum(axis=1) <= self.maximo_fornecedores
+
+    def busca_local(self, prazo: float) -> np.ndarray:
+        m = self.precos.shape[1]
+        mascara = np.zeros(m, dtype=bool)
+        mascara[np.unique(self.precos.argmin(axis=1))] = True
+
+        while self.maximo_fornecedores is not None and mascara.sum() > self.maximo_fornecedores:
+            vizinhos = self.remocoes(mascara)
+            mascara = vizinhos[self.custos(vizinhos).argmin()]
+
+        custo = self.custos(mascara[None, :])[0]
+        while time.perf_counter() < prazo:
+            vizinhos = np.concatenate([self.remocoes(mascara), self.adicoes(mascara), self.trocas(mascara)])
+            vizinhos = vizinhos[self.permitido(vizinhos)]
+            if not len(vizinhos):
+                break
+            custos = self.custos(vizinhos)
+            melhor = custos.argmin()
+            if custos[melhor] >= custo - 1e-9:
+                break
+            mascara, custo = vizinhos[melhor], custos[melhor]
+        return mascara
+
+    def busca_exata(self, mascara: np.ndarray, prazo: float) -> np.ndarray:
+        m = self.precos.shape[1]
+        mascaras = ((np.arange(1, 2 ** m)[:, None] >> np.arange(m)) & 1).astype(bool)
+        mascaras = mascaras[self.permitido(mascaras)]
+
+        melhor, custo = mascara, self.custos(mascara[None, :])[0]
+        tamanho_bloco = 256
+        for inicio in range(0, len(mascaras), tamanho_bloco):
+            if time.perf_counter() >= prazo:
+                break
+            bloco = mascaras[inicio:inicio + tamanho_bloco]
+            custos = self.custos(bloco)
+            i = custos.argmin()
+            if custos[i] < custo - 1e-9:
+                melhor, custo = bloco[i], custos[i]
+        return melhor
+
+    def remocoes(self, mascara: np.ndarray) -> np.ndarray:
+        ativos = np.flatnonzero(mascara)
+        vizinhos = np.repeat(mascara[None, :], len(ativos), axis=0)
+        vizinhos[np.arange(len(ativos)), ativos] = False
+        return vizinhos
+
+    def adicoes(self, mascara: np.ndarray) -> np.ndarray:
+        inativos = np.flatnonzero(~mascara)
+        vizinhos = np.repeat(mascara[None, :], len(inativos), axis=0)
+        vizinhos[np.arange(len(inativos)), inativos] = True
+        return vizinhos
+
+    def trocas(self, mascara: np.ndarray) -> np.ndarray:
+        ativos, inativos = np.flatnonzero(mascara), np.flatnonzero(~mascara)
+        saida, entrada = np.repeat(ativos, len(inativos)), np.tile(inativos, len(ativos))
+        vizinhos = np.repeat(mascara[None, :], len(saida), axis=0)
+        vizinhos[np.arange(len(saida)), saida] = False
+        vizinhos[np.arange(len(saida)), entrada] = True
+        return vizinhos
+
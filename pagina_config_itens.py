@@ -3,15 +3,17 @@ import locale
 from datetime import datetime, timedelta
 import numpy as np
 from abc import ABC, abstractmethod
-from typing import Union, Callable, List, Tuple
+from typing import Union, Callable, List, Tuple, Optional
 import pandas as pd
 from flet.plotly_chart import PlotlyChart
 import plotly.graph_objects as go
 import unicodedata
 
 from acessorios import BancoDeDados, Utilidades, JanelaNotificacao
-from controles import ControleLog, ControleItem, ControlePagina
+from controles import ControleLog, ControleItem, ControlePagina, ControleEstatisticas
+from estatisticas import AcumuladorEstatisticas
 from modelos import ModeloItem
+from precos import matriz_precos
 import querys_app6 as q6
 
 
@@ -337,7 +339,7 @@ class TabelaLogProduto(ft.DataTable):
                     ft.DataCell(ft.Text(dado[2][:20], overflow=ft.TextOverflow.ELLIPSIS)),
                     ft.DataCell(ft.Text(dado[6][:10])),
                     ft.DataCell(ft.Text(f"{dado[3].replace(".", ",")} {Utilidades.encurtar_medida(self.item.medida)}")),
-                    ft.DataCell(ft.Text(locale.currency(dado[4], grouping=True))),
+                    ft.DataCell(self.criar_celula_preco(dado[4], dado[9])),
                     ft.DataCell(ft.Text(locale.currency(dado[5], grouping=True))),
                     ft.DataCell(ft.Text(locale.currency(dado[7], grouping=True))),
                     ft.DataCell(ft.IconButton(icon=ft.Icons.DELETE, on_click=deletar_ao_clicar))
@@ -345,6 +347,20 @@ class TabelaLogProduto(ft.DataTable):
             )
         )
 
+    def criar_celula_preco(self, preco: float, anomalia: Optional[int]) -> ft.Control:
+        texto = ft.Text(locale.currency(preco, grouping=True))
+        if not anomalia:
+            return texto
+        return ft.Row([
+            texto,
+            ft.Icon(
+                ft.Icons.WARNING_AMBER_ROUNDED,
+                color=ft.Colors.ORANGE,
+                size=17,
+                tooltip="Preço muito acima do histórico" if anomalia > 0 else "Preço muito abaixo do histórico"
+            )
+        ], spacing=2)
+
     def ordenar_tabela(self, e: ft.ControlEvent) -> None:
         self.sort_ascending = not self.sort_ascending
         self.rows.clear()
@@ -515,7 +531,6 @@ class Configuracoes(ft.Container):
         self.path_imagem.value = f"imagens/{arquivo}"
         
         self.path_imagem.update()
-        self.controle_pagina.atualizar_grade_itens = True
 
     async def salvar_infos(self, e: ft.ControlEvent) -> None:
         await self.controle.inserir_valores_infos(
@@ -742,9 +757,9 @@ class OperadorDados:
             perda: float,
             infos: float
         ) -> Tuple[bool]:
-        configs, precos = infos
+        configs, menor_preco = infos
         porc_freq, porc_qtd_media, porc_preco_medio, porc_perda = self.__gerar_estatisticas(
-            frequencia, qtd_media, preco_medio, valor_total, perda, configs, precos
+            frequencia, qtd_media, preco_medio, valor_total, perda, configs, menor_preco
         )
         return (porc_freq <= configs[3], porc_qtd_media <= configs[2], porc_preco_medio <= configs[4], porc_perda <= configs[5])
 
@@ -756,9 +771,10 @@ class OperadorDados:
             valor_total: float,
             perda: float,
             configs: float,
-            precos: float
+            menor_preco: Optional[float]
         ) -> Tuple[bool]:
-        menor_preco = min([preco[3] for preco in precos])
+        if menor_preco is None:
+            menor_preco = preco_medio
         porc_freq = 1 - frequencia / configs[1]
         porc_qtd_media = 1 - qtd_media / float(configs[0])
         porc_preco_medio = 1 - menor_preco / preco_medio
@@ -1095,12 +1111,15 @@ class PaginaConfigItem(ft.Container):
     def atualizar_tabela(self, dados: list) -> None:
         self.tabela_log.adicionar_registros(dados)
 
-    def atualizar_cartoes(self, infos) -> None:
+    def atualizar_cartoes(self, infos, estatisticas: AcumuladorEstatisticas, periodo_completo: bool=False) -> None:
         oper_dados = OperadorDados()
         variaveis = [self.frequencia, self.qtd_media, self.preco_medio, self.qtd_total, self.valor_total, self.perda]
         if self.df.shape[0]:
-            estatisticas = oper_dados.estatisticas_cartoes(self.df)
-            frequencia, qtd_media, preco_medio, qtd_total, valor_total, perda = estatisticas
+            if periodo_completo:
+                valores = estatisticas.estatisticas_cartoes()
+            else:
+                valores = oper_dados.estatisticas_cartoes(self.df)
+            frequencia, qtd_media, preco_medio, qtd_total, valor_total, perda = valores
             medida = Utilidades.encurtar_medida(self.item.medida)
             self.atualizar_valor(self.frequencia, f"{int(frequencia)} Dias")
             self.atualizar_valor(self.qtd_media, self.formatar_quantidade(qtd_media, medida))
@@ -1108,17 +1127,21 @@ class PaginaConfigItem(ft.Container):
             self.atualizar_valor(self.qtd_total, self.formatar_quantidade(qtd_total, medida))
             self.atualizar_valor(self.valor_total, f"{locale.currency(round(valor_total, 2), grouping=True)}")
             self.atualizar_valor(self.perda, f"{locale.currency(round(perda, 2), grouping=True)}")
-            if infos[0] is not None:
+            if infos[0] is not None and estatisticas.n:
                 if all(infos[0]):
-                    b_freq, b_qtd_media, b_preco_medio, b_perda = oper_dados.verificar_estatisticas(
-                        frequencia, qtd_media, preco_medio, valor_total, perda, infos
-                    )
-                    self.atualizar_estado_icones(b_freq, b_qtd_media, b_preco_medio, b_perda)
+                    self.atualizar_icones(oper_dados, estatisticas, infos)
 
         else:
             for variavel in variaveis:
                 variavel.value = "0"
                 variavel.update()
+
+    def atualizar_icones(self, oper_dados: OperadorDados, estatisticas: AcumuladorEstatisticas, infos) -> None:
+        frequencia, qtd_media, preco_medio, _, valor_total, perda = estatisticas.estatisticas_cartoes()
+        b_freq, b_qtd_media, b_preco_medio, b_perda = oper_dados.verificar_estatisticas(
+            frequencia, qtd_media, preco_medio, valor_total, perda, infos
+        )
+        self.atualizar_estado_icones(b_freq, b_qtd_media, b_preco_medio, b_perda)
     
     def atualizar_estado_icones(self, freq, qtd_media, preco_medio, perda):
         self.icone_frequencia.name = self.icones[2] if freq else self.icones[0]
@@ -1146,14 +1169,15 @@ class PaginaConfigItem(ft.Container):
 
     async def obter_dados_para_calculo(self):
         configs = await self.obter_dados_configuracoes()
-        precos = await self.obter_precos_fornecedores()
-        return (configs, precos)
+        menor_preco = await self.obter_menor_preco()
+        return (configs, menor_preco)
 
     async def obter_dados_configuracoes(self):
         return await self.bd.fetch_one(q6.obter_dados_infos_estatisticas, (self.item.id,))
     
-    async def obter_precos_fornecedores(self):
-        return await self.bd.fetch_all(q6.buscar_relacao_produto_fornecedor, (self.item.id,))
+    async def obter_menor_preco(self) -> Optional[float]:
+        await matriz_precos.carregar()
+        return matriz_precos.menor_preco(self.item.id)
     
     def atualizar_valor(self, atributo, valor: int):
         atributo.value = valor
@@ -1180,9 +1204,10 @@ class PaginaConfigItem(ft.Container):
         
         self.alterar_estado_botoes(bool(dados))
         infos = await self.obter_dados_para_calculo()
+        estatisticas = await ControleEstatisticas().obter(self.item.id)
         self.atualizar_tabela(dados)
         self.criar_data_frame(dados)
-        self.atualizar_cartoes(infos)
+        self.atualizar_cartoes(infos, estatisticas)
 
     async def ler_todos_dados(self) -> None:
         dados = await self.bd.fetch_all(
@@ -1192,9 +1217,10 @@ class PaginaConfigItem(ft.Container):
 
         self.alterar_estado_botoes(bool(dados))
         infos = await self.obter_dados_para_calculo()
+        estatisticas = await ControleEstatisticas().obter(self.item.id)
         self.atualizar_tabela(dados)
         self.criar_data_frame(dados)
-        self.atualizar_cartoes(infos)
+        self.atualizar_cartoes(infos, estatisticas, periodo_completo=True)
 
         self.data_inicio = self.df["data_operacao"].min()
         self.data_fim = self.df["data_operacao"].max()
@@ -1211,7 +1237,8 @@ class PaginaConfigItem(ft.Container):
                 "preco_operacao",
                 "marca",
                 "saving",
-                "menor_preco"
+                "menor_preco",
+                "anomalia"
             ]
         )
         self.df["data_operacao"] = pd.to_datetime(self.df["data_operacao"])
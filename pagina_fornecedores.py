@@ -1,9 +1,14 @@
+import locale
+import math
+from typing import Optional
+
 import flet as ft
 
-from acessorios import BancoDeDados
 from modelos import ModeloFornecedor
-from controles import ControleGradeFornecedor, ControleFornecedor
-import querys_app6 as q6
+from controles import ControleGradeFornecedor, ControleFornecedor, ControleScorecard
+from estatisticas import AcumuladorFornecedor
+
+locale.setlocale(locale.LC_ALL, "pt_BR.UTF-8")
 
 
 class JanelaInfoFornecedor(ft.AlertDialog):
@@ -19,6 +24,22 @@ class JanelaInfoFornecedor(ft.AlertDialog):
         ]
         self.criar_conteudo()
 
+    def criar_indicadores(self) -> None:
+        self.indicadores = {
+            "gasto_total": ft.Text(value="-", size=13),
+            "compras": ft.Text(value="-", size=13),
+            "saving": ft.Text(value="-", size=13),
+            "desvio": ft.Text(value="-", size=13),
+            "aumentos": ft.Text(value="-", size=13),
+            "ultima_compra": ft.Text(value="-", size=13)
+        }
+
+    def criar_indicador(self, rotulo: str, chave: str) -> ft.Column:
+        return ft.Column([
+            ft.Text(value=rotulo, size=11, color=ft.Colors.BLACK54),
+            self.indicadores[chave]
+        ], spacing=2, width=150)
+
     def criar_entradas(self) -> None:
         self.entradas = [
             ft.TextField(value=self.fornecedor.nome, label="Nome", width=290, border="underline", disabled=True),
@@ -34,6 +55,7 @@ class JanelaInfoFornecedor(ft.AlertDialog):
 
     def criar_conteudo(self) -> None:
         self.criar_entradas()
+        self.criar_indicadores()
         self.content = ft.Container(
             ft.Column([
                 ft.Row([self.entradas[0], self.entradas[1]]),
@@ -41,11 +63,47 @@ class JanelaInfoFornecedor(ft.AlertDialog):
                 ft.Divider(),
                 ft.Row([self.entradas[3], self.entradas[4]]),
                 ft.Row([self.entradas[5], self.entradas[6]]),
-                ft.Row([self.entradas[7], self.entradas[8]])
+                ft.Row([self.entradas[7], self.entradas[8]]),
+                ft.Divider(),
+                ft.Row([
+                    self.criar_indicador("Gasto total", "gasto_total"),
+                    self.criar_indicador("Compras", "compras"),
+                    self.criar_indicador("Saving", "saving")
+                ]),
+                ft.Row([
+                    self.criar_indicador("Desvio do menor preço", "desvio"),
+                    self.criar_indicador("Aumentos de preço", "aumentos"),
+                    self.criar_indicador("Última compra", "ultima_compra")
+                ])
             ]),
-            height=300, width=500
+            height=420, width=500
         )
 
+    async def carregar_detalhes(self) -> None:
+        fornecedor = await ControleFornecedor().obter_detalhes(self.fornecedor.id)
+        if fornecedor is None:
+            return
+        self.fornecedor = fornecedor
+        valores = [
+            fornecedor.nome, fornecedor.telefone, fornecedor.responsavel, fornecedor.logradouro,
+            fornecedor.numero, fornecedor.bairro, fornecedor.cep, fornecedor.cidade, fornecedor.estado
+        ]
+        for entrada, valor in zip(self.entradas, valores):
+            entrada.value = valor
+        self.preencher_indicadores(await ControleScorecard().obter(fornecedor.id))
+        self.update()
+
+    def preencher_indicadores(self, scorecard: AcumuladorFornecedor) -> None:
+        self.indicadores["gasto_total"].value = locale.currency(round(scorecard.gasto_total, 2), grouping=True)
+        self.indicadores["compras"].value = str(scorecard.compras)
+        self.indicadores["saving"].value = locale.currency(round(scorecard.soma_saving, 2), grouping=True)
+        self.indicadores["desvio"].value = f"{scorecard.desvio_medio:.1f}%"
+        self.indicadores["aumentos"].value = f"{scorecard.frequencia_aumento:.1f}%"
+        self.indicadores["ultima_compra"].value = scorecard.ultima_compra or "-"
+
+    def did_mount(self) -> None:
+        self.page.run_task(self.carregar_detalhes)
+
 
 class JanelaRemoverFornecedor(ft.AlertDialog):
     def __init__(self, controle: ControleFornecedor) -> None:
@@ -84,11 +142,13 @@ class CartaoFornecedor(ft.Card):
     def __init__(
             self,
             fornecedor: ModeloFornecedor,
-            controle_grade: ControleGradeFornecedor
+            controle_grade: ControleGradeFornecedor,
+            scorecard: Optional[AcumuladorFornecedor] = None
         ) -> None:
         super().__init__(color=ft.Colors.BLUE_100, elevation=5)
         self.fornecedor = fornecedor
         self.controle_grade = controle_grade
+        self.scorecard = scorecard
         self.criar_conteudo()
 
     def criar_conteudo(self) -> None:
@@ -114,6 +174,7 @@ class CartaoFornecedor(ft.Card):
                     weight=ft.FontWeight.W_600,
                     size=17
                 ),
+                self.criar_resumo(),
                 ft.Row([
                     self.menu_botoes,
                 ], alignment=ft.MainAxisAlignment.END)
@@ -122,6 +183,16 @@ class CartaoFornecedor(ft.Card):
             padding=ft.padding.only(left=10, right=10, top=10, bottom=5)
         )
 
+    def criar_resumo(self) -> ft.Text:
+        if self.scorecard is None or not self.scorecard.compras:
+            return ft.Text(value="Sem compras registradas", size=12, color=ft.Colors.BLACK54)
+        return ft.Text(
+            value=f"{locale.currency(round(self.scorecard.gasto_total, 2), grouping=True)} em {self.scorecard.compras} compras",
+            size=12,
+            max_lines=1,
+            overflow=ft.TextOverflow.ELLIPSIS
+        )
+
     def criar_botao(self, content=None, icon=None, tooltip=None, on_click=None) -> ft.IconButton:
         return ft.IconButton(
             content=content,
@@ -144,9 +215,17 @@ class CartaoFornecedor(ft.Card):
 
 
 class PaginaFornecedores(ft.Container):
+    tamanho_pagina = 60
+    margem_rolagem = 300
+
     def __init__(self) -> None:
         super().__init__(expand=True)
-        self.bd = BancoDeDados("db_app6.db")
+        self.controle = ControleFornecedor()
+        self.controle_grade = ControleGradeFornecedor(self)
+        self.ultimo = ("", 0)
+        self.esgotado = False
+        self.carregando = False
+        self.versao = 0
         self.criar_grade_fornecedores()
         self.content = self.grade_fornecedores
 
@@ -157,15 +236,51 @@ class PaginaFornecedores(ft.Container):
             child_aspect_ratio=2,
             spacing=10,
             run_spacing=10,
+            on_scroll=self.ao_rolar,
+            on_scroll_interval=100
         )
 
     async def criar_cards_fornecedores(self) -> None:
-        itens = await self.bd.fetch_all(q6.obter_dados_fornecedores)
-        self.grade_fornecedores.controls = [
-            CartaoFornecedor(ModeloFornecedor(*item), ControleGradeFornecedor(self))
-            for item in itens
-        ]
+        self.versao += 1
+        self.ultimo = ("", 0)
+        self.esgotado = False
+        self.carregando = False
+        self.grade_fornecedores.controls = []
+        await self.carregar_pagina()
+
+    async def carregar_pagina(self) -> None:
+        if self.carregando or self.esgotado:
+            return
+        versao = self.versao
+        self.carregando = True
+        try:
+            fornecedores = await self.controle.obter_pagina(self.ultimo, self.tamanho_pagina)
+            scorecards = await ControleScorecard().obter_varios([fornecedor.id for fornecedor in fornecedores])
+        finally:
+            if versao == self.versao:
+                self.carregando = False
+        if versao != self.versao:
+            return
+        self.esgotado = len(fornecedores) < self.tamanho_pagina
+        if fornecedores:
+            self.ultimo = (fornecedores[-1].nome, fornecedores[-1].id)
+        self.grade_fornecedores.controls.extend(
+            CartaoFornecedor(fornecedor, self.controle_grade, scorecards[fornecedor.id]) for fornecedor in fornecedores
+        )
         self.grade_fornecedores.update()
+        if not self.esgotado and len(self.grade_fornecedores.controls) < self.capacidade_visivel():
+            await self.carregar_pagina()
+
+    def capacidade_visivel(self) -> int:
+        if self.page is None or not self.page.width or not self.page.height:
+            return 0
+        colunas = math.ceil(self.page.width / self.grade_fornecedores.max_extent)
+        altura_cartao = self.page.width / colunas / self.grade_fornecedores.child_aspect_ratio
+        return colunas * (math.ceil(self.page.height / altura_cartao) + 1)
+
+    def ao_rolar(self, e: ft.OnScrollEvent) -> None:
+        if not self.esgotado and e.pixels >= e.max_scroll_extent - self.margem_rolagem:
+            self.page.run_task(self.carregar_pagina)
 
     def did_mount(self) -> None:
         return self.page.run_task(self.criar_cards_fornecedores)
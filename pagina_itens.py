@@ -1,13 +1,17 @@
 import flet as ft
+import math
 from collections import defaultdict
-from typing import Optional, Callable, List
+from typing import Optional, Callable, Dict, List, Tuple
+from bisect import bisect_left, bisect_right
+from difflib import SequenceMatcher
 from datetime import date
 
-from acessorios import BancoDeDados, Dialogo, Utilidades
+from acessorios import Dialogo, Utilidades
 from modelos import ModeloItem
 from controles import ControleGradeItem, ControlePagina, ControleItem
-from pagina_config_itens import PaginaConfigItem
-import querys_app6 as q6
+from estatisticas import AcumuladorPreco
+from catalogo import catalogo_produtos
+from precos import matriz_precos
 
 
 class JanelaEntrada(ft.AlertDialog):
@@ -18,6 +22,7 @@ class JanelaEntrada(ft.AlertDialog):
         )
         self.item = item
         self.fornecedores = defaultdict(list)
+        self.estatisticas_preco = {}
         self.dialogo = Dialogo()
         self.controle_item: ControleItem = None
         self.preco_cadastrado = 0
@@ -157,11 +162,20 @@ class JanelaEntrada(ft.AlertDialog):
                 self.entradas[0].value,
                 self.entradas[2].value,
                 self.entradas[4].value,
-                menor_preco
+                menor_preco,
+                self.obter_estatisticas_preco()
             )
             self.limpar_campos()
 
+    def obter_estatisticas_preco(self) -> Optional[AcumuladorPreco]:
+        if self.entradas[1].value:
+            return self.estatisticas_preco.get(int(self.entradas[1].value))
+        return None
+
     def menor_preco(self) -> float:
+        menor = matriz_precos.menor_preco(self.item.id)
+        if menor is not None:
+            return menor
         return min(
             [
                 item["preco"] for _, lista in self.fornecedores.items()
@@ -188,11 +202,13 @@ class JanelaEntrada(ft.AlertDialog):
         self.page.close(self)
 
     async def buscar_fornecedores(self) -> None:
-        fornecedores = await self.controle_item.buscar_fornecedores_relacao()
+        await matriz_precos.carregar()
+        fornecedores = await self.controle_item.buscar_fornecedores_relacao_estatisticas()
         if fornecedores:
             fornecedores_dict = {}
             for fornecedor in fornecedores:
                 fornecedores_dict.update({fornecedor[1]: fornecedor[2]})
+                self.estatisticas_preco[fornecedor[1]] = AcumuladorPreco.de_registro(fornecedor[5:])
                 self.fornecedores[fornecedor[1]].append(
                     {
                         "r_id": fornecedor[0],
@@ -283,24 +299,26 @@ class CartaoItem(ft.Card):
             )
         ])
 
+        self.imagem = ft.Image(
+            src=self.caminho_imagem(),
+            width=50,
+            height=50,
+            border_radius=ft.border_radius.all(50)
+        )
+        self.texto_nome = ft.Text(
+            value=self.item.nome.title(),
+            max_lines=1,
+            overflow=ft.TextOverflow.ELLIPSIS,
+            weight=ft.FontWeight.W_600,
+            size=17
+        )
         self.content = ft.Container(
             content=ft.Column([
                 ft.Container(
-                    ft.Image(
-                        src=self.item.path if self.item.path is not None else "imagens/image-slash.png",
-                        width=50,
-                        height=50,
-                        border_radius=ft.border_radius.all(50)
-                    ), alignment=ft.alignment.center
+                    self.imagem, alignment=ft.alignment.center
                 ),
                 ft.Container(
-                    ft.Text(
-                        value=self.item.nome.title(),
-                        max_lines=1,
-                        overflow=ft.TextOverflow.ELLIPSIS,
-                        weight=ft.FontWeight.W_600,
-                        size=17
-                    ), alignment=ft.alignment.center
+                    self.texto_nome, alignment=ft.alignment.center
                 ),
                 ft.Container(
                     self.menu_botoes,
@@ -312,6 +330,14 @@ class CartaoItem(ft.Card):
             border_radius=ft.border_radius.all(15)
         )
 
+    def caminho_imagem(self) -> str:
+        return self.item.path if self.item.path is not None else "imagens/image-slash.png"
+
+    def vincular(self, item: ModeloItem) -> None:
+        self.item = item
+        self.imagem.src = self.caminho_imagem()
+        self.texto_nome.value = self.item.nome.title()
+
     def criar_botao(self, content=None, icon=None, tooltip=None, on_click=None) -> ft.IconButton:
         return ft.IconButton(
             content=content,
@@ -330,6 +356,7 @@ class CartaoItem(ft.Card):
         self.page.open(janela)
 
     def abrir_configuracoes_item(self, e: ft.ControlEvent) -> None:
+        from pagina_config_itens import PaginaConfigItem
         pagina = PaginaConfigItem(self.item, self.controle_pagina)
         self.controle_pagina.alterar_para_barra_voltar()
         self.controle_pagina.adicionar_label_barra(self.item.nome.title())
@@ -350,41 +377,255 @@ class CartaoItem(ft.Card):
 
 
 class PaginaItens(ft.Container):
+    tamanho_pagina = 60
+    paginas_janela = 3
+    margem_rolagem = 400
+    largura_cartao = 170
+
     def __init__(self, controle_pagina: ControlePagina) -> None:
         super().__init__(expand=True)
         self.controle_pagina = controle_pagina
-        self.bd = BancoDeDados("db_app6.db")
+        self.controle_grade = ControleGradeItem(self)
+        self.itens_filtrados: List[ModeloItem] = []
+        self.cartoes: Dict[int, CartaoItem] = {}
+        self.livres: List[CartaoItem] = []
+        self.pendentes: List[Tuple[str, ModeloItem]] = []
+        self.inicio = 0
+        self.materializados = 0
+        self.colunas = 1
+        self.atualizacao_pendente = False
+        self.filtro_nome = ""
+        self.ids_busca: Optional[set] = None
+        self.mascara: Optional[int] = None
+        self.filtro_categoria = "todos"
         self.criar_grade_itens()
         self.content = self.grade_itens
+        catalogo_produtos.inscrever(self.ao_alterar_catalogo)
 
     def criar_grade_itens(self) -> None:
         self.grade_itens = ft.GridView(
             expand=1,
-            max_extent=170,
+            runs_count=self.colunas,
             child_aspect_ratio=1,
             spacing=10,
             run_spacing=10,
+            on_scroll=self.ao_rolar,
+            on_scroll_interval=100
         )
 
     async def criar_cards_itens(self) -> None:
-        itens = await self.bd.fetch_all(q6.selecionar_produtos)
-        self.content = self.grade_itens
+        await catalogo_produtos.carregar()
+        self.montar_cards()
 
-        self.grade_itens.controls = [
-            CartaoItem(ModeloItem(*item), ControleGradeItem(self), self.controle_pagina)
-            for item in itens
-        ]
+    def montar_cards(self, mascara: Optional[int] = None) -> None:
+        self.content = self.grade_itens
+        if mascara is None:
+            mascara = catalogo_produtos.filtro.combinar(self.filtro_categoria, self.filtro_nome)
+        self.mascara = mascara
+        self.itens_filtrados = catalogo_produtos.filtro.produtos(self.mascara)
+        self.atualizar_colunas()
+        self.inicio = 0
+        self.materializados = min(self.tamanho_pagina, len(self.itens_filtrados))
+        self.reconciliar(self.itens_filtrados[:self.materializados])
         self.grade_itens.update()
 
+    def reconciliar(self, itens: List[ModeloItem]) -> None:
+        atuais = self.grade_itens.controls
+        ids = {item.id for item in itens}
+        for cartao in atuais:
+            if cartao.item.id not in ids:
+                self.liberar(cartao)
+        comparador = SequenceMatcher(None, [cartao.item.id for cartao in atuais], [item.id for item in itens], autojunk=False)
+        for operacao, i1, i2, j1, j2 in reversed(comparador.get_opcodes()):
+            if operacao != "equal":
+                atuais[i1:i2] = [self.obter_cartao(item) for item in itens[j1:j2]]
+
+    def atualizar_colunas(self) -> bool:
+        if self.page is None or not self.page.width:
+            return False
+        colunas = max(1, math.ceil(self.page.width / (self.largura_cartao + self.grade_itens.spacing)))
+        if colunas == self.colunas:
+            return False
+        self.colunas = colunas
+        self.grade_itens.runs_count = colunas
+        return True
+
+    def materializar(self, quantidade: int) -> None:
+        fim = min(self.materializados + quantidade, len(self.itens_filtrados))
+        for indice in range(self.materializados, fim):
+            self.grade_itens.controls.append(self.obter_cartao(self.itens_filtrados[indice]))
+        self.materializados = fim
+
+    def materializar_inicio(self, quantidade: int) -> None:
+        inicio = max(self.inicio - quantidade, 0)
+        self.grade_itens.controls[:0] = [self.obter_cartao(item) for item in self.itens_filtrados[inicio:self.inicio]]
+        self.inicio = inicio
+
+    def descartar_inicio(self, quantidade: int) -> None:
+        for cartao in self.grade_itens.controls[:quantidade]:
+            self.liberar(cartao)
+        del self.grade_itens.controls[:quantidade]
+        self.inicio += quantidade
+
+    def descartar_fim(self, quantidade: int) -> None:
+        for cartao in self.grade_itens.controls[-quantidade:]:
+            self.liberar(cartao)
+        del self.grade_itens.controls[-quantidade:]
+        self.materializados -= quantidade
+
+    def obter_cartao(self, item: ModeloItem) -> CartaoItem:
+        cartao = self.cartoes.get(item.id)
+        if cartao is None:
+            if self.livres:
+                cartao = self.livres.pop()
+                cartao.vincular(item)
+            else:
+                cartao = CartaoItem(item, self.controle_grade, self.controle_pagina)
+            self.cartoes[item.id] = cartao
+        elif cartao.item is not item:
+            cartao.vincular(item)
+        return cartao
+
+    def liberar(self, cartao: CartaoItem) -> None:
+        if self.cartoes.get(cartao.item.id) is cartao:
+            del self.cartoes[cartao.item.id]
+            if len(self.livres) < self.tamanho_pagina:
+                self.livres.append(cartao)
+
+    def altura_linha(self, e: ft.OnScrollEvent) -> float:
+        linhas = math.ceil((self.materializados - self.inicio) / self.colunas)
+        altura = e.max_scroll_extent + e.viewport_dimension + self.grade_itens.run_spacing
+        return altura / linhas if linhas else 0.0
+
+    def ao_rolar(self, e: ft.OnScrollEvent) -> None:
+        if self.atualizar_colunas():
+            self.grade_itens.update()
+            return
+        passo = (self.tamanho_pagina // self.colunas) * self.colunas or self.colunas
+        limite = self.tamanho_pagina * self.paginas_janela
+        if e.pixels >= e.max_scroll_extent - self.margem_rolagem and self.materializados < len(self.itens_filtrados):
+            altura_linha = self.altura_linha(e)
+            self.materializar(self.tamanho_pagina)
+            excedente = self.materializados - self.inicio - limite
+            deslocamento = 0.0
+            if excedente > 0:
+                excedente = math.ceil(excedente / self.colunas) * self.colunas
+                self.descartar_inicio(excedente)
+                deslocamento = excedente // self.colunas * altura_linha
+            self.grade_itens.update()
+            if deslocamento:
+                self.grade_itens.scroll_to(offset=e.pixels - deslocamento, duration=0)
+        elif e.pixels <= self.margem_rolagem and self.inicio > 0:
+            altura_linha = self.altura_linha(e)
+            anterior = self.inicio
+            self.materializar_inicio(passo)
+            adicionados = anterior - self.inicio
+            excedente = self.materializados - self.inicio - limite
+            if excedente > 0:
+                self.descartar_fim(excedente)
+            self.grade_itens.update()
+            self.grade_itens.scroll_to(offset=e.pixels + math.ceil(adicionados / self.colunas) * altura_linha, duration=0)
+
+    def ao_alterar_catalogo(self, evento: str, produto: Optional[ModeloItem]) -> None:
+        if evento == "carregado":
+            return
+        if evento == "lote":
+            if self.atualizacao_pendente and self.page is not None:
+                self.grade_itens.update()
+            self.atualizacao_pendente = False
+            return
+        if self.page is None:
+            self.pendentes.append((evento, produto))
+            self.controle_pagina.atualizar_grade_itens = True
+            return
+        self.atualizar_busca()
+        alterado = self.aplicar_alteracao(evento, produto)
+        if alterado is None:
+            return
+        if catalogo_produtos.em_lote:
+            self.atualizacao_pendente = True
+        else:
+            alterado.update()
+
+    def aplicar_pendentes(self) -> None:
+        pendentes, self.pendentes = self.pendentes, []
+        self.atualizar_busca()
+        for evento, produto in pendentes:
+            self.aplicar_alteracao(evento, produto)
+        if pendentes:
+            self.grade_itens.update()
+
+    def aplicar_alteracao(self, evento: str, produto: ModeloItem) -> Optional[ft.Control]:
+        self.mascara = None
+        if evento == "atualizado" and self.aceitar(produto) and self.posicao(produto) is not None:
+            cartao = self.cartoes.get(produto.id)
+            if cartao is not None:
+                cartao.vincular(produto)
+            return cartao
+        self.retirar(produto.id)
+        if evento != "removido":
+            cartao = self.cartoes.get(produto.id)
+            if cartao is not None:
+                cartao.vincular(produto)
+            self.inserir(produto)
+        return self.grade_itens
+
+    def posicao(self, produto: ModeloItem) -> Optional[int]:
+        itens = self.itens_filtrados
+        indice = bisect_left(itens, produto.nome, key=lambda item: item.nome)
+        while indice < len(itens) and itens[indice].nome == produto.nome:
+            if itens[indice].id == produto.id:
+                ordenado = (indice == 0 or itens[indice - 1].nome <= produto.nome) and (
+                    indice + 1 == len(itens) or produto.nome <= itens[indice + 1].nome
+                )
+                return indice if ordenado else None
+            indice += 1
+        return None
+
+    def retirar(self, id: int) -> None:
+        for indice, item in enumerate(self.itens_filtrados):
+            if item.id == id:
+                del self.itens_filtrados[indice]
+                if indice < self.inicio:
+                    self.inicio -= 1
+                    self.materializados -= 1
+                elif indice < self.materializados:
+                    self.liberar(self.grade_itens.controls.pop(indice - self.inicio))
+                    self.materializados -= 1
+                return
+
+    def inserir(self, produto: ModeloItem) -> None:
+        if not self.aceitar(produto):
+            return
+        tudo_materializado = self.materializados == len(self.itens_filtrados)
+        indice = bisect_right(self.itens_filtrados, produto.nome, key=lambda item: item.nome)
+        self.itens_filtrados.insert(indice, produto)
+        if indice < self.inicio:
+            self.inicio += 1
+            self.materializados += 1
+        elif indice < self.materializados or tudo_materializado:
+            self.grade_itens.controls.insert(indice - self.inicio, self.obter_cartao(produto))
+            self.materializados += 1
+
+    def aceitar(self, item: ModeloItem) -> bool:
+        if self.filtro_categoria != "todos" and (item.categoria or "").lower() != self.filtro_categoria:
+            return False
+        return self.ids_busca is None or item.id in self.ids_busca
+
+    def atualizar_busca(self) -> None:
+        self.ids_busca = catalogo_produtos.indice_busca.buscar(self.filtro_nome)
+
     def filtrar(self, nome_item: str) -> None:
         if isinstance(nome_item, str):
-            nome_item_lower = nome_item.lower()
-            for cartao in self.grade_itens.controls:
-                cartao.visible = cartao.item.nome.lower().startswith(nome_item_lower)
-        self.grade_itens.update()
+            self.filtro_nome = nome_item
+        self.atualizar_busca()
+        self.aplicar_filtros()
 
     def filtrar_categoria(self, categoria: str) -> None:
-        cat_loger = categoria.lower()
-        for cartao in self.grade_itens.controls:
-                cartao.visible = (cartao.item.categoria.lower() == cat_loger) if cat_loger != "todos" else True
-        self.grade_itens.update()
\ No newline at end of file
+        self.filtro_categoria = categoria.lower()
+        self.aplicar_filtros()
+
+    def aplicar_filtros(self) -> None:
+        mascara = catalogo_produtos.filtro.combinar(self.filtro_categoria, self.filtro_nome)
+        if mascara != self.mascara:
+            self.montar_cards(mascara)
@@ -1,37 +1,124 @@
 import flet as ft
+import asyncio
 import locale
-import openpyxl
-from openpyxl.worksheet.dimensions import ColumnDimension, DimensionHolder
-from openpyxl.utils import get_column_letter
 from datetime import datetime
+from typing import Dict, Iterable, Iterator, List, Optional
 
 from acessorios import Utilidades, JanelaNotificacao
-from modelos import ModeloItem
-from controles import ControleItem
+from exportacao import ExportadorPlanilha
+from otimizacao import MatrizPrecos, OtimizadorFornecedores
+from modelos import ModeloItem, ModeloLinhaCompra
+from controles import ControleItem, ControleListaCompras
+from precos import matriz_precos
 
 locale.setlocale(locale.LC_ALL, "pt_BR.UTF-8")
 
 
+class AutosalvamentoLista:
+    atraso = 0.8
+
+    def __init__(self, tabela_produtos) -> None:
+        self.tabela_produtos = tabela_produtos
+        self.controle = ControleListaCompras()
+        self.lista_id = None
+        self.editada = False
+        self.pendentes = set()
+        self.versao = 0
+        self.trava = asyncio.Lock()
+
+    def marcar(self, id: int) -> None:
+        self.pendentes.add(int(id))
+
+    def agendar(self, edicao: bool = True) -> None:
+        self.editada = self.editada or edicao
+        if (self.lista_id is None and not self.editada) or not self.pendentes:
+            return
+        self.versao += 1
+        self.tabela_produtos.page.run_task(self.aguardar_e_salvar, self.versao)
+
+    async def aguardar_e_salvar(self, versao: int) -> None:
+        await asyncio.sleep(self.atraso)
+        if versao == self.versao:
+            await self.salvar()
+
+    async def salvar(self) -> None:
+        async with self.trava:
+            if self.lista_id is None:
+                if self.editada:
+                    await self.criar_lista()
+                return
+            if not self.pendentes:
+                return
+            ids, self.pendentes = self.pendentes, set()
+            linhas = [self.tabela_produtos.linhas[id] for id in ids if id in self.tabela_produtos.linhas]
+            await self.controle.salvar_linhas(self.lista_id, linhas)
+
+    async def salvar_agora(self) -> None:
+        self.editada = True
+        await self.salvar()
+
+    async def criar_lista(self) -> None:
+        nome = f"Lista {datetime.now().strftime('%d/%m/%Y %H:%M')}"
+        self.pendentes.clear()
+        self.lista_id = await self.controle.criar_lista(nome, list(self.tabela_produtos.linhas.values()))
+
+
 class ControleTabelas:
-    def __init__(self, tabela_produtos, tabela_fornecedor, painel_consumo):
+    def __init__(self, tabela_produtos, tabela_fornecedor, painel_consumo, barra_progresso=None, autosalvamento=None):
         self.tabela_fornecedor = tabela_fornecedor
         self.tabela_produtos = tabela_produtos
         self.painel_consumo = painel_consumo
+        self.barra_progresso = barra_progresso
+        self.autosalvamento = autosalvamento
 
     async def ler_fornecedores(self, id_produto: int) -> None:
         await self.tabela_fornecedor.ler_fornecedores(id_produto)
 
-    def adicionar_fornecedor(self, id: int, nome: str, marca: str, preco: float) -> None:
-        self.tabela_produtos.adicionar_fornecedor(id, nome, marca, preco)
+    def adicionar_fornecedor(
+            self,
+            id: int,
+            nome: str,
+            marca: str,
+            preco: float,
+            id_relacao: Optional[int]=None,
+            atualizar: bool=True
+        ) -> None:
+        self.tabela_produtos.adicionar_fornecedor(id, nome, marca, preco, id_relacao, atualizar)
+        self.registrar_alteracao(id, atualizar)
 
     async def ler_consumo_e_infos(self, id_produto: int) -> None:
         await self.painel_consumo.ler_consumo_e_infos(id_produto)
 
-    def adicionar_quantidade(self, id: int, quantidade: str, medida: str) -> None:
-        self.tabela_produtos.adicionar_quantidade(id, quantidade, medida)
+    def adicionar_quantidade(self, id: int, quantidade: str, medida: str, atualizar: bool=True) -> None:
+        self.tabela_produtos.adicionar_quantidade(id, quantidade, medida, atualizar)
+        self.registrar_alteracao(id, atualizar)
+
+    def iniciar_progresso(self) -> None:
+        if self.barra_progresso is not None:
+            self.barra_progresso.value = 0
+            self.barra_progresso.visible = True
+            self.barra_progresso.update()
+
+    def publicar_lote(self, concluidos: int, total: int) -> None:
+        if self.barra_progresso is None:
+            self.tabela_produtos.update()
+            return
+        self.barra_progresso.value = concluidos / total if total else 1
+        self.barra_progresso.visible = concluidos < total
+        self.tabela_produtos.page.update(self.tabela_produtos, self.barra_progresso)
+        if self.autosalvamento is not None:
+            self.autosalvamento.agendar(edicao=False)
 
     def atualizar_preco(self, id: int, preco: float) -> None:
         self.tabela_produtos.atualizar_preco(id, preco)
+        self.registrar_alteracao(id, True)
+
+    def registrar_alteracao(self, id: int, agendar: bool) -> None:
+        if self.autosalvamento is None:
+            return
+        self.autosalvamento.marcar(id)
+        if agendar:
+            self.autosalvamento.agendar()
 
 
 class JanelaEdicao(ft.AlertDialog):
@@ -71,30 +158,45 @@ class TabelaProdutos(ft.DataTable):
             heading_row_height=40
         )
         self.controle = None
+        self.linhas: Dict[int, ModeloLinhaCompra] = {}
+        self.linhas_tabela: Dict[int, ft.DataRow] = {}
 
-    def adicionar_linha(self, dados: list) -> None:
-        async def editar_fornecedor_ao_clicar(e: ft.ControlEvent, id: int=dados[0]) -> None:
+    def adicionar_linha(self, linha: ModeloLinhaCompra) -> None:
+        async def editar_fornecedor_ao_clicar(e: ft.ControlEvent, id: int=linha.id) -> None:
             await self.editar_fornecedor(id)
 
-        async def editar_consumo_e_infos_ao_clicar(e: ft.ControlEvent, id: int=dados[0]) -> None:
+        async def editar_consumo_e_infos_ao_clicar(e: ft.ControlEvent, id: int=linha.id) -> None:
             await self.editar_consumo_e_infos(id)
 
-        def editar_preco_ao_clicar(e: ft.ControlEvent, id: int=dados[0]) -> None:
+        def editar_preco_ao_clicar(e: ft.ControlEvent, id: int=linha.id) -> None:
             self.editar_preco(id)
 
-        self.rows.append(
-            ft.DataRow(
-                cells=[
-                    ft.DataCell(ft.Text(dados[0]), visible=False),
-                    ft.DataCell(ft.Text(dados[1])),
-                    ft.DataCell(ft.Text(dados[2]), show_edit_icon=True, on_tap=editar_fornecedor_ao_clicar),
-                    ft.DataCell(ft.Text(dados[3])),
-                    ft.DataCell(ft.Text(dados[4]), show_edit_icon=True, on_tap=editar_preco_ao_clicar),
-                    ft.DataCell(ft.Text(dados[5]), show_edit_icon=True, on_tap=editar_consumo_e_infos_ao_clicar),
-                    ft.DataCell(ft.Text(dados[6]))
-                ]
-            )
+        row = ft.DataRow(
+            cells=[
+                ft.DataCell(ft.Text(linha.id), visible=False),
+                ft.DataCell(ft.Text(linha.nome)),
+                ft.DataCell(ft.Text(), show_edit_icon=True, on_tap=editar_fornecedor_ao_clicar),
+                ft.DataCell(ft.Text()),
+                ft.DataCell(ft.Text(), show_edit_icon=True, on_tap=editar_preco_ao_clicar),
+                ft.DataCell(ft.Text(), show_edit_icon=True, on_tap=editar_consumo_e_infos_ao_clicar),
+                ft.DataCell(ft.Text())
+            ]
         )
+        self.linhas[linha.id] = linha
+        self.linhas_tabela[linha.id] = row
+        self.rows.append(row)
+        self.renderizar_linha(linha.id, atualizar=False)
+
+    def renderizar_linha(self, id: int, atualizar: bool=True) -> None:
+        linha = self.linhas[id]
+        row = self.linhas_tabela[id]
+        row.cells[2].content.value = linha.fornecedor[:30]
+        row.cells[3].content.value = linha.marca[:20]
+        row.cells[4].content.value = locale.currency(linha.preco, grouping=True)
+        row.cells[5].content.value = self.formatar_quantidade(linha.quantidade, linha.medida)
+        row.cells[6].content.value = locale.currency(linha.total, grouping=True)
+        if atualizar:
+            row.update()
 
     async def editar_fornecedor(self, id: int) -> None:
         await self.controle.ler_fornecedores(id)
@@ -106,39 +208,43 @@ class TabelaProdutos(ft.DataTable):
         janela = JanelaEdicao(self.controle, id)
         self.page.open(janela)
 
-    def adicionar_fornecedor(self, id: int, nome: str, marca: str, preco: float) -> None:
-        for row in self.rows:
-            if int(id) == int(row.cells[0].content.value):
-                row.cells[2].content.value = nome[:30]
-                row.cells[3].content.value = marca[:20]
-                row.cells[4].content.value = locale.currency(preco, grouping=True)
-                row.cells[2].content.update()
-                row.cells[3].content.update()
-                row.cells[4].content.update()
-
-    def adicionar_quantidade(self, id: int, quantidade: str, medida: str) -> None:
-        for row in self.rows:
-            if int(id) == int(row.cells[0].content.value) and quantidade:
-                valor_opercao = self.calcular_valor_operacao(row, quantidade)
-                row.cells[5].content.value = self.formatar_quantidade(quantidade, medida)
-                row.cells[6].content.value = valor_opercao
-                row.cells[5].content.update()
-                row.cells[6].content.update()
+    def adicionar_fornecedor(
+            self,
+            id: int,
+            nome: str,
+            marca: str,
+            preco: float,
+            id_relacao: Optional[int]=None,
+            atualizar: bool=True
+        ) -> None:
+        linha = self.linhas.get(int(id))
+        if linha is not None:
+            linha.fornecedor = nome
+            linha.marca = marca
+            linha.preco = float(preco)
+            linha.id_relacao = id_relacao
+            linha.preco_relacao = linha.preco if id_relacao is not None else None
+            self.renderizar_linha(linha.id, atualizar)
+
+    def adicionar_quantidade(self, id: int, quantidade: str, medida: str, atualizar: bool=True) -> None:
+        linha = self.linhas.get(int(id))
+        if linha is not None and quantidade:
+            linha.quantidade = float(quantidade)
+            linha.medida = medida
+            self.renderizar_linha(linha.id, atualizar)
 
     def atualizar_preco(self, id: int, preco: float) -> None:
-        for row in self.rows:
-            if int(id) == int(row.cells[0].content.value):
-                row.cells[4].content.value = locale.currency(preco, grouping=True)
-                row.cells[4].content.update()
-
-    def calcular_valor_operacao(self, linha: ft.DataRow, quantidade: str) -> str:
-        preco = linha.cells[4].content.value
-        preco = float(preco.replace("R$", "").strip().replace(".", "").replace(",", "."))
-        valor_operacao = float(quantidade) * preco
-        return locale.currency(valor_operacao, grouping=True)
-
-    def formatar_quantidade(self, quantidade: str, medida: str) -> str:
-        return f"{str(quantidade).replace(".", ",")} {Utilidades.encurtar_medida(medida)}"
+        linha = self.linhas.get(int(id))
+        if linha is not None:
+            linha.preco = preco
+            self.renderizar_linha(linha.id)
+
+    def formatar_quantidade(self, quantidade: float, medida: Optional[str]) -> str:
+        if medida is None:
+            return str(int(quantidade))
+        if medida == "unidade":
+            return f"{int(quantidade)} {Utilidades.encurtar_medida(medida)}"
+        return f"{quantidade:.3f}".replace(".", ",") + f" {Utilidades.encurtar_medida(medida)}"
 
     def definir_controle(self, controle: ControleTabelas) -> None:
         self.controle = controle
@@ -165,9 +271,10 @@ class TabelaFornecedor(ft.DataTable):
             e: ft.ControlEvent,
             nome: str=dado[2],
             marca: str=dado[4],
-            preco: float=dado[3]
+            preco: float=dado[3],
+            id_relacao: int=dado[0]
         ) -> None:
-            self.adicionar_fornecedor(nome, marca, preco)
+            self.adicionar_fornecedor(nome, marca, preco, id_relacao)
 
         self.rows.append(
             ft.DataRow(
@@ -200,8 +307,8 @@ class TabelaFornecedor(ft.DataTable):
     def ordenar_resultado(self, dados: list) -> None:
         return sorted(dados, key=lambda x: x[3])
 
-    def adicionar_fornecedor(self, nome: str, marca: str, preco: str) -> None:
-        self.controle.adicionar_fornecedor(self.controle_produto.id, nome, marca, preco)
+    def adicionar_fornecedor(self, nome: str, marca: str, preco: str, id_relacao: int) -> None:
+        self.controle.adicionar_fornecedor(self.controle_produto.id, nome, marca, preco, id_relacao)
 
     def definir_controle(self, controle: ControleTabelas) -> None:
         self.controle = controle
@@ -354,90 +461,109 @@ class PainelInfos(ft.Container):
 
 
 class PlanilhaListaCompras:
-    def __init__(self, linhas_tabela: ft.DataRow, nome_arquivo: str="compras.xlsx") -> None:
-        self.linhas_tabela = linhas_tabela
+    def __init__(self, linhas: Iterable[ModeloLinhaCompra], nome_arquivo: str="compras.xlsx") -> None:
+        self.linhas = list(linhas)
         self.nome_arquivo = nome_arquivo
-        self.colunas = ["Nome", "Fornecedor", "Marca", "Preço", "Quantidade", "Valor Op."]
-        self.dims = [20, 20, 20, 15, 15, 15]
-        self.book = openpyxl.Workbook()
-
-    def criar(self) -> None:
-        lista_produtos = self.extrair_valores()
-        ws = self.book.active
-        ws.append(self.colunas)
-        for produto in lista_produtos:
-            ws.append(produto)
+        self.exportador = ExportadorPlanilha(
+            colunas=["Nome", "Fornecedor", "Marca", "Preço", "Quantidade", "Valor Op."],
+            larguras=[20, 20, 20, 15, 15, 15],
+            colunas_moeda=(3, 5),
+            colunas_total=(5,)
+        )
 
-        valor_total = self.valor_total(lista_produtos)
-        ws.append(["valor total", "-", "-", "-", "-", valor_total])
+    async def criar(self, formato: str="xlsx") -> None:
+        self.nome_arquivo = await self.exportador.exportar(self.nome_arquivo, self.extrair_valores(), formato)
 
-        dim_holder = DimensionHolder(worksheet=ws)
-
-        for col in range(ws.min_column, ws.max_column + 1):
-            dim_holder[get_column_letter(col)] = ColumnDimension(ws, min=col, max=col, width=self.dims[col-1])
-
-        ws.column_dimensions = dim_holder
-        
-        self.adicionar_data_ao_nome()
-        self.book.save(self.nome_arquivo)
-
-    def extrair_valores(self) -> list:
-        return [
-            [linha.cells[i].content.value for i in range(1, 7)]
-            for linha in self.linhas_tabela
-        ]
-    
-    def valor_total(self, lista_produtos: list) -> str:
-        valor_total = 0
-        for produto in lista_produtos:
-            valor_total += self.formatar_preco(produto[5])
-        return locale.currency(valor_total, grouping=True)
-
-    def formatar_preco(self, preco: str) -> float:
-        return float(preco.replace("R$", "").strip().replace(",", "."))
-    
-    def adicionar_data_ao_nome(self):
-        nome_list = self.nome_arquivo.split(".")
-        nome_full = nome_list[0] + f"_{datetime.now().strftime("%d_%m_%Y")}." + nome_list[1]
-        self.nome_arquivo = nome_full
+    def extrair_valores(self) -> Iterator[list]:
+        for linha in self.linhas:
+            yield [linha.nome, linha.fornecedor, linha.marca, linha.preco, linha.quantidade, linha.total]
 
 
 class AgentePreenchedor:
-    def __init__(self, infos_produtos: list, controle_tabelas: ControleTabelas):
+    tamanho_lote = 50
+
+    def __init__(
+            self,
+            infos_produtos: list,
+            controle_tabelas: ControleTabelas,
+            otimizador: Optional[OtimizadorFornecedores]=None,
+            quantidades_sugeridas: Optional[Dict[int, float]]=None
+        ):
         self.infos_produtos = infos_produtos
         self.controle_tabelas = controle_tabelas
+        self.otimizador = otimizador
+        self.quantidades_sugeridas = quantidades_sugeridas or {}
+        self.controle = ControleListaCompras()
 
     async def preencher(self):
-        for produto in self.infos_produtos:
-            controle = ControleItem(ModeloItem(produto[0]), None)
-            fornecedor = await self.buscar_melhor_fornecedor(controle)
-            infos = await self.obter_infos(controle)
-            self.adicionar_fornecedor(fornecedor)
-            self.adicionar_quantidade(infos)
+        ids_produtos = [produto[0] for produto in self.infos_produtos]
+        await matriz_precos.carregar()
+        registros = await self.controle.buscar_infos_produtos(ids_produtos)
+        precos = await self.controle.buscar_precos_fornecedores(ids_produtos)
+        relacoes = self.agrupar_relacoes(precos)
+        fornecedores = [self.escolher_fornecedor(registro[0], relacoes) for registro in registros]
+        infos = [self.extrair_infos(registro) for registro in registros]
+        quantidades = [
+            self.quantidades_sugeridas.get(info[0], self.obter_quantidade(info))
+            for info in infos
+        ]
+        if self.otimizador is not None:
+            fornecedores = await self.otimizar_fornecedores(fornecedores, quantidades, precos)
+
+        if not registros:
+            return
+        self.controle_tabelas.iniciar_progresso()
+        for inicio in range(0, len(registros), self.tamanho_lote):
+            for i in range(inicio, min(inicio + self.tamanho_lote, len(registros))):
+                self.adicionar_fornecedor(fornecedores[i])
+                self.adicionar_quantidade(infos[i], quantidades[i])
+            self.controle_tabelas.publicar_lote(min(inicio + self.tamanho_lote, len(registros)), len(registros))
+            await asyncio.sleep(0)
+
+    async def otimizar_fornecedores(self, fornecedores: List[tuple], quantidades: List[float], precos: list) -> List[tuple]:
+        ids = [fornecedor[0] for fornecedor in fornecedores]
+        matriz = MatrizPrecos(ids, precos)
+        loop = asyncio.get_running_loop()
+        escolhidos = await loop.run_in_executor(None, matriz.escolher, quantidades, self.otimizador)
+        return [
+            (id, registro[3], registro[4], registro[5], registro[1]) if registro is not None else (id, "-", 0, "-", None)
+            for id, registro in zip(ids, escolhidos)
+        ]
 
     def adicionar_fornecedor(self, fornecedor: list):
-        self.controle_tabelas.adicionar_fornecedor(fornecedor[0], fornecedor[1], fornecedor[3], fornecedor[2])
+        self.controle_tabelas.adicionar_fornecedor(
+            fornecedor[0], fornecedor[1], fornecedor[3], fornecedor[2], fornecedor[4], atualizar=False
+        )
 
-    def adicionar_quantidade(self, infos):
+    def obter_quantidade(self, infos) -> float:
         if all(infos):
             qtd = self.calcular_quantidade(infos)
-            qtd = self.formatar_quantidade(qtd, infos[2])
-        else:
-            qtd = 0
-        self.controle_tabelas.adicionar_quantidade(infos[0], qtd, infos[2])
-
-    async def buscar_melhor_fornecedor(self, controle: ControleItem):
-        fornecedores = await controle.buscar_fornecedores_relacao()
-        if fornecedores:
-            fornecedor = sorted(fornecedores, key=lambda x: x[3])[0]
-            return (controle.id, fornecedor[2], fornecedor[3], fornecedor[4])
-        else:
-            return (controle.id, "-", 0, "-")
-        
-    async def obter_infos(self, controle: ControleItem):
-        infos = await controle.obter_dados_infos()
-        medida = await controle.obter_medida()
-        return (controle.id, infos[0], medida[0], infos[2])
+            return self.formatar_quantidade(qtd, infos[2])
+        return 0
+
+    def adicionar_quantidade(self, infos, qtd):
+        self.controle_tabelas.adicionar_quantidade(infos[0], qtd, infos[2], atualizar=False)
+
+    def agrupar_relacoes(self, precos: list) -> Dict[tuple, List[tuple]]:
+        relacoes = {}
+        for id_produto, id_relacao, id_fornecedor, nome, preco, marca in precos:
+            relacoes.setdefault((id_produto, id_fornecedor), []).append((id_relacao, nome, preco, marca))
+        return relacoes
+
+    def escolher_fornecedor(self, id: int, relacoes: Dict[tuple, List[tuple]]) -> tuple:
+        id_fornecedor = matriz_precos.melhor_fornecedor(id)
+        candidatos = relacoes.get((id, id_fornecedor))
+        if not candidatos:
+            return (id, "-", 0, "-", None)
+        menor_preco = matriz_precos.preco(id, id_fornecedor)
+        id_relacao, nome, preco, marca = min(
+            candidatos, key=lambda relacao: (matriz_precos.numero(relacao[2]) != menor_preco, relacao[0])
+        )
+        return (id, nome, preco, marca, id_relacao)
+
+    def extrair_infos(self, registro: tuple) -> tuple:
+        id, medida, armazenamento, qtd_media = registro
+        return (id, armazenamento, medida, qtd_media)
     
     def calcular_quantidade(self, infos):
         if all(infos):
@@ -449,31 +575,40 @@ class AgentePreenchedor:
         
     def formatar_quantidade(self, qtd, medida):
         if medida == "unidade":
-            qtd = int(qtd)
-        else:
-            qtd_split = str(qtd).split(".")
-            zeros = "0" * (3 - len(qtd_split[1]))
-            qtd = qtd_split[0] + "." + qtd_split[1] + zeros
-        return qtd
+            return int(qtd)
+        return round(qtd, 3)
 
 
 class PaginaListacompras(ft.Container):
-    def __init__(self, infos_produtos: list, preencher_automatico: bool) -> None:
+    def __init__(
+            self,
+            infos_produtos: list,
+            preencher_automatico: bool,
+            lista_id: Optional[int]=None,
+            otimizador: Optional[OtimizadorFornecedores]=None,
+            quantidades_sugeridas: Optional[Dict[int, float]]=None
+        ) -> None:
         super().__init__(expand=True)
         self.infos_produtos = infos_produtos
         self.preencher_automatico = preencher_automatico
+        self.lista_id = lista_id
         self.tabela_produtos = TabelaProdutos()
         self.tabela_fornecedores = TabelaFornecedor()
         self.painel_infos = PainelInfos()
+        self.barra_progresso = ft.ProgressBar(value=0, visible=False)
+        self.autosalvamento = AutosalvamentoLista(self.tabela_produtos)
         self.controle_tabelas = ControleTabelas(
-            self.tabela_produtos, self.tabela_fornecedores, self.painel_infos
+            self.tabela_produtos, self.tabela_fornecedores, self.painel_infos, self.barra_progresso, self.autosalvamento
+        )
+        self.agente_preenchedor = AgentePreenchedor(
+            infos_produtos, self.controle_tabelas, otimizador, quantidades_sugeridas
         )
-        self.agente_preenchedor = AgentePreenchedor(infos_produtos, self.controle_tabelas)
         self.content = ft.ResponsiveRow([
             ft.Column([
                 ft.Card(
                     ft.Container(
                         ft.Column([
+                            self.barra_progresso,
                             ft.ResponsiveRow([
                                 self.tabela_produtos
                             ])
@@ -502,13 +637,50 @@ class PaginaListacompras(ft.Container):
 
     def adicionar_registros_primarios(self) -> None:
         for id, nome in self.infos_produtos:
-            self.tabela_produtos.adicionar_linha([id, nome, "-", "-", "R$ 00,00", "0", "R$ 00,00"])
+            self.tabela_produtos.adicionar_linha(ModeloLinhaCompra(int(id), nome))
+        self.tabela_produtos.update()
+
+    async def preencher_lista(self) -> None:
+        if self.preencher_automatico:
+            await self.agente_preenchedor.preencher()
+
+    async def carregar_lista(self) -> None:
+        linhas = await ControleListaCompras().carregar_lista(self.lista_id)
+        for linha in linhas:
+            self.tabela_produtos.adicionar_linha(linha)
         self.tabela_produtos.update()
+        self.autosalvamento.lista_id = self.lista_id
 
-    def criar_planilha(self, e: ft.ControlEvent) -> None:
-        planilha = PlanilhaListaCompras(self.tabela_produtos.rows)
+    def acoes_barra(self) -> ft.Container:
+        return ft.Container(
+            ft.Row([
+                ft.IconButton(ft.Icons.SAVE, on_click=self.salvar_lista, tooltip="Salvar Lista"),
+                ft.IconButton(ft.Icons.TEXT_SNIPPET_OUTLINED, on_click=self.criar_csv, tooltip="Exportar CSV"),
+                ft.IconButton(ft.Icons.CREATE, on_click=self.criar_planilha, tooltip="Exportar Planilha")
+            ], spacing=5),
+            padding=ft.padding.only(right=20)
+        )
+
+    async def salvar_lista(self, e: ft.ControlEvent) -> None:
         try:
-            planilha.criar()
+            await self.autosalvamento.salvar_agora()
+        except Exception:
+            janela = JanelaNotificacao("Houve um erro!", ft.icons.ERROR)
+        else:
+            self.lista_id = self.autosalvamento.lista_id
+            janela = JanelaNotificacao("Lista Salva", ft.icons.CHECK)
+        self.page.open(janela)
+
+    async def criar_planilha(self, e: ft.ControlEvent) -> None:
+        await self.exportar("xlsx")
+
+    async def criar_csv(self, e: ft.ControlEvent) -> None:
+        await self.exportar("csv")
+
+    async def exportar(self, formato: str) -> None:
+        planilha = PlanilhaListaCompras(self.tabela_produtos.linhas.values())
+        try:
+            await planilha.criar(formato)
         except Exception as e:
             janela = JanelaNotificacao("Houve um erro!", ft.icons.ERROR)
         else:
@@ -519,6 +691,11 @@ class PaginaListacompras(ft.Container):
         self.tabela_produtos.definir_controle(self.controle_tabelas)
         self.tabela_fornecedores.definir_controle(self.controle_tabelas)
         self.painel_infos.definir_controle(self.controle_tabelas)
-        self.adicionar_registros_primarios()
-        if self.preencher_automatico:
-            self.page.run_task(self.agente_preenchedor.preencher)
+        if self.lista_id is None:
+            self.adicionar_registros_primarios()
+            self.page.run_task(self.preencher_lista)
+        else:
+            self.page.run_task(self.carregar_lista)
+
+    def will_unmount(self) -> None:
+        self.page.run_task(self.autosalvamento.salvar)
@@ -0,0 +1,167 @@
+from typing import Dict, Optional, Tuple
+
+from acessorios import BancoDeDados
+import querys_app6 as q6
+
+
+class MatrizPrecosFornecedores:
+    capacidade_inicial = 64
+
+    def __init__(self) -> None:
+        self.bd = BancoDeDados("db_app6.db")
+        self.linhas: Dict[int, int] = {}
+        self.colunas: Dict[int, int] = {}
+        self.ids_fornecedores = []
+        self.relacoes: Dict[int, Tuple[int, int, float]] = {}
+        self.celulas: Dict[Tuple[int, int], Dict[int, float]] = {}
+        self.carregado = False
+
+    async def carregar(self, forcar: bool = False) -> None:
+        if self.carregado and not forcar:
+            return
+        registros = await self.bd.fetch_all(q6.obter_matriz_precos)
+        self.reiniciar(len({registro[1] for registro in registros}), len({registro[2] for registro in registros}))
+        for id_relacao, id_produto, id_fornecedor, preco in registros:
+            self.registrar(id_relacao, id_produto, id_fornecedor, preco)
+        self.recalcular_minimos()
+        self.carregado = True
+
+    def reiniciar(self, produtos: int, fornecedores: int) -> None:
+        import numpy as np
+
+        self.linhas.clear()
+        self.colunas.clear()
+        self.ids_fornecedores = []
+        self.relacoes.clear()
+        self.celulas.clear()
+        self.precos = np.full(
+            (max(produtos, self.capacidade_inicial), max(fornecedores, self.capacidade_inicial)), np.inf
+        )
+        self.minimos = np.full(self.precos.shape[0], np.inf)
+        self.melhores = np.full(self.precos.shape[0], -1)
+
+    def recalcular_minimos(self) -> None:
+        import numpy as np
+
+        usadas = self.precos[:len(self.linhas), :len(self.colunas)]
+        if usadas.size:
+            self.melhores[:len(self.linhas)] = usadas.argmin(axis=1)
+            self.minimos[:len(self.linhas)] = usadas.min(axis=1)
+        self.melhores[np.isinf(self.minimos)] = -1
+
+    def linha(self, id_produto: int) -> int:
+        i = self.linhas.get(id_produto)
+        if i is None:
+            i = len(self.linhas)
+            if i >= self.precos.shape[0]:
+                self.crescer(linhas=True)
+            self.linhas[id_produto] = i
+        return i
+
+    def coluna(self, id_fornecedor: int) -> int:
+        j = self.colunas.get(id_fornecedor)
+        if j is None:
+            j = len(self.colunas)
+            if j >= self.precos.shape[1]:
+                self.crescer(linhas=False)
+            self.colunas[id_fornecedor] = j
+            self.ids_fornecedores.append(id_fornecedor)
+        return j
+
+    def crescer(self, linhas: bool) -> None:
+        import numpy as np
+
+        n, m = self.precos.shape
+        if linhas:
+            self.precos = np.vstack([self.precos, np.full((n, m), np.inf)])
+            self.minimos = np.concatenate([self.minimos, np.full(n, np.inf)])
+            self.melhores = np.concatenate([self.melhores, np.full(n, -1)])
+        else:
+            self.precos = np.hstack([self.precos, np.full((n, m), np.inf)])
+
+    def registrar(self, id_relacao: int, id_produto: int, id_fornecedor: int, preco) -> Tuple[int, int]:
+        i, j = self.linha(id_produto), self.coluna(id_fornecedor)
+        preco = self.numero(preco)
+        self.relacoes[id_relacao] = (i, j, preco)
+        precos_celula = self.celulas.setdefault((i, j), {})
+        precos_celula[id_relacao] = preco
+        self.precos[i, j] = min(precos_celula.values())
+        return i, j
+
+    def atualizar_linha(self, i: int) -> None:
+        usadas = self.precos[i, :len(self.colunas)]
+        j = int(usadas.argmin()) if usadas.size else -1
+        self.minimos[i] = usadas[j] if j >= 0 else float("inf")
+        self.melhores[i] = j if j >= 0 and self.minimos[i] != float("inf") else -1
+
+    def definir(self, id_relacao: int, id_produto: int, id_fornecedor: int, preco) -> None:
+        if not self.carregado:
+            return
+        self.remover(id_relacao)
+        i, _ = self.registrar(id_relacao, id_produto, id_fornecedor, preco)
+        self.atualizar_linha(i)
+
+    def atualizar_preco(self, id_relacao: int, preco) -> None:
+        if not self.carregado or id_relacao not in self.relacoes:
+            return
+        i, j, _ = self.relacoes[id_relacao]
+        preco = self.numero(preco)
+        self.relacoes[id_relacao] = (i, j, preco)
+        self.celulas[(i, j)][id_relacao] = preco
+        self.precos[i, j] = min(self.celulas[(i, j)].values())
+        self.atualizar_linha(i)
+
+    def remover(self, id_relacao: int) -> None:
+        if not self.carregado:
+            return
+        relacao = self.relacoes.pop(id_relacao, None)
+        if relacao is None:
+            return
+        i, j, _ = relacao
+        precos_celula = self.celulas[(i, j)]
+        precos_celula.pop(id_relacao, None)
+        self.precos[i, j] = min(precos_celula.values()) if precos_celula else float("inf")
+        if not precos_celula:
+            del self.celulas[(i, j)]
+        self.atualizar_linha(i)
+
+    def remover_produto(self, id_produto: int) -> None:
+        i = self.linhas.get(id_produto)
+        if not self.carregado or i is None:
+            return
+        for id_relacao in [id for id, relacao in self.relacoes.items() if relacao[0] == i]:
+            self.remover(id_relacao)
+
+    def remover_fornecedor(self, id_fornecedor: int) -> None:
+        j = self.colunas.get(id_fornecedor)
+        if not self.carregado or j is None:
+            return
+        for id_relacao in [id for id, relacao in self.relacoes.items() if relacao[1] == j]:
+            self.remover(id_relacao)
+
+    def menor_preco(self, id_produto: int) -> Optional[float]:
+        i = self.linhas.get(id_produto)
+        if i is None or self.melhores[i] < 0:
+            return None
+        return float(self.minimos[i])
+
+    def melhor_fornecedor(self, id_produto: int) -> Optional[int]:
+        i = self.linhas.get(id_produto)
+        if i is None or self.melhores[i] < 0:
+            return None
+        return self.ids_fornecedores[self.melhores[i]]
+
+    def preco(self, id_produto: int, id_fornecedor: int) -> Optional[float]:
+        i, j = self.linhas.get(id_produto), self.colunas.get(id_fornecedor)
+        if i is None or j is None or self.precos[i, j] == float("inf"):
+            return None
+        return float(self.precos[i, j])
+
+    def numero(self, valor) -> float:
+        try:
+            return float(valor)
+        except (TypeError, ValueError):
+            return float("inf")
+
+
+matriz_precos = MatrizPrecosFornecedores()
@@ -33,6 +33,8 @@ atualizar_preco_relacao = "UPDATE relacao_produto_fornecedor SET preco = ? WHERE
 
 apagar_relacao_produto_fornecedor = "DELETE FROM relacao_produto_fornecedor WHERE id = ?;"
 
+obter_matriz_precos = "SELECT id, id_produto, id_fornecedor, preco FROM relacao_produto_fornecedor;"
+
 atualizar_consumo_produto = "UPDATE consumo_dia SET valor = ? WHERE id_produto = ? AND dia_semana = ?;"
 
 obter_dados_consumo = "SELECT dia_semana, valor FROM consumo_dia WHERE id_produto = ?;"
@@ -48,23 +50,25 @@ FROM infos_produto WHERE produto_id = ?;
 """
 
 inserir_valores_infos = """
-INSERT INTO infos_produto(produto_id, armazenamento, validade, qtd_media, frequencia, preco_medio, perdas, path_imagem)
-VALUES(?, ?, ?, ?, ?, ?, ?, ?)
+INSERT INTO infos_produto(produto_id, armazenamento, validade, qtd_media, frequencia, preco_medio, perdas, path_imagem, path_miniatura)
+VALUES(?, ?, ?, ?, ?, ?, ?, ?, ?)
 ON CONFLICT(produto_id)
-DO UPDATE SET armazenamento = ?, validade = ?, qtd_media = ?, frequencia = ?, preco_medio = ?, perdas = ?, path_imagem=?;
+DO UPDATE SET armazenamento = ?, validade = ?, qtd_media = ?, frequencia = ?, preco_medio = ?, perdas = ?, path_imagem=?, path_miniatura=?;
 """
 
 obter_logs = """
-SELECT log.id, log.data_operacao, fornecedor.nome, log.quantidade, log.preco, log.preco_operacao, log.marca, log.saving, log.menor_valor
+SELECT log.id, log.data_operacao, fornecedor.nome, log.quantidade, log.preco, log.preco_operacao, log.marca, log.saving, log.menor_valor, anomalia.tipo
 FROM log_compra_produtos AS log
 INNER JOIN fornecedor ON log.id_fornecedor = fornecedor.id
+LEFT JOIN anomalia_preco AS anomalia ON anomalia.log_id = log.id
 WHERE log.id_produto = ? AND date(log.data_operacao) BETWEEN date(?) AND date(?);
 """
 
 obter_todos_logs = """
-SELECT log.id, log.data_operacao, fornecedor.nome, log.quantidade, log.preco, log.preco_operacao, log.marca, log.saving, log.menor_valor
+SELECT log.id, log.data_operacao, fornecedor.nome, log.quantidade, log.preco, log.preco_operacao, log.marca, log.saving, log.menor_valor, anomalia.tipo
 FROM log_compra_produtos AS log
 INNER JOIN fornecedor ON log.id_fornecedor = fornecedor.id
+LEFT JOIN anomalia_preco AS anomalia ON anomalia.log_id = log.id
 WHERE log.id_produto = ?;
 """
 
@@ -73,7 +77,7 @@ INSERT INTO fornecedor(nome, telefone, responsavel, logradouro, numero, bairro,
 VALUES(?, ?, ?, ?, ?, ?, ?, ?, ?);"""
 
 selecionar_produtos = """
-SELECT produto.id, produto.nome, produto.medida, produto.categoria, info.path_imagem
+SELECT produto.id, produto.nome, produto.medida, produto.categoria, COALESCE(info.path_miniatura, info.path_imagem)
 FROM produto
 LEFT JOIN infos_produto AS info ON produto.id = info.produto_id
 ORDER BY nome ASC;
@@ -83,6 +87,13 @@ obter_medida_produto = "SELECT medida FROM produto WHERE id = ?;"
 
 obter_dados_fornecedores = "SELECT * FROM fornecedor;"
 
+obter_pagina_fornecedores = """
+SELECT id, nome FROM fornecedor
+WHERE (nome, id) > (?, ?)
+ORDER BY nome, id
+LIMIT ?;
+"""
+
 obter_logs_para_dash = """
 SELECT p.nome AS nome_produto, p.categoria, p.medida, l.quantidade, l.data_operacao, l.preco, l.preco_operacao, l.saving, l.menor_valor
 FROM log_compra_produtos AS l
@@ -102,3 +113,486 @@ INNER JOIN fornecedor AS f ON l.id_fornecedor = f.id;
 apagar_fornecedor = "DELETE FROM fornecedor WHERE id = ?;"
 
 obter_path_image = "SELECT path_imagem FROM infos_produto WHERE produto_id = ?"
+
+
+criar_tabela_estatisticas_produto = """
+CREATE TABLE IF NOT EXISTS estatisticas_produto (
+    produto_id INTEGER PRIMARY KEY REFERENCES produto (id) ON DELETE CASCADE,
+    n INTEGER,
+    soma_quantidade REAL,
+    soma_quadrado_quantidade REAL,
+    media_quantidade REAL,
+    m2_quantidade REAL,
+    soma_preco REAL,
+    soma_quadrado_preco REAL,
+    media_preco REAL,
+    m2_preco REAL,
+    soma_preco_operacao REAL,
+    soma_saving REAL,
+    soma_quantidade_menor_valor REAL,
+    primeira_data TEXT,
+    ultima_data TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_log_compra_produto_data ON log_compra_produtos (id_produto, data_operacao);
+"""
+
+contar_estatisticas_e_logs = """
+SELECT
+    (SELECT COUNT(*) FROM estatisticas_produto),
+    (SELECT COALESCE(SUM(n), 0) FROM estatisticas_produto),
+    (SELECT COUNT(DISTINCT id_produto) FROM log_compra_produtos),
+    (SELECT COUNT(*) FROM log_compra_produtos);
+"""
+
+obter_estatisticas_produto = """
+SELECT n, soma_quantidade, soma_quadrado_quantidade, media_quantidade, m2_quantidade,
+soma_preco, soma_quadrado_preco, media_preco, m2_preco,
+soma_preco_operacao, soma_saving, soma_quantidade_menor_valor, primeira_data, ultima_data
+FROM estatisticas_produto WHERE produto_id = ?;
+"""
+
+somar_estatisticas_produto = """
+INSERT INTO estatisticas_produto(
+    produto_id, n, soma_quantidade, soma_quadrado_quantidade, media_quantidade, m2_quantidade,
+    soma_preco, soma_quadrado_preco, media_preco, m2_preco,
+    soma_preco_operacao, soma_saving, soma_quantidade_menor_valor, primeira_data, ultima_data
+)
+VALUES(
+    :produto_id, 1, :quantidade, :quantidade * :quantidade, :quantidade, 0.0,
+    :preco, :preco * :preco, :preco, 0.0,
+    :preco_operacao, :saving, :quantidade * :menor_valor, :data, :data
+)
+ON CONFLICT(produto_id)
+DO UPDATE SET n = n + 1,
+soma_quantidade = soma_quantidade + :quantidade,
+soma_quadrado_quantidade = soma_quadrado_quantidade + :quantidade * :quantidade,
+media_quantidade = media_quantidade + (:quantidade - media_quantidade) / (n + 1),
+m2_quantidade = m2_quantidade + (:quantidade - media_quantidade) * (:quantidade - media_quantidade) * n / (n + 1),
+soma_preco = soma_preco + :preco,
+soma_quadrado_preco = soma_quadrado_preco + :preco * :preco,
+media_preco = media_preco + (:preco - media_preco) / (n + 1),
+m2_preco = m2_preco + (:preco - media_preco) * (:preco - media_preco) * n / (n + 1),
+soma_preco_operacao = soma_preco_operacao + :preco_operacao,
+soma_saving = soma_saving + :saving,
+soma_quantidade_menor_valor = soma_quantidade_menor_valor + :quantidade * :menor_valor,
+primeira_data = MIN(COALESCE(primeira_data, :data), :data),
+ultima_data = MAX(COALESCE(ultima_data, :data), :data);
+"""
+
+subtrair_estatisticas_produto = """
+UPDATE estatisticas_produto SET n = n - 1,
+soma_quantidade = soma_quantidade - :quantidade,
+soma_quadrado_quantidade = soma_quadrado_quantidade - :quantidade * :quantidade,
+media_quantidade = media_quantidade - (:quantidade - media_quantidade) / (n - 1),
+m2_quantidade = MAX(m2_quantidade - (:quantidade - media_quantidade) * (:quantidade - media_quantidade) * n / (n - 1), 0.0),
+soma_preco = soma_preco - :preco,
+soma_quadrado_preco = soma_quadrado_preco - :preco * :preco,
+media_preco = media_preco - (:preco - media_preco) / (n - 1),
+m2_preco = MAX(m2_preco - (:preco - media_preco) * (:preco - media_preco) * n / (n - 1), 0.0),
+soma_preco_operacao = soma_preco_operacao - :preco_operacao,
+soma_saving = soma_saving - :saving,
+soma_quantidade_menor_valor = soma_quantidade_menor_valor - :quantidade * :menor_valor,
+primeira_data = (SELECT MIN(data_operacao) FROM log_compra_produtos WHERE id_produto = :produto_id),
+ultima_data = (SELECT MAX(data_operacao) FROM log_compra_produtos WHERE id_produto = :produto_id)
+WHERE produto_id = :produto_id;
+"""
+
+apagar_estatisticas_vazias = "DELETE FROM estatisticas_produto WHERE produto_id = ? AND n <= 0;"
+
+reconstruir_estatisticas_produto = """
+INSERT OR REPLACE INTO estatisticas_produto(
+    produto_id, n, soma_quantidade, soma_quadrado_quantidade, media_quantidade, m2_quantidade,
+    soma_preco, soma_quadrado_preco, media_preco, m2_preco,
+    soma_preco_operacao, soma_saving, soma_quantidade_menor_valor, primeira_data, ultima_data
+)
+SELECT
+    id_produto,
+    COUNT(*),
+    SUM(CAST(quantidade AS REAL)),
+    SUM(CAST(quantidade AS REAL) * CAST(quantidade AS REAL)),
+    AVG(CAST(quantidade AS REAL)),
+    SUM(CAST(quantidade AS REAL) * CAST(quantidade AS REAL)) - SUM(CAST(quantidade AS REAL)) * SUM(CAST(quantidade AS REAL)) / COUNT(*),
+    SUM(preco),
+    SUM(preco * preco),
+    AVG(preco),
+    SUM(preco * preco) - SUM(preco) * SUM(preco) / COUNT(*),
+    SUM(preco_operacao),
+    SUM(saving),
+    SUM(CAST(quantidade AS REAL) * menor_valor),
+    MIN(data_operacao),
+    MAX(data_operacao)
+FROM log_compra_produtos
+GROUP BY id_produto;
+"""
+
+obter_log = """
+SELECT id_produto, quantidade, preco, preco_operacao, saving, menor_valor, id_fornecedor
+FROM log_compra_produtos WHERE id = ?;
+"""
+
+criar_tabelas_anomalia_preco = """
+CREATE TABLE IF NOT EXISTS estatisticas_preco (
+    id_produto INTEGER REFERENCES produto (id) ON DELETE CASCADE,
+    id_fornecedor INTEGER REFERENCES fornecedor (id) ON DELETE CASCADE,
+    n INTEGER,
+    media REAL,
+    variancia REAL,
+    ultimo_preco REAL,
+    PRIMARY KEY (id_produto, id_fornecedor)
+);
+CREATE TABLE IF NOT EXISTS anomalia_preco (
+    log_id INTEGER PRIMARY KEY REFERENCES log_compra_produtos (id) ON DELETE CASCADE,
+    escore REAL,
+    tipo INTEGER
+);
+"""
+
+contar_estatisticas_preco_e_logs = """
+SELECT (SELECT COUNT(*) FROM estatisticas_preco), (SELECT COUNT(*) FROM log_compra_produtos);
+"""
+
+buscar_relacao_produto_fornecedor_estatisticas = """
+SELECT relacao.id, fornecedor.id, fornecedor.nome, relacao.preco, relacao.marca,
+estatisticas.n, estatisticas.media, estatisticas.variancia, estatisticas.ultimo_preco
+FROM relacao_produto_fornecedor AS relacao
+INNER JOIN fornecedor ON relacao.id_fornecedor = fornecedor.id
+LEFT JOIN estatisticas_preco AS estatisticas
+ON estatisticas.id_produto = relacao.id_produto AND estatisticas.id_fornecedor = relacao.id_fornecedor
+WHERE relacao.id_produto = ?;
+"""
+
+obter_estatisticas_preco = """
+SELECT n, media, variancia, ultimo_preco FROM estatisticas_preco WHERE id_produto = ? AND id_fornecedor = ?;
+"""
+
+salvar_estatisticas_preco = """
+INSERT OR REPLACE INTO estatisticas_preco(id_produto, id_fornecedor, n, media, variancia, ultimo_preco)
+VALUES(?, ?, ?, ?, ?, ?);
+"""
+
+registrar_anomalia_ultimo_log = """
+INSERT INTO anomalia_preco(log_id, escore, tipo) VALUES(last_insert_rowid(), ?, ?);
+"""
+
+registrar_anomalia_preco = "INSERT OR REPLACE INTO anomalia_preco(log_id, escore, tipo) VALUES(?, ?, ?);"
+
+obter_precos_historico = """
+SELECT id, id_produto, id_fornecedor, preco, julianday(data_operacao) FROM log_compra_produtos;
+"""
+
+obter_precos_historico_fornecedor = """
+SELECT id, id_produto, id_fornecedor, preco, julianday(data_operacao) FROM log_compra_produtos
+WHERE id_produto = ? AND id_fornecedor = ? AND id != ?;
+"""
+
+apagar_anomalias_fornecedor = """
+DELETE FROM anomalia_preco WHERE log_id IN (
+    SELECT id FROM log_compra_produtos WHERE id_produto = ? AND id_fornecedor = ?
+);
+"""
+
+apagar_estatisticas_preco = "DELETE FROM estatisticas_preco WHERE id_produto = ? AND id_fornecedor = ?;"
+
+criar_indice_relacao_preco = """
+CREATE INDEX IF NOT EXISTS idx_relacao_produto_preco ON relacao_produto_fornecedor (id_produto, preco);
+CREATE INDEX IF NOT EXISTS idx_fornecedor_nome ON fornecedor (nome, id);
+"""
+
+buscar_infos_produtos_lista = """
+WITH selecionados AS (
+    SELECT DISTINCT CAST(value AS INTEGER) AS id FROM json_each(?)
+)
+SELECT produto.id, produto.medida, info.armazenamento, info.qtd_media
+FROM produto
+INNER JOIN selecionados ON selecionados.id = produto.id
+LEFT JOIN infos_produto AS info ON info.produto_id = produto.id;
+"""
+
+buscar_precos_fornecedores = """
+WITH selecionados AS (
+    SELECT DISTINCT CAST(value AS INTEGER) AS id FROM json_each(?)
+)
+SELECT relacao.id_produto, relacao.id, relacao.id_fornecedor, fornecedor.nome, relacao.preco, relacao.marca
+FROM relacao_produto_fornecedor AS relacao
+INNER JOIN fornecedor ON relacao.id_fornecedor = fornecedor.id
+WHERE relacao.id_produto IN (SELECT id FROM selecionados);
+"""
+
+obter_dados_reposicao = """
+WITH ultimas AS (
+    SELECT id_produto, data_operacao, CAST(quantidade AS REAL) AS quantidade,
+    ROW_NUMBER() OVER (PARTITION BY id_produto ORDER BY data_operacao DESC, id DESC) AS posicao
+    FROM log_compra_produtos
+)
+SELECT produto.id, produto.nome, produto.medida, info.armazenamento, info.validade, info.qtd_media,
+ultimas.data_operacao, ultimas.quantidade,
+SUM(CASE consumo.dia_semana WHEN 1 THEN CAST(consumo.valor AS REAL) ELSE 0 END),
+SUM(CASE consumo.dia_semana WHEN 2 THEN CAST(consumo.valor AS REAL) ELSE 0 END),
+SUM(CASE consumo.dia_semana WHEN 3 THEN CAST(consumo.valor AS REAL) ELSE 0 END),
+SUM(CASE consumo.dia_semana WHEN 4 THEN CAST(consumo.valor AS REAL) ELSE 0 END),
+SUM(CASE consumo.dia_semana WHEN 5 THEN CAST(consumo.valor AS REAL) ELSE 0 END),
+SUM(CASE consumo.dia_semana WHEN 6 THEN CAST(consumo.valor AS REAL) ELSE 0 END),
+SUM(CASE consumo.dia_semana WHEN 7 THEN CAST(consumo.valor AS REAL) ELSE 0 END)
+FROM produto
+LEFT JOIN infos_produto AS info ON info.produto_id = produto.id
+LEFT JOIN ultimas ON ultimas.id_produto = produto.id AND ultimas.posicao = 1
+LEFT JOIN consumo_dia AS consumo ON consumo.id_produto = produto.id
+GROUP BY produto.id;
+"""
+
+criar_tabelas_lista_compra = """
+CREATE TABLE IF NOT EXISTS lista_compra (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    nome TEXT,
+    criada_em TEXT,
+    atualizada_em TEXT
+);
+CREATE TABLE IF NOT EXISTS lista_compra_item (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    lista_id INTEGER REFERENCES lista_compra (id) ON DELETE CASCADE,
+    id_produto INTEGER REFERENCES produto (id) ON DELETE CASCADE,
+    nome TEXT,
+    fornecedor TEXT,
+    marca TEXT,
+    preco REAL,
+    quantidade REAL,
+    medida TEXT,
+    id_relacao INTEGER,
+    preco_relacao REAL,
+    UNIQUE (lista_id, id_produto)
+);
+"""
+
+criar_lista_compra = "INSERT INTO lista_compra(nome, criada_em, atualizada_em) VALUES(?, ?, ?);"
+
+atualizar_data_lista_compra = "UPDATE lista_compra SET atualizada_em = ? WHERE id = ?;"
+
+salvar_item_lista_compra = """
+INSERT INTO lista_compra_item(lista_id, id_produto, nome, fornecedor, marca, preco, quantidade, medida, id_relacao, preco_relacao)
+VALUES(?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+ON CONFLICT(lista_id, id_produto)
+DO UPDATE SET nome = excluded.nome, fornecedor = excluded.fornecedor, marca = excluded.marca, preco = excluded.preco,
+quantidade = excluded.quantidade, medida = excluded.medida, id_relacao = excluded.id_relacao,
+preco_relacao = excluded.preco_relacao;
+"""
+
+obter_listas_compra = """
+SELECT lista.id, lista.nome, lista.atualizada_em, COUNT(item.id)
+FROM lista_compra AS lista
+LEFT JOIN lista_compra_item AS item ON item.lista_id = lista.id
+GROUP BY lista.id
+ORDER BY lista.atualizada_em DESC;
+"""
+
+obter_itens_lista_compra = """
+SELECT id_produto, nome, fornecedor, marca, preco, quantidade, medida, id_relacao, preco_relacao
+FROM lista_compra_item WHERE lista_id = ? ORDER BY id;
+"""
+
+obter_precos_alterados_lista_compra = """
+SELECT item.id_produto, relacao.preco
+FROM lista_compra_item AS item
+INNER JOIN relacao_produto_fornecedor AS relacao ON relacao.id = item.id_relacao
+WHERE item.lista_id = ? AND item.preco = item.preco_relacao AND relacao.preco != item.preco_relacao;
+"""
+
+reprecificar_item_lista_compra = """
+UPDATE lista_compra_item SET preco = ?, preco_relacao = ? WHERE lista_id = ? AND id_produto = ?;
+"""
+
+apagar_lista_compra = "DELETE FROM lista_compra WHERE id = ?;"
+
+existe_busca_texto = "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'busca_produto';"
+
+criar_busca_texto = """
+CREATE VIRTUAL TABLE IF NOT EXISTS busca_produto USING fts5(
+    nome, content='produto', content_rowid='id', tokenize='unicode61 remove_diacritics 2'
+);
+CREATE VIRTUAL TABLE IF NOT EXISTS busca_fornecedor USING fts5(
+    nome, responsavel, telefone, cidade, content='fornecedor', content_rowid='id', tokenize='unicode61 remove_diacritics 2'
+);
+CREATE VIRTUAL TABLE IF NOT EXISTS busca_relacao USING fts5(
+    marca, content='relacao_produto_fornecedor', content_rowid='id', tokenize='unicode61 remove_diacritics 2'
+);
+CREATE VIRTUAL TABLE IF NOT EXISTS busca_compra USING fts5(
+    marca, content='log_compra_produtos', content_rowid='id', tokenize='unicode61 remove_diacritics 2'
+);
+
+CREATE TRIGGER IF NOT EXISTS busca_produto_ai AFTER INSERT ON produto BEGIN
+    INSERT INTO busca_produto(rowid, nome) VALUES (new.id, new.nome);
+END;
+CREATE TRIGGER IF NOT EXISTS busca_produto_ad AFTER DELETE ON produto BEGIN
+    INSERT INTO busca_produto(busca_produto, rowid, nome) VALUES ('delete', old.id, old.nome);
+END;
+CREATE TRIGGER IF NOT EXISTS busca_produto_au AFTER UPDATE OF nome ON produto BEGIN
+    INSERT INTO busca_produto(busca_produto, rowid, nome) VALUES ('delete', old.id, old.nome);
+    INSERT INTO busca_produto(rowid, nome) VALUES (new.id, new.nome);
+END;
+
+CREATE TRIGGER IF NOT EXISTS busca_fornecedor_ai AFTER INSERT ON fornecedor BEGIN
+    INSERT INTO busca_fornecedor(rowid, nome, responsavel, telefone, cidade)
+    VALUES (new.id, new.nome, new.responsavel, new.telefone, new.cidade);
+END;
+CREATE TRIGGER IF NOT EXISTS busca_fornecedor_ad AFTER DELETE ON fornecedor BEGIN
+    INSERT INTO busca_fornecedor(busca_fornecedor, rowid, nome, responsavel, telefone, cidade)
+    VALUES ('delete', old.id, old.nome, old.responsavel, old.telefone, old.cidade);
+END;
+CREATE TRIGGER IF NOT EXISTS busca_fornecedor_au AFTER UPDATE OF nome, responsavel, telefone, cidade ON fornecedor BEGIN
+    INSERT INTO busca_fornecedor(busca_fornecedor, rowid, nome, responsavel, telefone, cidade)
+    VALUES ('delete', old.id, old.nome, old.responsavel, old.telefone, old.cidade);
+    INSERT INTO busca_fornecedor(rowid, nome, responsavel, telefone, cidade)
+    VALUES (new.id, new.nome, new.responsavel, new.telefone, new.cidade);
+END;
+
+CREATE TRIGGER IF NOT EXISTS busca_relacao_ai AFTER INSERT ON relacao_produto_fornecedor BEGIN
+    INSERT INTO busca_relacao(rowid, marca) VALUES (new.id, new.marca);
+END;
+CREATE TRIGGER IF NOT EXISTS busca_relacao_ad AFTER DELETE ON relacao_produto_fornecedor BEGIN
+    INSERT INTO busca_relacao(busca_relacao, rowid, marca) VALUES ('delete', old.id, old.marca);
+END;
+CREATE TRIGGER IF NOT EXISTS busca_relacao_au AFTER UPDATE OF marca ON relacao_produto_fornecedor BEGIN
+    INSERT INTO busca_relacao(busca_relacao, rowid, marca) VALUES ('delete', old.id, old.marca);
+    INSERT INTO busca_relacao(rowid, marca) VALUES (new.id, new.marca);
+END;
+
+CREATE TRIGGER IF NOT EXISTS busca_compra_ai AFTER INSERT ON log_compra_produtos BEGIN
+    INSERT INTO busca_compra(rowid, marca) VALUES (new.id, new.marca);
+END;
+CREATE TRIGGER IF NOT EXISTS busca_compra_ad AFTER DELETE ON log_compra_produtos BEGIN
+    INSERT INTO busca_compra(busca_compra, rowid, marca) VALUES ('delete', old.id, old.marca);
+END;
+CREATE TRIGGER IF NOT EXISTS busca_compra_au AFTER UPDATE OF marca ON log_compra_produtos BEGIN
+    INSERT INTO busca_compra(busca_compra, rowid, marca) VALUES ('delete', old.id, old.marca);
+    INSERT INTO busca_compra(rowid, marca) VALUES (new.id, new.marca);
+END;
+"""
+
+reconstruir_busca_texto = """
+INSERT INTO busca_produto(busca_produto) VALUES ('rebuild');
+INSERT INTO busca_fornecedor(busca_fornecedor) VALUES ('rebuild');
+INSERT INTO busca_relacao(busca_relacao) VALUES ('rebuild');
+INSERT INTO busca_compra(busca_compra) VALUES ('rebuild');
+"""
+
+pesquisar_texto = """
+WITH compras AS MATERIALIZED (
+    SELECT log.id_fornecedor, log.id_produto, log.marca, log.data_operacao,
+    snippet(busca_compra, 0, '[', ']', '...', 8) AS trecho, bm25(busca_compra) AS rank
+    FROM busca_compra
+    INNER JOIN log_compra_produtos AS log ON log.id = busca_compra.rowid
+    WHERE busca_compra MATCH :consulta
+)
+SELECT 'produto' AS tipo, produto.id AS id, produto.nome AS titulo,
+snippet(busca_produto, 0, '[', ']', '...', 8) AS trecho, bm25(busca_produto) AS rank
+FROM busca_produto
+INNER JOIN produto ON produto.id = busca_produto.rowid
+WHERE busca_produto MATCH :consulta
+UNION ALL
+SELECT 'fornecedor', fornecedor.id, fornecedor.nome,
+snippet(busca_fornecedor, -1, '[', ']', '...', 8), bm25(busca_fornecedor, 4.0, 2.0, 1.0, 1.0)
+FROM busca_fornecedor
+INNER JOIN fornecedor ON fornecedor.id = busca_fornecedor.rowid
+WHERE busca_fornecedor MATCH :consulta
+UNION ALL
+SELECT 'marca', fornecedor.id, fornecedor.nome || ' - ' || produto.nome,
+snippet(busca_relacao, 0, '[', ']', '...', 8), bm25(busca_relacao)
+FROM busca_relacao
+INNER JOIN relacao_produto_fornecedor AS relacao ON relacao.id = busca_relacao.rowid
+INNER JOIN fornecedor ON fornecedor.id = relacao.id_fornecedor
+INNER JOIN produto ON produto.id = relacao.id_produto
+WHERE busca_relacao MATCH :consulta
+UNION ALL
+SELECT 'compra', fornecedor.id, fornecedor.nome || ' - ' || produto.nome,
+MIN(compras.trecho) || ' (' || COUNT(*) || ' compras, última em ' || MAX(compras.data_operacao) || ')', MIN(compras.rank)
+FROM compras
+INNER JOIN fornecedor ON fornecedor.id = compras.id_fornecedor
+INNER JOIN produto ON produto.id = compras.id_produto
+GROUP BY compras.id_fornecedor, compras.id_produto, lower(compras.marca)
+ORDER BY rank
+LIMIT :limite;
+"""
+
+obter_dados_fornecedor = "SELECT * FROM fornecedor WHERE id = ?;"
+
+colunas_infos_produto = "SELECT name FROM pragma_table_info('infos_produto');"
+
+adicionar_coluna_miniatura = "ALTER TABLE infos_produto ADD COLUMN path_miniatura TEXT;"
+
+obter_imagens_sem_miniatura = """
+SELECT produto_id, path_imagem FROM infos_produto
+WHERE path_imagem IS NOT NULL AND path_imagem <> '' AND path_miniatura IS NULL;
+"""
+
+atualizar_miniatura_produto = "UPDATE infos_produto SET path_miniatura = ? WHERE produto_id = ?;"
+
+obter_miniaturas_em_uso = "SELECT path_miniatura FROM infos_produto WHERE path_miniatura IS NOT NULL;"
+
+criar_tabela_scorecard_fornecedor = """
+CREATE TABLE IF NOT EXISTS scorecard_fornecedor (
+    fornecedor_id INTEGER PRIMARY KEY REFERENCES fornecedor (id) ON DELETE CASCADE,
+    compras INTEGER,
+    gasto_total REAL,
+    soma_saving REAL,
+    soma_desvio REAL,
+    n_desvio INTEGER,
+    aumentos INTEGER,
+    comparacoes INTEGER,
+    ultima_compra TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_log_compra_fornecedor ON log_compra_produtos (id_fornecedor, id_produto, data_operacao);
+"""
+
+contar_scorecards_e_logs = """
+SELECT (SELECT COUNT(*) FROM scorecard_fornecedor), (SELECT COUNT(*) FROM log_compra_produtos);
+"""
+
+obter_scorecards_fornecedores = """
+SELECT fornecedor_id, compras, gasto_total, soma_saving, soma_desvio, n_desvio, aumentos, comparacoes, ultima_compra
+FROM scorecard_fornecedor;
+"""
+
+obter_scorecard_fornecedor = """
+SELECT compras, gasto_total, soma_saving, soma_desvio, n_desvio, aumentos, comparacoes, ultima_compra
+FROM scorecard_fornecedor WHERE fornecedor_id = ?;
+"""
+
+salvar_scorecard_fornecedor = """
+INSERT INTO scorecard_fornecedor(
+    fornecedor_id, compras, gasto_total, soma_saving, soma_desvio, n_desvio, aumentos, comparacoes, ultima_compra
+)
+VALUES(?, ?, ?, ?, ?, ?, ?, ?, ?)
+ON CONFLICT(fornecedor_id)
+DO UPDATE SET compras = excluded.compras, gasto_total = excluded.gasto_total, soma_saving = excluded.soma_saving,
+soma_desvio = excluded.soma_desvio, n_desvio = excluded.n_desvio, aumentos = excluded.aumentos,
+comparacoes = excluded.comparacoes, ultima_compra = excluded.ultima_compra;
+"""
+
+calcular_scorecard_fornecedores = """
+INSERT OR REPLACE INTO scorecard_fornecedor(
+    fornecedor_id, compras, gasto_total, soma_saving, soma_desvio, n_desvio, aumentos, comparacoes, ultima_compra
+)
+SELECT
+    compras.id_fornecedor,
+    COUNT(*),
+    TOTAL(compras.preco_operacao),
+    TOTAL(compras.saving),
+    TOTAL(CASE WHEN compras.referencia > 0 THEN (compras.preco - compras.referencia) / compras.referencia END),
+    COUNT(CASE WHEN compras.referencia > 0 THEN 1 END),
+    COUNT(CASE WHEN compras.preco > compras.anterior THEN 1 END),
+    COUNT(compras.anterior),
+    MAX(compras.data_operacao)
+FROM (
+    SELECT log.id_fornecedor, log.preco, log.preco_operacao, log.saving, log.data_operacao,
+    COALESCE(NULLIF(log.menor_valor, 0), menores.preco) AS referencia,
+    LAG(log.preco) OVER (PARTITION BY log.id_fornecedor, log.id_produto ORDER BY log.data_operacao, log.id) AS anterior
+    FROM log_compra_produtos AS log
+    INNER JOIN fornecedor ON fornecedor.id = log.id_fornecedor
+    LEFT JOIN (
+        SELECT id_produto, MIN(preco) AS preco FROM relacao_produto_fornecedor GROUP BY id_produto
+    ) AS menores ON menores.id_produto = log.id_produto
+    WHERE (:fornecedor IS NULL OR log.id_fornecedor = :fornecedor)
+) AS compras
+GROUP BY compras.id_fornecedor;
+"""
+
+apagar_scorecard_fornecedor = "DELETE FROM scorecard_fornecedor WHERE fornecedor_id = ?;"
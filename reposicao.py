@@ -0,0 +1,112 @@
+from datetime import date, datetime
+from typing import Dict, List, Optional
+import numpy as np
+
+
+class MotorReposicao:
+    dias_semana = 7
+    dias_alvo_sem_capacidade = 7
+
+    def projetar(self, registros: list, hoje: Optional[date] = None) -> Dict[str, np.ndarray]:
+        hoje = hoje or date.today()
+        n = len(registros)
+        ids = np.array([registro[0] for registro in registros], dtype=int)
+        medidas = np.array([registro[2] for registro in registros], dtype=object)
+        dados = np.array([
+            [self.numero(valor) for valor in (registro[3], registro[4], registro[5], registro[7])]
+            for registro in registros
+        ], dtype=float).reshape(n, 4)
+        capacidade, validade, reserva_percentual, ultima_quantidade = dados.T
+        consumo = np.array([registro[8:15] for registro in registros], dtype=float).reshape(n, self.dias_semana)
+        consumo = np.nan_to_num(consumo)
+        consumo_semanal = consumo.sum(axis=1)
+
+        comprou = np.array([registro[6] is not None for registro in registros], dtype=bool)
+        ordinais = np.array([
+            datetime.strptime(registro[6], "%Y-%m-%d").date().toordinal() if registro[6] else hoje.toordinal()
+            for registro in registros
+        ], dtype=int)
+        decorridos = np.maximum(hoje.toordinal() - ordinais, 0)
+        dia_compra = (ordinais - 1) % self.dias_semana
+
+        estoque_inicial = np.where(capacidade > 0, np.minimum(ultima_quantidade, capacidade), ultima_quantidade)
+        consumido = self.consumo_periodo(consumo, (dia_compra + 1) % self.dias_semana, decorridos)
+        estoque = np.where(comprou, np.maximum(estoque_inicial - consumido, 0.0), 0.0)
+        vencido = (validade > 0) & (decorridos >= validade)
+        estoque = np.where(vencido, 0.0, estoque)
+
+        reserva = capacidade * reserva_percentual / 100
+        dia_hoje = np.full(n, hoje.weekday())
+        dias = self.dias_ate_consumir(consumo, consumo_semanal, dia_hoje, estoque - reserva)
+        dias_validade = np.where((validade > 0) & comprou & ~vencido, validade - decorridos, np.inf)
+        dias = np.minimum(dias, dias_validade)
+
+        alvo = np.where(
+            capacidade > 0,
+            capacidade,
+            consumo_semanal / self.dias_semana * np.where(validade > 0, validade, self.dias_alvo_sem_capacidade)
+        )
+        return {
+            "ids": ids,
+            "medidas": medidas,
+            "estoque": estoque,
+            "dias": dias,
+            "alvo": alvo,
+            "consumo": consumo,
+            "dia_hoje": dia_hoje,
+            "monitorado": (capacidade > 0) | (consumo_semanal > 0)
+        }
+
+    def propor(self, registros: list, horizonte: int, hoje: Optional[date] = None) -> List[tuple]:
+        if not registros:
+            return []
+        projecao = self.projetar(registros, hoje)
+        dias = projecao["dias"]
+        pendentes = projecao["monitorado"] & (dias <= horizonte)
+
+        reposicao = np.clip(np.where(np.isfinite(dias), dias, horizonte), 0, horizonte).astype(int)
+        consumo_ate_reposicao = self.consumo_periodo(projecao["consumo"], projecao["dia_hoje"], reposicao)
+        estoque_reposicao = np.maximum(projecao["estoque"] - consumo_ate_reposicao, 0.0)
+        quantidades = np.maximum(projecao["alvo"] - estoque_reposicao, 0.0)
+        unidades = projecao["medidas"] == "unidade"
+        quantidades = np.where(unidades, np.ceil(quantidades), np.round(quantidades, 3))
+
+        nomes = [registro[1] for registro in registros]
+        return [
+            (int(projecao["ids"][i]), nomes[i], float(quantidades[i]), float(dias[i]))
+            for i in np.flatnonzero(pendentes & (quantidades > 0))
+        ]
+
+    def consumo_periodo(self, consumo: np.ndarray, dia_inicial: np.ndarray, dias: np.ndarray) -> np.ndarray:
+        acumulado = np.concatenate([np.zeros((len(consumo), 1)), np.cumsum(np.tile(consumo, 2), axis=1)], axis=1)
+        semanas, resto = np.divmod(dias, self.dias_semana)
+        parcial = (
+            np.take_along_axis(acumulado, (dia_inicial + resto)[:, None], axis=1)[:, 0]
+            - np.take_along_axis(acumulado, dia_inicial[:, None], axis=1)[:, 0]
+        )
+        return semanas * consumo.sum(axis=1) + parcial
+
+    def dias_ate_consumir(
+            self,
+            consumo: np.ndarray,
+            consumo_semanal: np.ndarray,
+            dia_inicial: np.ndarray,
+            disponivel: np.ndarray
+        ) -> np.ndarray:
+        esgotado = disponivel <= 0
+        disponivel = np.maximum(disponivel, 0.0)
+        com_consumo = consumo_semanal > 0
+        semanas = np.floor(np.divide(disponivel, consumo_semanal, out=np.zeros_like(disponivel), where=com_consumo))
+        restante = disponivel - semanas * consumo_semanal
+
+        indices = (dia_inicial[:, None] + np.arange(self.dias_semana)[None, :]) % self.dias_semana
+        acumulado = np.cumsum(np.take_along_axis(consumo, indices, axis=1), axis=1)
+        resto = (acumulado <= restante[:, None]).sum(axis=1)
+        dias = semanas * self.dias_semana + resto
+        return np.where(esgotado, 0.0, np.where(com_consumo, dias, np.inf))
+
+    def numero(self, valor) -> float:
+        try:
+            return float(valor)
+        except (TypeError, ValueError):
+            return 0.0
@@ -0,0 +1,78 @@
+import asyncio
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, HTTPServer
+
+import pytest
+
+from acessorios import BuscarCep, IndiceCep
+
+
+class ServidorCep(BaseHTTPRequestHandler):
+    respostas = {}
+    pedidos = []
+
+    def do_GET(self) -> None:
+        cep = self.path.rsplit("/", 1)[-1]
+        self.pedidos.append(cep)
+        status, corpo = self.respostas.get(cep, (404, "{}"))
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.end_headers()
+        self.wfile.write(corpo.encode("utf-8"))
+
+    def log_message(self, *args) -> None:
+        pass
+
+
+@pytest.fixture
+def servidor(tmp_path, monkeypatch):
+    monkeypatch.setattr(BuscarCep, "indice", IndiceCep(str(tmp_path / "ceps.idx")))
+    monkeypatch.setattr(BuscarCep, "espera_tentativa", 0)
+    ServidorCep.respostas = {}
+    ServidorCep.pedidos = []
+    httpd = HTTPServer(("127.0.0.1", 0), ServidorCep)
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{httpd.server_port}/cep/{{}}"
+    httpd.shutdown()
+    httpd.server_close()
+
+
+def test_consulta_servidor_e_grava_cache(servidor, tmp_path):
+    dados = {"cep": "01001000", "city": "São Paulo"}
+    ServidorCep.respostas["01001000"] = (200, json.dumps(dados))
+    arquivo = str(tmp_path / "cache.json")
+
+    assert asyncio.run(BuscarCep(servidor, arquivo).obter_dados("01001-000")) == dados
+    assert asyncio.run(BuscarCep(servidor, arquivo).obter_dados("01001000")) == dados
+    assert ServidorCep.pedidos == ["01001000"]
+    with open(arquivo, encoding="utf-8") as cache:
+        assert json.load(cache) == {"01001000": dados}
+
+
+def test_caches_separados_por_url_e_arquivo(servidor, tmp_path):
+    ServidorCep.respostas["01001000"] = (200, json.dumps({"city": "São Paulo"}))
+    asyncio.run(BuscarCep(servidor, str(tmp_path / "a.json")).obter_dados("01001000"))
+
+    ServidorCep.respostas["01001000"] = (200, json.dumps({"city": "Outra"}))
+    dados = asyncio.run(BuscarCep(servidor, str(tmp_path / "b.json")).obter_dados("01001000"))
+
+    assert dados == {"city": "Outra"}
+    assert len(ServidorCep.pedidos) == 2
+    assert not (tmp_path / "a.json").read_text(encoding="utf-8").count("Outra")
+
+
+def test_resposta_invalida_retorna_vazio(servidor, tmp_path):
+    ServidorCep.respostas["01001000"] = (200, "<html>erro</html>")
+    arquivo = tmp_path / "cache.json"
+
+    assert asyncio.run(BuscarCep(servidor, str(arquivo)).obter_dados("01001000")) == {}
+    assert not arquivo.exists()
+
+
+def test_tenta_novamente_em_erro_do_servidor(servidor, tmp_path):
+    ServidorCep.respostas["01001000"] = (503, "{}")
+
+    assert asyncio.run(BuscarCep(servidor, str(tmp_path / "cache.json")).obter_dados("01001000")) == {}
+    assert ServidorCep.pedidos == ["01001000"] * BuscarCep.tentativas
@@ -0,0 +1,156 @@
+import random
+import sqlite3
+
+import numpy as np
+import pytest
+
+import querys_app6 as q6
+from controles import ControleEstatisticas
+from estatisticas import AcumuladorEstatisticas, AcumuladorPreco, MotorAnomaliasPreco
+
+
+def compras(semente, total):
+    aleatorio = random.Random(semente)
+    return [
+        (
+            str(aleatorio.randint(1, 20)),
+            round(aleatorio.uniform(1, 50), 2),
+            round(aleatorio.uniform(1, 500), 2),
+            round(aleatorio.uniform(-10, 10), 2),
+            round(aleatorio.uniform(1, 50), 2),
+            f"2026-{aleatorio.randint(1, 12):02d}-{aleatorio.randint(1, 28):02d}"
+        )
+        for _ in range(total)
+    ]
+
+
+@pytest.mark.parametrize("semente", range(10))
+def test_remover_desfaz_adicionar(semente):
+    registros = compras(semente, 12)
+    esperado = AcumuladorEstatisticas()
+    for registro in registros[:-1]:
+        esperado.adicionar(*registro)
+    acumulador = AcumuladorEstatisticas()
+    for registro in registros:
+        acumulador.adicionar(*registro)
+
+    acumulador.remover(*registros[-1][:-1])
+
+    assert acumulador.n == esperado.n
+    for campo in (
+        "soma_quantidade", "soma_quadrado_quantidade", "media_quantidade", "m2_quantidade",
+        "soma_preco", "soma_quadrado_preco", "media_preco", "m2_preco",
+        "soma_preco_operacao", "soma_saving", "soma_quantidade_menor_valor"
+    ):
+        assert getattr(acumulador, campo) == pytest.approx(getattr(esperado, campo), abs=1e-9)
+
+
+def test_adicionar_confere_com_numpy():
+    registros = compras(1, 25)
+    acumulador = AcumuladorEstatisticas()
+    for registro in registros:
+        acumulador.adicionar(*registro)
+
+    quantidades = np.array([float(registro[0]) for registro in registros])
+    precos = np.array([registro[1] for registro in registros])
+    assert acumulador.media_quantidade == pytest.approx(quantidades.mean())
+    assert acumulador.variancia_quantidade == pytest.approx(quantidades.var(ddof=1))
+    assert acumulador.media_preco == pytest.approx(precos.mean())
+    assert acumulador.variancia_preco == pytest.approx(precos.var(ddof=1))
+    assert (acumulador.primeira_data, acumulador.ultima_data) == (
+        min(registro[5] for registro in registros), max(registro[5] for registro in registros)
+    )
+
+
+def test_remover_unico_registro_zera():
+    acumulador = AcumuladorEstatisticas()
+    registro = compras(2, 1)[0]
+    acumulador.adicionar(*registro)
+
+    acumulador.remover(*registro[:-1])
+
+    assert vars(acumulador) == vars(AcumuladorEstatisticas())
+
+
+def historico(semente):
+    aleatorio = random.Random(semente)
+    registros = []
+    for id_log in range(1, 200):
+        produto, fornecedor = aleatorio.randint(1, 4), aleatorio.randint(1, 3)
+        base = 10.0 * produto + fornecedor
+        preco = base * (3 if aleatorio.random() < 0.08 else aleatorio.uniform(0.95, 1.05))
+        registros.append((id_log, produto, fornecedor, round(preco, 2), 2461000.5 + aleatorio.randint(0, 60)))
+    return registros
+
+
+@pytest.mark.parametrize("semente", range(5))
+def test_reprocessar_igual_acumulador(semente):
+    registros = historico(semente)
+    acumuladores = {}
+    anomalias_esperadas = {}
+    for id_log, produto, fornecedor, preco, _ in sorted(registros, key=lambda r: (r[1], r[2], r[4], r[0])):
+        acumulador = acumuladores.setdefault((produto, fornecedor), AcumuladorPreco())
+        tipo = acumulador.classificar(preco)
+        if tipo:
+            anomalias_esperadas[id_log] = (acumulador.escore(preco), tipo)
+        acumulador.adicionar(preco)
+
+    anomalias, estatisticas = MotorAnomaliasPreco().reprocessar(registros)
+
+    assert anomalias_esperadas
+    assert {id_log: tipo for id_log, _, tipo in anomalias} == {
+        id_log: tipo for id_log, (_, tipo) in anomalias_esperadas.items()
+    }
+    for id_log, escore, _ in anomalias:
+        assert escore == pytest.approx(anomalias_esperadas[id_log][0])
+    assert len(estatisticas) == len(acumuladores)
+    for produto, fornecedor, n, media, variancia, ultimo_preco in estatisticas:
+        acumulador = acumuladores[(produto, fornecedor)]
+        assert n == acumulador.n
+        assert media == pytest.approx(acumulador.media)
+        assert variancia == pytest.approx(acumulador.variancia)
+        assert ultimo_preco == acumulador.ultimo_preco
+
+
+def test_reprocessar_sem_registros():
+    assert MotorAnomaliasPreco().reprocessar([]) == ([], [])
+
+
+def test_comandos_sql_conferem_com_reconstrucao():
+    conexao = sqlite3.connect(":memory:")
+    conexao.execute(
+        "CREATE TABLE log_compra_produtos (id INTEGER PRIMARY KEY, id_produto INTEGER, id_fornecedor INTEGER, "
+        "preco REAL, quantidade TEXT, data_operacao TEXT, preco_operacao REAL, saving REAL, menor_valor REAL)"
+    )
+    conexao.executescript(q6.criar_tabela_estatisticas_produto)
+    controle = ControleEstatisticas()
+    aleatorio = random.Random(3)
+
+    def executar(comandos):
+        for query, params in comandos:
+            conexao.execute(query, params)
+
+    for id_log, (quantidade, preco, preco_operacao, saving, menor_valor, data) in enumerate(compras(3, 40), 1):
+        id_produto = aleatorio.randint(1, 4)
+        conexao.execute(
+            "INSERT INTO log_compra_produtos VALUES(?, ?, 1, ?, ?, ?, ?, ?, ?)",
+            (id_log, id_produto, preco, quantidade, data, preco_operacao, saving, menor_valor)
+        )
+        executar(controle.comandos_somar(id_produto, quantidade, preco, preco_operacao, saving, menor_valor, data))
+    for id_log in aleatorio.sample(range(1, 41), 25):
+        id_produto, quantidade, preco, preco_operacao, saving, menor_valor = conexao.execute(
+            "SELECT id_produto, quantidade, preco, preco_operacao, saving, menor_valor FROM log_compra_produtos WHERE id = ?",
+            (id_log,)
+        ).fetchone()
+        conexao.execute(q6.apagar_log, (id_log,))
+        executar(controle.comandos_subtrair(id_produto, quantidade, preco, preco_operacao, saving, menor_valor))
+
+    incremental = conexao.execute("SELECT * FROM estatisticas_produto ORDER BY produto_id").fetchall()
+    conexao.execute("DELETE FROM estatisticas_produto")
+    conexao.execute(q6.reconstruir_estatisticas_produto)
+    reconstruido = conexao.execute("SELECT * FROM estatisticas_produto ORDER BY produto_id").fetchall()
+
+    assert [linha[:2] for linha in incremental] == [linha[:2] for linha in reconstruido]
+    for linha, esperada in zip(incremental, reconstruido):
+        assert linha[2:-2] == pytest.approx(esperada[2:-2], abs=1e-6)
+        assert linha[-2:] == esperada[-2:]
@@ -0,0 +1,70 @@
+from itertools import combinations
+
+import numpy as np
+import pytest
+
+from otimizacao import OtimizadorFornecedores
+
+
+def custo_escolhas(precos, quantidades, fixos, escolhas, penalidade):
+    cobertos = np.isfinite(precos).any(axis=1)
+    total = 0.0
+    for i, j in enumerate(escolhas):
+        if j >= 0:
+            total += precos[i, j] * quantidades[i]
+        elif cobertos[i]:
+            total += penalidade
+    return total + sum(fixos[j] for j in set(escolhas) if j >= 0)
+
+
+def custo_forca_bruta(precos, quantidades, fixos, maximo, penalidade):
+    n, m = precos.shape
+    cobertos = np.isfinite(precos).any(axis=1)
+    limite = m if maximo is None else min(maximo, m)
+    melhor = penalidade * cobertos.sum()
+    for tamanho in range(1, limite + 1):
+        for grupo in combinations(range(m), tamanho):
+            minimos = precos[:, list(grupo)].min(axis=1)
+            custo = sum(
+                minimos[i] * quantidades[i] if np.isfinite(minimos[i]) else penalidade
+                for i in range(n) if cobertos[i]
+            )
+            melhor = min(melhor, custo + sum(fixos[j] for j in grupo))
+    return melhor
+
+
+@pytest.mark.parametrize("semente", range(40))
+def test_resolver_igual_forca_bruta(semente):
+    gerador = np.random.default_rng(semente)
+    n, m = gerador.integers(1, 7), gerador.integers(1, 6)
+    precos = gerador.uniform(1, 20, (n, m)).round(2)
+    precos[gerador.random((n, m)) < 0.3] = np.inf
+    quantidades = gerador.integers(1, 10, n).astype(float)
+    fixos = gerador.uniform(0, 15, m).round(2)
+    maximo = None if semente % 3 == 0 else int(gerador.integers(1, m + 1))
+
+    otimizador = OtimizadorFornecedores(fixos, maximo, tempo_limite=10)
+    escolhas = otimizador.resolver(precos, quantidades)
+
+    penalidade = OtimizadorFornecedores.penalidade
+    assert len(escolhas) == n
+    if maximo is not None:
+        assert len({j for j in escolhas if j >= 0}) <= maximo
+    assert custo_escolhas(precos, quantidades, fixos, escolhas, penalidade) == pytest.approx(
+        custo_forca_bruta(precos, quantidades, fixos, maximo, penalidade)
+    )
+
+
+def test_resolver_produto_sem_preco_fica_sem_fornecedor():
+    precos = np.array([[5.0, np.inf], [np.inf, np.inf], [np.inf, 3.0]])
+
+    escolhas = OtimizadorFornecedores().resolver(precos, [1, 1, 1])
+
+    assert escolhas.tolist() == [0, -1, 1]
+
+
+def test_resolver_custo_fixo_concentra_compras():
+    precos = np.array([[10.0, 9.0], [9.0, 10.0]])
+
+    assert OtimizadorFornecedores(0.0).resolver(precos, [1, 1]).tolist() == [1, 0]
+    assert len(set(OtimizadorFornecedores(5.0).resolver(precos, [1, 1]).tolist())) == 1
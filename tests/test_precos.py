@@ -0,0 +1,90 @@
+import random
+
+import pytest
+
+from precos import MatrizPrecosFornecedores
+
+
+def verificar(matriz, relacoes):
+    for id_produto in matriz.linhas:
+        precos = [preco for produto, _, preco in relacoes.values() if produto == id_produto]
+        menor = min(precos, default=None)
+        assert matriz.menor_preco(id_produto) == menor
+        melhor = matriz.melhor_fornecedor(id_produto)
+        if menor is None:
+            assert melhor is None
+        else:
+            assert matriz.preco(id_produto, melhor) == menor
+
+
+@pytest.fixture
+def matriz(monkeypatch):
+    monkeypatch.setattr(MatrizPrecosFornecedores, "capacidade_inicial", 2)
+    matriz = MatrizPrecosFornecedores()
+    matriz.reiniciar(0, 0)
+    matriz.carregado = True
+    return matriz
+
+
+@pytest.mark.parametrize("semente", range(20))
+def test_operacoes_mantem_minimos_e_melhores(matriz, semente):
+    aleatorio = random.Random(semente)
+    relacoes = {}
+    for id_relacao in range(30):
+        relacoes[id_relacao] = (aleatorio.randint(1, 8), aleatorio.randint(1, 6), float(aleatorio.randint(1, 50)))
+        matriz.registrar(id_relacao, *relacoes[id_relacao])
+    matriz.recalcular_minimos()
+    verificar(matriz, relacoes)
+
+    proximo_id = len(relacoes)
+    for _ in range(200):
+        operacao = aleatorio.random()
+        if operacao < 0.35 and relacoes:
+            id_relacao = aleatorio.choice(list(relacoes))
+            produto, fornecedor, _ = relacoes[id_relacao]
+            relacoes[id_relacao] = (produto, fornecedor, float(aleatorio.randint(1, 50)))
+            matriz.atualizar_preco(id_relacao, relacoes[id_relacao][2])
+        elif operacao < 0.7 and relacoes:
+            id_relacao = aleatorio.choice(list(relacoes))
+            del relacoes[id_relacao]
+            matriz.remover(id_relacao)
+        elif operacao < 0.8 and relacoes:
+            id_fornecedor = aleatorio.randint(1, 6)
+            relacoes = {id: relacao for id, relacao in relacoes.items() if relacao[1] != id_fornecedor}
+            matriz.remover_fornecedor(id_fornecedor)
+        else:
+            relacoes[proximo_id] = (aleatorio.randint(1, 10), aleatorio.randint(1, 8), float(aleatorio.randint(1, 50)))
+            matriz.definir(proximo_id, *relacoes[proximo_id])
+            proximo_id += 1
+        verificar(matriz, relacoes)
+
+
+def test_remover_ultima_relacao_limpa_produto(matriz):
+    matriz.definir(1, 10, 100, 5.0)
+    matriz.definir(2, 10, 200, 3.0)
+
+    matriz.remover(2)
+    assert (matriz.menor_preco(10), matriz.melhor_fornecedor(10)) == (5.0, 100)
+
+    matriz.remover(1)
+    assert (matriz.menor_preco(10), matriz.melhor_fornecedor(10)) == (None, None)
+
+
+def test_atualizar_preco_troca_melhor_fornecedor(matriz):
+    matriz.definir(1, 10, 100, 5.0)
+    matriz.definir(2, 10, 200, 7.0)
+
+    matriz.atualizar_preco(1, 9.0)
+
+    assert (matriz.menor_preco(10), matriz.melhor_fornecedor(10)) == (7.0, 200)
+
+
+def test_mesma_celula_usa_menor_relacao(matriz):
+    matriz.definir(1, 10, 100, 5.0)
+    matriz.definir(2, 10, 100, 4.0)
+
+    matriz.atualizar_preco(2, 6.0)
+    assert matriz.preco(10, 100) == 5.0
+
+    matriz.remover(1)
+    assert matriz.preco(10, 100) == 6.0